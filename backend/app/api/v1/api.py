@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users, roles, projects
+from app.api.v1 import auth, users, roles, projects, monitoring, samples, lab, custody, labels, debug
 
 api_router = APIRouter()
 
@@ -7,4 +7,10 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(roles.router, prefix="/roles", tags=["roles"])
-api_router.include_router(projects.router, prefix="/projects", tags=["projects"]) 
\ No newline at end of file
+api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
+api_router.include_router(monitoring.router, prefix="/addresses", tags=["monitoring"])
+api_router.include_router(samples.router, prefix="/addresses", tags=["samples"])
+api_router.include_router(lab.router, prefix="/lab-batches", tags=["lab"]) 
+api_router.include_router(custody.router, prefix="/custody", tags=["custody"])
+api_router.include_router(labels.router, prefix="/projects", tags=["labels"])
+api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
@@ -3,12 +3,14 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app.core.security import create_access_token, create_refresh_token, verify_password, verify_refresh_token, get_current_user
 from app.services.users import UserService
 from app.db.session import get_db
+from app.db.rows import from_row
 import asyncpg
 from app.schemas.user import UserCreate, UserResponse, TokenResponse, UserWithTokens, UserInDB
 from app.core.validators import validate_email
+from app.core.timing import TimedRoute
 from pydantic import BaseModel, field_validator
 
-router = APIRouter(tags=["auth"])
+router = APIRouter(tags=["auth"], route_class=TimedRoute)
 
 class RegisterRequest(UserCreate):
     password_confirm: str
@@ -132,4 +134,4 @@ async def refresh_token(
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: dict = Depends(get_current_user)):
     """Get current user endpoint."""
-    return UserResponse(**current_user) 
\ No newline at end of file
+    return from_row(UserResponse, current_user) 
\ No newline at end of file
@@ -0,0 +1,56 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from asyncpg.pool import Pool
+
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.schemas.custody import CustodyTransfer, CustodyEventInDB, CustodyHolder, CustodyGap
+from app.services import custody as custody_service
+
+router = APIRouter(prefix="/custody", tags=["custody"], route_class=TimedRoute)
+
+@router.post("/transfers", response_model=List[CustodyEventInDB])
+async def record_transfer(
+    transfer: CustodyTransfer,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Record a custody hand-off of one or more scanned samples. Requires technician role or higher."""
+    return await custody_service.record_transfer(db, transfer, current_user["id"])
+
+@router.get("/samples/{barcode}", response_model=CustodyHolder)
+async def get_current_holder(
+    barcode: str,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get who holds a sample right now. Requires supervisor role or higher, or assignment to the project."""
+    return await custody_service.get_current_holder(db, barcode, current_user["id"])
+
+@router.get("/samples/{barcode}/events", response_model=List[CustodyEventInDB])
+async def get_sample_events(
+    barcode: str,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a sample's custody history. Requires supervisor role or higher, or assignment to the project."""
+    return await custody_service.get_sample_events(db, barcode, current_user["id"])
+
+@router.get("/projects/{project_id}", response_model=List[CustodyHolder])
+async def get_project_holders(
+    project_id: int,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the current holder of every sample in a project. Requires supervisor role or higher, or assignment to the project."""
+    return await custody_service.get_project_holders(db, project_id, current_user["id"])
+
+@router.get("/projects/{project_id}/gaps", response_model=List[CustodyGap])
+async def get_project_gaps(
+    project_id: int,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get every break in a project's custody chains. Requires supervisor role or higher, or assignment to the project."""
+    return await custody_service.get_project_gaps(db, project_id, current_user["id"])
@@ -0,0 +1,90 @@
+import tracemalloc
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import FileResponse
+
+from app.core import memory, profiler
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.schemas.debug import MemoryReport
+
+router = APIRouter(prefix="/debug", tags=["debug"], route_class=TimedRoute)
+
+def require_superuser(current_user: dict = Depends(get_current_user)) -> dict:
+    if not current_user.get("is_superuser"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can access debugging endpoints"
+        )
+    return current_user
+
+@router.get("/profiles/{profile_id}", response_class=FileResponse)
+async def get_profile(
+    profile_id: str = Path(..., pattern=r"^\d{8}T\d{6}-[0-9a-f]{8}$"),
+    current_user: dict = Depends(require_superuser)
+):
+    """Download a request profile in collapsed stack format. Requires superuser."""
+    path = profiler.profile_path(profile_id)
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+def _require_tracing() -> None:
+    if not tracemalloc.is_tracing():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Memory tracing is off. Take a snapshot first or set MEMORY_TRACKING_ENABLED"
+        )
+
+@router.get("/memory", response_model=MemoryReport)
+async def get_memory(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(require_superuser)
+):
+    """Get the largest live allocation sites in this worker. Requires superuser."""
+    _require_tracing()
+    current, peak = tracemalloc.get_traced_memory()
+    sites = memory.top_sites(memory.take_snapshot(), limit)
+    return MemoryReport(current_bytes=current, peak_bytes=peak, sites=sites)
+
+@router.post("/memory/snapshot", response_model=MemoryReport)
+async def take_memory_snapshot(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(require_superuser)
+):
+    """
+    Start tracing if needed and save a baseline for /memory/diff. Requires superuser.
+    Allocations made before tracing started aren't tracked.
+    """
+    memory.set_baseline()
+    current, peak = tracemalloc.get_traced_memory()
+    sites = memory.top_sites(memory.get_baseline(), limit)
+    return MemoryReport(current_bytes=current, peak_bytes=peak, sites=sites)
+
+@router.get("/memory/diff", response_model=MemoryReport)
+async def get_memory_diff(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(require_superuser)
+):
+    """Get the allocation sites that grew most since the baseline snapshot. Requires superuser."""
+    _require_tracing()
+    baseline = memory.get_baseline()
+    if baseline is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No baseline snapshot"
+        )
+    current, peak = tracemalloc.get_traced_memory()
+    sites = memory.diff_sites(memory.take_snapshot(), baseline, limit)
+    return MemoryReport(current_bytes=current, peak_bytes=peak, sites=sites)
+
+@router.delete("/memory/snapshot", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_memory_snapshot(current_user: dict = Depends(require_superuser)):
+    """Drop the baseline and stop tracing unless it is always on. Requires superuser."""
+    if settings.MEMORY_TRACKING_ENABLED:
+        memory.clear_baseline()
+    else:
+        memory.stop()
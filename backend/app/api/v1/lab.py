@@ -0,0 +1,32 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from asyncpg.pool import Pool
+
+from app.core.formats import BULK_RESPONSES, bulk_response, response_format
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.schemas.sample import LabBatchCreate, LabBatchResponse, LabResultInDB
+from app.services import lab_results as lab_service
+
+router = APIRouter(prefix="/lab-batches", tags=["lab"], route_class=TimedRoute)
+
+@router.post("", response_model=LabBatchResponse)
+async def import_batch(
+    batch: LabBatchCreate,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Import a batch of lab results and run QA/QC checks on it. Requires supervisor role or higher."""
+    return await lab_service.import_batch(db, batch, current_user["id"])
+
+@router.get("/{batch_id}/results", response_model=List[LabResultInDB], responses=BULK_RESPONSES)
+async def get_batch_results(
+    batch_id: int,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    media_type: str = Depends(response_format)
+):
+    """Get the results of a lab batch with their QC flags, as JSON, MessagePack or Arrow. Requires technician role or higher."""
+    rows = await lab_service.get_batch_result_rows(db, batch_id, current_user["id"])
+    return bulk_response(media_type, LabResultInDB, rows)
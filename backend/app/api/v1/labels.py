@@ -0,0 +1,36 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+from asyncpg.pool import Pool
+
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.services import labels as label_service
+
+router = APIRouter(prefix="/projects", tags=["labels"], route_class=TimedRoute)
+
+MEDIA_TYPES = {"pdf": "application/pdf", "png": "image/png"}
+
+@router.get("/{project_id}/labels", response_class=FileResponse)
+async def get_label_sheet(
+    project_id: int,
+    start: int = Query(..., ge=1),
+    end: int = Query(..., ge=1),
+    template: str = "avery-5160",
+    fmt: Literal["pdf", "png"] = Query("pdf", alias="format"),
+    page: int = Query(1, ge=1),
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Download a sheet of QR sample labels numbered start..end for a project.
+    PDFs contain every page; PNGs contain the requested page. Requires supervisor role or higher.
+    """
+    path = await label_service.get_label_sheet(
+        db, project_id, start, end, template, fmt, page, current_user["id"]
+    )
+    filename = f"labels-project-{project_id}-{start}-{end}"
+    if fmt == "png":
+        filename += f"-page-{page}"
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], filename=f"{filename}.{fmt}")
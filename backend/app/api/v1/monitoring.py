@@ -0,0 +1,46 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from asyncpg.pool import Pool
+
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.schemas.monitoring import ReadingBatch, ReadingAppendResponse, ReadingSeries, DownsampledSeries
+from app.services import monitoring as monitoring_service
+
+router = APIRouter(prefix="/addresses", tags=["monitoring"], route_class=TimedRoute)
+
+@router.post("/{address_id}/readings", response_model=ReadingAppendResponse)
+async def append_readings(
+    address_id: int,
+    batch: ReadingBatch,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Append monitor readings to an address. Requires technician role or higher."""
+    return await monitoring_service.append_readings(db, address_id, batch, current_user["id"])
+
+@router.get("/{address_id}/readings", response_model=ReadingSeries)
+async def get_readings(
+    address_id: int,
+    metric: str,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the raw readings of a metric in a time range. Requires supervisor role or higher, or assignment to the project."""
+    return await monitoring_service.get_readings(db, address_id, metric, start, end, current_user["id"])
+
+@router.get("/{address_id}/series", response_model=DownsampledSeries)
+async def get_series(
+    address_id: int,
+    metric: str,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    points: int = Query(1000, ge=3, le=10000),
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a metric downsampled with LTTB to at most `points` points, with min/max envelopes. Requires supervisor role or higher, or assignment to the project."""
+    return await monitoring_service.get_series(db, address_id, metric, start, end, points, current_user["id"])
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from asyncpg.pool import Pool
 
+from app.core.etags import PROJECT_TABLES, conditional
+from app.core.formats import BULK_RESPONSES, bulk_response, response_format
 from app.core.security import get_current_user
+from app.core.timing import TimedRoute
 from app.db.session import get_db
 from app.schemas.project import (
     ProjectCreate, ProjectUpdate, ProjectInDB, ProjectWithAddresses,
@@ -10,7 +14,7 @@ from app.schemas.project import (
 )
 from app.services import projects as project_service
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=TimedRoute)
 
 @router.post("/", response_model=ProjectInDB)
 async def create_project(
@@ -24,10 +28,11 @@ async def create_project(
 @router.get("/{project_id}", response_model=ProjectWithAddresses)
 async def get_project(
     project_id: int,
+    etag: str = Depends(conditional("projects/{project_id}", PROJECT_TABLES)),
     db: Pool = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get a project by ID. Requires technician role or higher."""
+    """Get a project by ID. Requires technician role or higher. Honors If-None-Match."""
     return await project_service.get_project(db, project_id, current_user["id"])
 
 @router.patch("/{project_id}", response_model=ProjectInDB)
@@ -40,6 +45,19 @@ async def update_project(
     """Update a project. Requires technician role or higher."""
     return await project_service.update_project(db, project_id, project_update, current_user["id"])
 
+@router.get("/{project_id}/addresses", response_model=List[AddressInDB], responses=BULK_RESPONSES)
+async def get_project_addresses(
+    project_id: int,
+    response: Response,
+    etag: str = Depends(conditional("projects/{project_id}/addresses", PROJECT_TABLES)),
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    media_type: str = Depends(response_format)
+):
+    """Get a project's addresses, as JSON, MessagePack or Arrow. Requires supervisor role or higher, or assignment to the project. Honors If-None-Match."""
+    rows = await project_service.get_project_address_rows(db, project_id, current_user["id"])
+    return bulk_response(media_type, AddressInDB, rows, response.headers)
+
 @router.post("/{project_id}/addresses", response_model=AddressInDB)
 async def create_address(
     project_id: int,
@@ -6,17 +6,21 @@ from app.db.session import get_db
 from app.schemas.role import RoleResponse, RoleCreate, RoleUpdate
 from app.schemas.user import UserResponse
 from app.services import RoleService
+from app.core.etags import conditional
 from app.core.security import get_current_user
+from app.core.timing import TimedRoute
 from app.db.queries.manager import query_manager
+from app.db.rows import from_row
 
-router = APIRouter(prefix="/roles", tags=["roles"])
+router = APIRouter(prefix="/roles", tags=["roles"], route_class=TimedRoute)
 
 @router.get("", response_model=List[RoleResponse])
 async def get_roles(
+    etag: str = Depends(conditional("roles")),
     current_user: dict = Depends(get_current_user),
     db: asyncpg.Pool = Depends(get_db)
 ):
-    """Get all roles."""
+    """Get all roles. Honors If-None-Match."""
     role_service = RoleService(db)
     roles = await role_service.get_all_roles()
     return roles
@@ -29,7 +33,7 @@ async def create_role(
 ):
     """Create a new role."""
     # Check if user has permission to create roles
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     if not (current_user_model.is_superuser or any(role.permissions and "manage_roles" in role.permissions for role in current_user_model.roles)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -49,7 +53,7 @@ async def update_role(
 ):
     """Update a role."""
     # Check if user has permission to update roles
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     if not (current_user_model.is_superuser or any(role.permissions and "manage_roles" in role.permissions for role in current_user_model.roles)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -73,7 +77,7 @@ async def delete_role(
 ):
     """Delete a role."""
     # Check if user has permission to delete roles
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     if not (current_user_model.is_superuser or any(role.permissions and "manage_roles" in role.permissions for role in current_user_model.roles)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
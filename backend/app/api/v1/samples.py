@@ -0,0 +1,33 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from asyncpg.pool import Pool
+
+from app.core.formats import BULK_RESPONSES, bulk_response, response_format
+from app.core.security import get_current_user
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.schemas.sample import SampleCreate, SampleInDB
+from app.services import samples as sample_service
+
+router = APIRouter(prefix="/addresses", tags=["samples"], route_class=TimedRoute)
+
+@router.post("/{address_id}/samples", response_model=SampleInDB)
+async def create_sample(
+    address_id: int,
+    sample: SampleCreate,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Create a sample at an address. Requires technician role or higher."""
+    return await sample_service.create_sample(db, address_id, sample, current_user["id"])
+
+@router.get("/{address_id}/samples", response_model=List[SampleInDB], responses=BULK_RESPONSES)
+async def get_address_samples(
+    address_id: int,
+    db: Pool = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    media_type: str = Depends(response_format)
+):
+    """Get the samples taken at an address, as JSON, MessagePack or Arrow. Requires supervisor role or higher, or assignment to the project."""
+    rows = await sample_service.get_address_sample_rows(db, address_id, current_user["id"])
+    return bulk_response(media_type, SampleInDB, rows)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Body
 import asyncpg
 from app.db.session import get_db
 from app.schemas.user import UserResponse, UserCreate, UserUpdate
@@ -6,27 +6,28 @@ from app.services import UserService
 from typing import List, Any
 from app.core.security import get_current_user
 from app.core.validators import validate_password
+from app.core.timing import TimedRoute
+from app.core.etags import conditional
+from app.core.formats import BULK_RESPONSES, bulk_response, response_format
 from app.db.queries.manager import query_manager
+from app.db.rows import from_row
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
-@router.get("", response_model=List[UserResponse])
+@router.get("", response_model=List[UserResponse], responses=BULK_RESPONSES)
 async def get_users(
+    response: Response,
+    etag: str = Depends(conditional("users")),
     current_user: dict = Depends(get_current_user),
-    db: asyncpg.Pool = Depends(get_db)
+    db: asyncpg.Pool = Depends(get_db),
+    media_type: str = Depends(response_format)
 ):
-    """Get all users."""
+    """Get all users, as JSON, MessagePack or Arrow depending on the Accept header. Honors If-None-Match."""
     # Convert current_user dict to UserResponse
-    current_user_model = UserResponse(**current_user)
-    
-    # Superusers have all permissions
-    if current_user_model.is_superuser:
-        user_service = UserService(db)
-        users = await user_service.get_all_users()
-        return users
+    current_user_model = from_row(UserResponse, current_user)
     
-    # Check if user has permission to view all users
-    if not any(
+    # Superusers have all permissions; others need manage_users
+    if not current_user_model.is_superuser and not any(
         role.permissions and 'manage_users' in role.permissions 
         for role in current_user_model.roles
     ):
@@ -36,15 +37,16 @@ async def get_users(
         )
     
     user_service = UserService(db)
-    users = await user_service.get_all_users()
-    return users
+    rows = await user_service.get_all_user_rows()
+    return bulk_response(media_type, UserResponse, rows, response.headers)
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_endpoint(
+    etag: str = Depends(conditional("users/me")),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get current user endpoint."""
-    return UserResponse(**current_user)
+    """Get current user endpoint. Honors If-None-Match."""
+    return from_row(UserResponse, current_user)
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
@@ -56,7 +58,7 @@ async def update_current_user(
     user_service = UserService(db)
     
     # Convert current_user dict to UserResponse
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     
     # Check if email is being changed and if it's already taken
     if user_in.email and user_in.email != current_user_model.email:
@@ -125,7 +127,7 @@ async def update_user(
     """
     Update a user.
     """
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     
     # Check if user has permission to update
     can_update = (
@@ -160,7 +162,7 @@ async def update_user(
         update_data.get('is_active'),
         update_data.get('is_superuser')
     )
-    return UserResponse(**dict(updated_user))
+    return from_row(UserResponse, updated_user)
 
 @router.put("/{user_id}/roles", status_code=200)
 async def assign_roles_to_user(
@@ -170,7 +172,7 @@ async def assign_roles_to_user(
     db: asyncpg.Pool = Depends(get_db)
 ):
     """Assign roles to a user."""
-    current_user_model = UserResponse(**current_user)
+    current_user_model = from_row(UserResponse, current_user)
     
     # Check if user has permission to assign roles
     if not (current_user_model.is_superuser or any(role.permissions and "manage_users" in role.permissions for role in current_user_model.roles)):
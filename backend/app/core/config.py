@@ -4,6 +4,10 @@ from pydantic import AnyHttpUrl, field_validator, ConfigDict
 import os
 import json
 
+# Longest monitoring chunk, app.core.timeseries.MAX_CHUNK_MS, spelled out so
+# importing the settings doesn't pull in numpy
+MAX_CHUNK_MS = 2**31 - 1
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = os.getenv("PROJECT_NAME", "Enviro-Centric")
     VERSION: str = os.getenv("VERSION", "1.0.0")
@@ -35,6 +39,13 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB")
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "db")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
+    # Per worker; each worker process opens its own pool
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    # Startup readiness check: SELECT 1 retried with exponential backoff and jitter
+    DB_READY_TIMEOUT_SECONDS: int = int(os.getenv("DB_READY_TIMEOUT_SECONDS", "30"))
+    DB_READY_BACKOFF_MS: int = int(os.getenv("DB_READY_BACKOFF_MS", "100"))
+    DB_READY_BACKOFF_MAX_MS: int = int(os.getenv("DB_READY_BACKOFF_MAX_MS", "5000"))
 
     @property
     def get_database_url(self) -> str:
@@ -43,6 +54,56 @@ class Settings(BaseSettings):
             return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/test_db"
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    # Monitoring Configuration
+    MONITORING_CHUNK_SECONDS: int = int(os.getenv("MONITORING_CHUNK_SECONDS", "3600"))
+    SERIES_CACHE_SIZE: int = int(os.getenv("SERIES_CACHE_SIZE", "256"))
+
+    # Metrics Configuration
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "False").lower() == "true"
+    SERVER_TIMING_LOG: bool = os.getenv("SERVER_TIMING_LOG", "False").lower() == "true"
+
+    # Slow Query Configuration (0 disables capture)
+    SLOW_QUERY_MS: int = int(os.getenv("SLOW_QUERY_MS", "500"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+    SLOW_QUERY_INTERVAL_SECONDS: int = int(os.getenv("SLOW_QUERY_INTERVAL_SECONDS", "300"))
+    # Statement, lock and connect timeout for re-running a slow query under EXPLAIN ANALYZE
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", str(10 * SLOW_QUERY_MS)))
+
+    # Event Loop Monitor Configuration
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "True").lower() == "true"
+    LOOP_LAG_INTERVAL_MS: int = int(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+    LOOP_LAG_THRESHOLD_MS: int = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+    LOOP_BLOCK_DEBUG: bool = os.getenv("LOOP_BLOCK_DEBUG", "False").lower() == "true"
+
+    # Request Profiler Configuration
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "True").lower() == "true"
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "/tmp/request-profiles")
+    PROFILE_INTERVAL_MS: int = int(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_MAX_CONCURRENT: int = int(os.getenv("PROFILE_MAX_CONCURRENT", "1"))
+
+    # Memory Tracking Configuration
+    MEMORY_TRACKING_ENABLED: bool = os.getenv("MEMORY_TRACKING_ENABLED", "False").lower() == "true"
+    MEMORY_TRACE_FRAMES: int = int(os.getenv("MEMORY_TRACE_FRAMES", "10"))
+    MEMORY_TOP_SITES: int = int(os.getenv("MEMORY_TOP_SITES", "10"))
+
+    # Bulk Response Formats (app.core.formats): rows per Arrow record batch
+    ARROW_BATCH_ROWS: int = int(os.getenv("ARROW_BATCH_ROWS", "10000"))
+
+    # Label Sheet Configuration
+    LABEL_CACHE_DIR: str = os.getenv("LABEL_CACHE_DIR", "/tmp/label-sheets")
+    LABEL_WORKERS: int = int(os.getenv("LABEL_WORKERS", str(os.cpu_count() or 1)))
+    LABEL_MAX_COUNT: int = int(os.getenv("LABEL_MAX_COUNT", "3000"))
+    # Rendered sheets older than this are deleted, then the least recently used until the cache fits
+    LABEL_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("LABEL_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+    LABEL_CACHE_MAX_BYTES: int = int(os.getenv("LABEL_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    # Server Configuration (python -m app.serve)
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30"))
+    # Waiting for the database, migrations and the roles view; app.serve runs them once and turns this off for its workers
+    RUN_BOOT_TASKS: bool = os.getenv("RUN_BOOT_TASKS", "True").lower() == "true"
+
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
 
@@ -57,6 +118,12 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
 
+    @field_validator("MONITORING_CHUNK_SECONDS")
+    def check_monitoring_chunk_seconds(cls, v: int) -> int:
+        if not 0 < v * 1000 <= MAX_CHUNK_MS:
+            raise ValueError(f"MONITORING_CHUNK_SECONDS must be between 1 and {MAX_CHUNK_MS // 1000}")
+        return v
+
     model_config = ConfigDict(case_sensitive=True, env_file=".env")
 
 
@@ -0,0 +1,61 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Downsampled(NamedTuple):
+    timestamps: np.ndarray
+    values: np.ndarray
+    min_values: np.ndarray
+    max_values: np.ndarray
+
+
+def lttb(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    start_ms: int,
+    bucket_ms: int,
+) -> Downsampled:
+    """
+    Downsample sorted readings with Largest-Triangle-Three-Buckets.
+
+    Buckets are fixed time windows of bucket_ms starting at start_ms, so the
+    same range and bucket width always produce the same buckets. One point is
+    kept per non-empty bucket: the first reading for the first bucket, the
+    last reading for the last one, so the chart spans the data's real range,
+    and in between the one forming the largest triangle with the point kept
+    from the previous bucket and the average of the next bucket.
+    The min and max of every bucket are returned alongside as an envelope.
+    """
+    if timestamps.size == 0:
+        empty = values[:0]
+        return Downsampled(timestamps[:0], empty, empty, empty)
+
+    bucket_ids = (timestamps - start_ms) // bucket_ms
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket_ids)) + 1))
+    counts = np.diff(np.append(starts, timestamps.size))
+
+    # Work in float64 relative to the range start to keep precision in the areas
+    x = (timestamps - start_ms).astype(np.float64)
+    y = values.astype(np.float64)
+    avg_x = np.add.reduceat(x, starts) / counts
+    avg_y = np.add.reduceat(y, starts) / counts
+    min_values = np.minimum.reduceat(values, starts)
+    max_values = np.maximum.reduceat(values, starts)
+
+    selected = np.empty(starts.size, dtype=np.intp)
+    selected[0] = 0
+    ax, ay = x[0], y[0]
+    last = starts.size - 1
+    for bucket in range(1, last):
+        lo = starts[bucket]
+        hi = lo + counts[bucket]
+        cx, cy = avg_x[bucket + 1], avg_y[bucket + 1]
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        index = lo + int(np.argmax(areas))
+        selected[bucket] = index
+        ax, ay = x[index], y[index]
+    if last > 0:
+        selected[last] = timestamps.size - 1
+
+    return Downsampled(timestamps[selected], values[selected], min_values, max_values)
@@ -0,0 +1,92 @@
+"""
+Conditional GETs with weak ETags for account data (users, roles,
+permissions) and projects.
+
+Triggers keep a change counter per table in table_versions (migrations 0009
+and 0011):
+every statement writing to a tracked table moves its version forward. A
+response's ETag is a hash of the versions of the tables it is built from,
+the route's path parameters (e.g. the project id), the caller's identity
+(token subject and superuser claim) and the negotiated format. It changes whenever any of them changes, and is weak because it
+vouches for the data, not the bytes.
+
+`Depends(conditional("name"))` goes before the route's other dependencies.
+It verifies the token, reads the versions with one small query and, when
+If-None-Match matches, answers 304 Not Modified right there: the user
+lookup, the role and permission aggregation, the route's own queries and
+serialization are all skipped. That is safe because the versions cover
+every table authentication and the permission checks read; routes that
+read more, like the project routes, list those tables too. If the caller's
+account, roles or permissions changed, so did the ETag, and the request
+takes the full path, checks and all.
+
+The versions are read before the data, so an ETag is never newer than the
+response it goes with. Responses are `Cache-Control: private, no-cache`:
+clients keep them but revalidate every time.
+"""
+import hashlib
+from typing import Callable, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.core.formats import negotiate
+from app.core.responses import add_vary
+from app.core.security import decode_access_token, oauth2_scheme
+from app.core.timing import AUTH, phase
+from app.db.queries.manager import query_manager
+from app.db.session import get_db
+
+# Tables authentication and the account endpoints read
+ACCOUNT_TABLES = ("users", "user_roles", "roles", "role_permissions", "permissions")
+# Tables a project, its addresses and the project access check read
+PROJECT_TABLES = ACCOUNT_TABLES + ("projects", "addresses", "project_technicians")
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: object) -> str:
+    """A weak ETag hashing the given parts."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag, using weak comparison."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional(resource: str, tables: Sequence[str] = ACCOUNT_TABLES) -> Callable:
+    """Dependency answering 304 for an unchanged resource, and adding its ETag otherwise."""
+    tables = sorted(tables)
+
+    async def check(
+        request: Request,
+        response: Response,
+        token: str = Depends(oauth2_scheme),
+        db=Depends(get_db)
+    ) -> str:
+        with phase(AUTH):
+            payload = decode_access_token(token)
+        versions = await db.fetch(query_manager.get_table_versions, tables)
+        etag = weak_etag(
+            resource,
+            sorted(request.path_params.items()),
+            payload["sub"],
+            payload.get("is_superuser"),
+            negotiate(request.headers.get("accept")),
+            [tuple(row) for row in versions],
+        )
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "Vary": "Authorization"})
+        response.headers.update(headers)
+        add_vary(response.headers, "Authorization")
+        return etag
+
+    return check
@@ -0,0 +1,199 @@
+"""
+Content negotiation for bulk list endpoints: JSON, MessagePack or Arrow.
+
+Reporting scripts pulling whole lists can ask for a binary format with the
+Accept header:
+- `application/json` (or anything else): the usual response model path.
+- `application/msgpack`: the same document as JSON, encoded as MessagePack.
+  Timestamps and dates are ISO strings, as in JSON.
+- `application/vnd.apache.arrow.stream`: an Arrow IPC stream of record
+  batches of up to ARROW_BATCH_ROWS rows. Batches are built column by column
+  from the query's records, without a model or dict per row. The schema
+  comes from the response model, so only the model's fields are sent (never
+  e.g. hashed_password). Nested models, such as a user's roles, are sent as
+  their JSON text.
+
+Starlette iterates the Arrow stream in its thread pool, so encoding a large
+list doesn't block the event loop.
+
+A list route declares `media_type: str = Depends(response_format)`, fetches
+its rows and returns `bulk_response(media_type, Model, rows)`. Add
+BULK_RESPONSES to the route's `responses` so the formats show up in the
+OpenAPI schema.
+"""
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import NoneType, UnionType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+import pyarrow as pa
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.core.responses import MsgpackResponse, add_vary
+from app.core.timing import SERIALIZE, phase
+from app.db.rows import from_rows
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Accepted media types and the format each one selects
+MEDIA_TYPES = {
+    JSON: JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    ARROW: ARROW,
+}
+
+BULK_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {
+    200: {"content": {MSGPACK: {}, ARROW: {}}},
+}
+
+_adapters: Dict[type, TypeAdapter] = {}
+_schemas: Dict[type, Tuple[pa.Schema, List[Optional[Callable[[Any], Any]]]]] = {}
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """The format for an Accept header: the supported type with the highest q, JSON if none."""
+    chosen, chosen_q = JSON, 0.0
+    for entry in (accept or "").split(","):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        selected = MEDIA_TYPES.get(media_type.lower())
+        if selected is None:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > chosen_q:
+            chosen, chosen_q = selected, q
+    return chosen
+
+
+async def response_format(request: Request, response: Response) -> str:
+    """Dependency giving the format the client asked for."""
+    add_vary(response.headers, "Accept")
+    return negotiate(request.headers.get("accept"))
+
+
+def _to_date(value: Any) -> Any:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _to_json_text(value: Any) -> Any:
+    return value if value is None or isinstance(value, str) else json.dumps(value, default=str)
+
+
+def _to_str(value: Any) -> Any:
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _arrow_type(annotation: Any) -> Tuple[pa.DataType, Optional[Callable[[Any], Any]]]:
+    """The Arrow type of a field and how its column values are converted, None if used as is."""
+    if get_origin(annotation) in (Union, UnionType):
+        types = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(types) == 1:
+            return _arrow_type(types[0])
+        return pa.string(), _to_str
+    if get_origin(annotation) is list:
+        item = get_args(annotation)[0] if get_args(annotation) else Any
+        if item in (int, float, str, bool):
+            return pa.list_(_arrow_type(item)[0]), None
+        return pa.string(), _to_json_text
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return pa.string(), _to_json_text
+    if annotation is bool:
+        return pa.bool_(), None
+    if annotation is int:
+        return pa.int64(), None
+    if annotation is float:
+        return pa.float64(), _to_float
+    if annotation is datetime:
+        return pa.timestamp("us", tz="UTC"), None
+    if annotation is date:
+        return pa.date32(), _to_date
+    return pa.string(), _to_str
+
+
+def _default_on_null(convert: Optional[Callable[[Any], Any]], default: Any) -> Callable[[Any], Any]:
+    if convert is None:
+        return lambda value: default if value is None else value
+    return lambda value: default if value is None else convert(value)
+
+
+def arrow_schema(model: Type[BaseModel]) -> Tuple[pa.Schema, List[Optional[Callable[[Any], Any]]]]:
+    """The Arrow schema for a model's fields and the converter of each column."""
+    cached = _schemas.get(model)
+    if cached is None:
+        fields, converters = [], []
+        for name, field in model.model_fields.items():
+            arrow_type, convert = _arrow_type(field.annotation)
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            if default is not None:
+                # NULL becomes the default, e.g. an empty list, as in the JSON response
+                convert = _default_on_null(convert, convert(default) if convert else default)
+            fields.append(pa.field(name, arrow_type))
+            converters.append(convert)
+        cached = _schemas[model] = (pa.schema(fields), converters)
+    return cached
+
+
+def arrow_batches(model: Type[BaseModel], rows: Sequence[Mapping[str, Any]], batch_rows: int) -> Iterator[bytes]:
+    """Encode rows as an Arrow IPC stream, yielding the schema and then one chunk per record batch."""
+    schema, converters = arrow_schema(model)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for start in range(0, len(rows), batch_rows):
+            chunk = rows[start:start + batch_rows]
+            columns = []
+            for field, convert in zip(schema, converters):
+                values = [row.get(field.name) for row in chunk]
+                if convert is not None:
+                    values = [convert(value) for value in values]
+                columns.append(pa.array(values, type=field.type))
+            writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # The end-of-stream marker, and the schema when there were no rows
+    yield sink.getvalue()
+
+
+def bulk_response(
+    media_type: str,
+    model: Type[BaseModel],
+    rows: Sequence[Mapping[str, Any]],
+    headers: Optional[Mapping[str, str]] = None
+) -> Any:
+    """
+    Respond with rows in the negotiated format; JSON returns models for the route's response_model.
+
+    FastAPI doesn't add the headers dependencies set to a response the route
+    returns itself, so pass them (e.g. an ETag) as headers.
+    """
+    headers = dict(headers or {"Vary": "Accept"})
+    if media_type == ARROW:
+        return StreamingResponse(
+            arrow_batches(model, rows, settings.ARROW_BATCH_ROWS), media_type=ARROW, headers=headers
+        )
+    models = from_rows(model, rows)
+    if media_type == MSGPACK:
+        adapter = _adapters.get(model)
+        if adapter is None:
+            adapter = _adapters[model] = TypeAdapter(List[model])
+        with phase(SERIALIZE):
+            return MsgpackResponse(adapter.dump_python(models, mode="json"), headers=headers)
+    return models
@@ -0,0 +1,202 @@
+import io
+import zlib
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import segno
+from PIL import Image, ImageDraw, ImageFont
+
+# All layout is in PDF points (1/72 inch)
+POINTS_PER_INCH = 72
+
+# Light modules kept around each QR code so neighbouring print doesn't break scanning
+QUIET_ZONE = 2
+
+
+class LabelTemplate(NamedTuple):
+    page_width: float
+    page_height: float
+    columns: int
+    rows: int
+    label_width: float
+    label_height: float
+    left_margin: float
+    top_margin: float
+    column_pitch: float
+    row_pitch: float
+    padding: float
+
+    @property
+    def per_page(self) -> int:
+        return self.columns * self.rows
+
+
+# Letter-size label stock
+TEMPLATES: Dict[str, LabelTemplate] = {
+    # 30 labels of 2.625" x 1"
+    "avery-5160": LabelTemplate(612, 792, 3, 10, 189, 72, 13.5, 36, 198, 72, 4),
+    # 10 labels of 4" x 2"
+    "avery-5163": LabelTemplate(612, 792, 2, 5, 288, 144, 11.25, 36, 297, 144, 8),
+}
+
+# A label is the barcode encoded in its QR code and a caption printed beside it
+Label = Tuple[str, str]
+
+
+def label_barcode(project_id: int, number: int) -> str:
+    """Barcode of the number-th pre-printed sample label of a project."""
+    return f"P{project_id}-{number:05d}"
+
+
+def _qr_matrix(data: str) -> np.ndarray:
+    """QR modules of data as a boolean array, True for dark modules."""
+    qr = segno.make(data, error="m", micro=False)
+    return np.array([list(row) for row in qr.matrix_iter(border=QUIET_ZONE)], dtype=bool)
+
+
+def _label_origin(template: LabelTemplate, index: int) -> Tuple[float, float]:
+    """Top-left corner of the index-th label on a page, in points from the page's top-left."""
+    row, column = divmod(index, template.columns)
+    return (
+        template.left_margin + column * template.column_pitch,
+        template.top_margin + row * template.row_pitch,
+    )
+
+
+def _layout(template: LabelTemplate) -> Tuple[float, float, float]:
+    """QR size, barcode font size and caption font size for a template."""
+    qr_size = template.label_height - 2 * template.padding
+    return qr_size, template.label_height / 6, template.label_height / 9
+
+
+def _pdf_text(text: str) -> str:
+    data = text.encode("latin-1", "replace").decode("latin-1")
+    return data.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _fit(text: str, max_width: float, font_size: float) -> str:
+    """Truncate text to roughly fit max_width, assuming an average Helvetica glyph width."""
+    max_chars = max(int(max_width / (font_size * 0.55)), 1)
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "~"
+
+
+def render_pdf_page(template_name: str, labels: Sequence[Label]) -> bytes:
+    """Render one page of labels as a PDF content stream."""
+    template = TEMPLATES[template_name]
+    qr_size, barcode_size, caption_size = _layout(template)
+    text_width = template.label_width - qr_size - 3 * template.padding
+    ops: List[str] = []
+
+    for index, (barcode, caption) in enumerate(labels):
+        left, top = _label_origin(template, index)
+        matrix = _qr_matrix(barcode)
+        module = qr_size / matrix.shape[0]
+        qr_left = left + template.padding
+        qr_top = template.page_height - (top + template.padding)
+
+        # One rectangle per horizontal run of dark modules
+        for y, row in enumerate(matrix):
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.int8), [0]))))
+            for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+                ops.append(
+                    f"{qr_left + start * module:.2f} {qr_top - (y + 1) * module:.2f} "
+                    f"{(end - start) * module:.2f} {module:.2f} re"
+                )
+        ops.append("f")
+
+        text_left = qr_left + qr_size + template.padding
+        baseline = template.page_height - (top + template.label_height / 2)
+        ops.append(
+            f"BT /F2 {barcode_size:.1f} Tf {text_left:.2f} {baseline:.2f} Td "
+            f"({_pdf_text(_fit(barcode, text_width, barcode_size))}) Tj ET"
+        )
+        ops.append(
+            f"BT /F1 {caption_size:.1f} Tf {text_left:.2f} {baseline - caption_size * 1.6:.2f} Td "
+            f"({_pdf_text(_fit(caption, text_width, caption_size))}) Tj ET"
+        )
+
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_pdf(template_name: str, pages: Sequence[bytes]) -> bytes:
+    """Assemble rendered page content streams into a PDF document."""
+    template = TEMPLATES[template_name]
+    first_page = 5
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids [" +
+            " ".join(f"{first_page + 2 * i} 0 R" for i in range(len(pages))) +
+            f"] /Count {len(pages)} >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, content in enumerate(pages):
+        stream = zlib.compress(content)
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R "
+            f"/MediaBox [0 0 {template.page_width} {template.page_height}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+            f"/Contents {first_page + 2 * i + 1} 0 R >>"
+        ).encode())
+        objects.append(
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode() +
+            stream + b"\nendstream"
+        )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def _font(size: float, bold: bool = False) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", round(size))
+    except OSError:
+        return ImageFont.load_default(size=round(size))
+
+
+def render_png_page(template_name: str, labels: Sequence[Label], dpi: int = 300) -> bytes:
+    """Render one page of labels as a 1-bit PNG."""
+    template = TEMPLATES[template_name]
+    scale = dpi / POINTS_PER_INCH
+    qr_size, barcode_size, caption_size = _layout(template)
+    text_width = template.label_width - qr_size - 3 * template.padding
+    barcode_font = _font(barcode_size * scale, bold=True)
+    caption_font = _font(caption_size * scale)
+
+    page = Image.new("1", (round(template.page_width * scale), round(template.page_height * scale)), 1)
+    draw = ImageDraw.Draw(page)
+    for index, (barcode, caption) in enumerate(labels):
+        left, top = _label_origin(template, index)
+        matrix = _qr_matrix(barcode)
+        module = max(int(qr_size * scale) // matrix.shape[0], 1)
+        pixels = np.repeat(np.repeat(~matrix, module, axis=0), module, axis=1)
+        qr_left = round((left + template.padding) * scale)
+        qr_top = round((top + template.padding) * scale)
+        page.paste(Image.fromarray(pixels), (qr_left, qr_top))
+
+        text_left = (left + qr_size + 2 * template.padding) * scale
+        middle = (top + template.label_height / 2) * scale
+        draw.text(
+            (text_left, middle), _fit(barcode, text_width, barcode_size),
+            font=barcode_font, fill=0, anchor="ls"
+        )
+        draw.text(
+            (text_left, middle + caption_size * 1.6 * scale), _fit(caption, text_width, caption_size),
+            font=caption_font, fill=0, anchor="ls"
+        )
+
+    out = io.BytesIO()
+    page.save(out, format="PNG", optimize=True, dpi=(dpi, dpi))
+    return out.getvalue()
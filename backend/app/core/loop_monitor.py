@@ -0,0 +1,99 @@
+"""
+Event loop lag monitoring.
+
+A background task sleeps for a fixed interval and records how late it wakes
+up in the event_loop_lag_seconds histogram. Lag is time the loop spent
+running something that didn't yield, such as bcrypt hashing or blocking I/O.
+
+With dump_stacks on, a watchdog thread also notices while the loop is still
+blocked and logs the loop thread's stack. The stack shows the code that is
+blocking, and the request it belongs to is found from the ASGI scope of the
+innermost middleware frame.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from time import monotonic
+from typing import Optional
+
+from app.core import metrics
+
+logger = logging.getLogger("app.loop")
+
+
+def _request_of(frame) -> Optional[str]:
+    """Method and path of the HTTP request a stack is serving, if any."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return f"{scope.get('method')} {scope.get('path')}"
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, dump_stacks: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.dump_stacks = dump_stacks
+        self.heartbeat = monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self.heartbeat = monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.dump_stacks:
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.heartbeat = now = monotonic()
+            lag = max(0.0, now - expected)
+            metrics.LOOP_LAG.labels().observe(lag)
+            if lag >= self.threshold:
+                metrics.LOOP_BLOCKED.inc()
+                if not self.dump_stacks:
+                    logger.warning("Event loop was blocked for %.0f ms", lag * 1000)
+
+    def _watch(self) -> None:
+        """Runs in its own thread, so it keeps going while the loop is blocked."""
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self.heartbeat
+            blocked = monotonic() - heartbeat - self.interval
+            if blocked < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            logger.warning(
+                "Event loop blocked for %.0f ms so far (request: %s), stack:\n%s",
+                blocked * 1000,
+                _request_of(frame) or "none",
+                "".join(traceback.format_stack(frame))
+            )
@@ -0,0 +1,148 @@
+"""
+Allocation tracking with tracemalloc.
+
+With MEMORY_TRACKING_ENABLED, tracing starts with the app and
+MemoryMiddleware logs one JSON line per request on the app.memory logger:
+- peak: the most memory held above the request's starting point. This is
+  process-wide, so it is only exact when requests don't overlap, as in a
+  load test against one endpoint.
+- allocated: memory allocated during the request that was still held when
+  the response started.
+- top: the allocation sites behind `allocated`, largest first.
+The peak is also sent in an X-Memory-Peak header.
+
+Tracing slows every allocation down and each report takes two snapshots,
+so this is for staging and local measurements. Superusers can also start
+tracing on demand and compare snapshots through /api/v1/debug/memory.
+"""
+import json
+import logging
+import os
+import tracemalloc
+from typing import List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.memory")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+def start() -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+
+
+def stop() -> None:
+    clear_baseline()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _caller(traceback: tracemalloc.Traceback) -> Optional[str]:
+    """The innermost frame in our own code, which is usually the one worth changing."""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(_APP_DIR):
+            return f"{os.path.relpath(frame.filename, os.path.dirname(_APP_DIR))}:{frame.lineno}"
+    return None
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    frame = traceback[-1]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, limit: int) -> List[dict]:
+    """Largest allocation sites in a snapshot."""
+    return [
+        {
+            "site": _site(stat.traceback),
+            "caller": _caller(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("traceback")[:limit]
+    ]
+
+
+def diff_sites(snapshot: tracemalloc.Snapshot, previous: tracemalloc.Snapshot, limit: int) -> List[dict]:
+    """Allocation sites that grew the most since `previous`."""
+    stats = [stat for stat in snapshot.compare_to(previous, "traceback") if stat.size_diff > 0]
+    return [
+        {
+            "site": _site(stat.traceback),
+            "caller": _caller(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+            "size_diff_bytes": stat.size_diff,
+            "count_diff": stat.count_diff,
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def set_baseline() -> None:
+    """Start tracing if needed and remember the current allocations to diff against."""
+    global _baseline
+    start()
+    _baseline = take_snapshot()
+
+
+def get_baseline() -> Optional[tracemalloc.Snapshot]:
+    return _baseline
+
+
+def clear_baseline() -> None:
+    global _baseline
+    _baseline = None
+
+
+class MemoryMiddleware:
+    """ASGI middleware logging per-request allocation reports; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        before = take_snapshot()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        report = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and not report:
+                current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+                peak = peak_bytes - start_bytes
+                report.update(
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=message["status"],
+                    peak_bytes=peak,
+                    allocated_bytes=current_bytes - start_bytes,
+                    top=diff_sites(take_snapshot(), before, settings.MEMORY_TOP_SITES),
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-memory-peak", str(peak).encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if report:
+                logger.info(json.dumps(report))
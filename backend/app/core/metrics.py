@@ -0,0 +1,186 @@
+"""
+In-process metrics exported in Prometheus text format at /metrics.
+
+Metrics are only updated from the event loop thread, so plain dicts, lists
+and ints are enough: an update is a dict lookup, a bisect and two additions,
+with no locks. /metrics reads them from the same thread.
+"""
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from half a millisecond to ten seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class HistogramFamily:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], bounds: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.bounds = bounds
+        self.children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = Histogram(self.bounds)
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_value(bound) for bound in self.bounds] + ["+Inf"]
+        for values, child in sorted(self.children.items()):
+            labels = _format_labels(self.labelnames, values)
+            prefix = labels[:-1] + "," if labels else "{"
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CounterFamily:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.values[values] = self.values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+QUERY_DURATION = HistogramFamily(
+    "db_query_duration_seconds", "Latency of database queries by query name.", ("query",), LATENCY_BUCKETS
+)
+QUERY_ROWS = HistogramFamily(
+    "db_query_rows", "Rows returned or affected by database queries by query name.", ("query",), ROW_BUCKETS
+)
+QUERY_ERRORS = CounterFamily(
+    "db_query_errors_total", "Database queries that raised, by query name and error.", ("query", "error")
+)
+SLOW_QUERIES = CounterFamily(
+    "db_slow_queries_total", "Database queries slower than SLOW_QUERY_MS, by query name.", ("query",)
+)
+POOL_ACQUIRE = HistogramFamily(
+    "db_pool_acquire_seconds", "Time spent waiting for a pooled connection.", (), LATENCY_BUCKETS
+)
+LOOP_LAG = HistogramFamily(
+    "event_loop_lag_seconds", "How late the event loop monitor woke up.", (), LATENCY_BUCKETS
+)
+LOOP_BLOCKED = CounterFamily(
+    "event_loop_blocked_total", "Times the event loop lag crossed LOOP_LAG_THRESHOLD_MS.", ()
+)
+REQUEST_DURATION = HistogramFamily(
+    "http_request_duration_seconds", "Latency of HTTP requests by route.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+
+REGISTRY = [
+    QUERY_DURATION, QUERY_ROWS, QUERY_ERRORS, SLOW_QUERIES, POOL_ACQUIRE, LOOP_LAG, LOOP_BLOCKED, REQUEST_DURATION
+]
+
+
+def render() -> str:
+    """Render every metric in Prometheus text exposition format."""
+    lines: List[str] = []
+    for family in REGISTRY:
+        lines.extend(family.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Drop all recorded values."""
+    for family in REGISTRY:
+        if isinstance(family, HistogramFamily):
+            family.children.clear()
+        else:
+            family.values.clear()
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, e.g. /api/v1/projects/{project_id}.
+
+    Rebuilt from the path parameters so it doesn't depend on how routers were
+    included. Unmatched paths share one label so scanners can't blow up the
+    number of series.
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    position = 0
+    for name, value in scope.get("path_params", {}).items():
+        value = str(value)
+        for index in range(position, len(segments)):
+            if segments[index] == value:
+                segments[index] = "{" + name + "}"
+                position = index + 1
+                break
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template, e.g. /api/v1/projects/{project_id}."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status_code)).observe(
+                perf_counter() - start
+            )
@@ -0,0 +1,160 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request sent with an `X-Profile: 1` header or a `profile=1` query
+parameter asks to be profiled. ProfilerMiddleware notes the request, and
+get_current_user starts profiling once it has loaded the user, only for
+superusers. The request is profiled from that point until its response
+starts.
+
+A sampler thread reads the event loop thread's stack every
+PROFILE_INTERVAL_MS. Samples where the request's own coroutines are running
+are kept from the middleware frame down. Samples where something else is
+running on the loop count as "[not running]": the request is waiting on
+I/O or for its turn. The result is saved in collapsed stack format
+(`frame;frame;frame count`), which speedscope and flamegraph.pl read. The
+response carries the profile's id in an X-Profile header.
+
+At most PROFILE_MAX_CONCURRENT requests are profiled at once per worker.
+Further requests run normally and get `X-Profile: busy`.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+
+NOT_RUNNING = "[not running]"
+
+_semaphore = threading.BoundedSemaphore(settings.PROFILE_MAX_CONCURRENT)
+_request: ContextVar[Optional["ProfiledRequest"]] = ContextVar("profiled_request", default=None)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """Thread sampling the stacks of one thread that pass through a given frame."""
+
+    def __init__(self, thread_id: int, root_frame, interval: float):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root_frame:
+                stack.append(_label(frame))
+                frame = frame.f_back
+            if frame is None:
+                self.samples[NOT_RUNNING] += 1
+            else:
+                stack.append(_label(frame))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfiledRequest:
+    """A request that asked to be profiled."""
+    __slots__ = ("root_frame", "sampler", "status")
+
+    def __init__(self, root_frame):
+        self.root_frame = root_frame
+        self.sampler: Optional[Sampler] = None
+        # Reported in the X-Profile header when no profile was taken
+        self.status = "denied"
+
+
+def authorize(user: Dict) -> None:
+    """Start profiling the current request if it asked for it and `user` is a superuser."""
+    request = _request.get()
+    if request is None or request.sampler is not None or not user.get("is_superuser"):
+        return
+    if not _semaphore.acquire(blocking=False):
+        request.status = "busy"
+        return
+    request.sampler = Sampler(
+        threading.get_ident(), request.root_frame, settings.PROFILE_INTERVAL_MS / 1000
+    )
+    request.sampler.start()
+
+
+def profile_path(profile_id: str) -> Path:
+    return Path(settings.PROFILE_DIR) / f"{profile_id}.collapsed"
+
+
+def _save(sampler: Sampler) -> str:
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = profile_path(profile_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sampler.collapsed())
+    return profile_id
+
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value == b"1"
+    query = scope.get("query_string", b"")
+    return b"profile=" in query and parse_qs(query.decode("latin-1")).get("profile") == ["1"]
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling requests that ask for it; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request = ProfiledRequest(sys._getframe())
+        token = _request.set(request)
+
+        def finish() -> str:
+            sampler, request.sampler = request.sampler, None
+            if sampler is None:
+                return request.status
+            try:
+                sampler.stop()
+                return _save(sampler)
+            finally:
+                _semaphore.release()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile", finish().encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request.reset(token)
+            finish()
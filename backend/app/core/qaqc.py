@@ -0,0 +1,131 @@
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+# QC flags written to lab_results.qc_flags
+FLAG_RPD = "rpd_exceeded"
+FLAG_BLANK_CONTAMINATION = "blank_contamination"
+FLAG_BLANK_DETECTED = "blank_detected"
+FLAG_SURROGATE_RECOVERY = "surrogate_recovery"
+FLAG_HOLDING_TIME = "holding_time_exceeded"
+
+# Field duplicate relative percent difference limit
+RPD_LIMIT = 20.0
+
+# Acceptable surrogate recovery window, in percent
+SURROGATE_RECOVERY_WINDOW = (70.0, 130.0)
+
+# Holding times in days between collection and analysis
+DEFAULT_HOLDING_DAYS = 14
+HOLDING_DAYS = {
+    "hexavalent chromium": 1,
+    "mercury": 28,
+    "lead": 180,
+    "asbestos": 365,
+}
+
+DAY_MS = 24 * 3600 * 1000
+
+
+class QCBatch(NamedTuple):
+    """Column arrays for one lab batch, one element per result row."""
+    sample_ids: np.ndarray       # int64, -1 for lab QC rows without a sample
+    parent_ids: np.ndarray       # int64, the original sample of a field duplicate, else -1
+    result_types: np.ndarray     # str: "sample", "method_blank" or "surrogate"
+    analytes: np.ndarray         # str
+    values: np.ndarray           # float64, NaN when not reported
+    reporting_limits: np.ndarray # float64, NaN when not reported
+    spike_amounts: np.ndarray    # float64, NaN when not reported
+    collected_at: np.ndarray     # int64 epoch ms, -1 when unknown
+    analyzed_at: np.ndarray      # int64 epoch ms
+
+
+def _field_duplicate_rpd(batch: QCBatch, is_sample: np.ndarray, analyte_codes: np.ndarray) -> np.ndarray:
+    """Flag both results of every field duplicate pair whose RPD exceeds the limit."""
+    mask = np.zeros(batch.values.size, dtype=bool)
+    duplicates = np.flatnonzero(is_sample & (batch.parent_ids >= 0))
+    if duplicates.size == 0:
+        return mask
+
+    # Index sample results by (sample, analyte) and look up each duplicate's original
+    n_analytes = int(analyte_codes.max()) + 1
+    keys = batch.sample_ids * n_analytes + analyte_codes
+    originals = np.flatnonzero(is_sample)
+    originals = originals[np.argsort(keys[originals], kind="stable")]
+    sorted_keys = keys[originals]
+
+    parent_keys = batch.parent_ids[duplicates] * n_analytes + analyte_codes[duplicates]
+    positions = np.searchsorted(sorted_keys, parent_keys).clip(max=sorted_keys.size - 1)
+    matched = sorted_keys[positions] == parent_keys
+    duplicates = duplicates[matched]
+    parents = originals[positions[matched]]
+
+    a, b = batch.values[duplicates], batch.values[parents]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rpd = np.abs(a - b) / ((a + b) / 2) * 100
+    exceeded = np.nan_to_num(rpd, nan=0.0, posinf=0.0) > RPD_LIMIT
+
+    mask[duplicates[exceeded]] = True
+    mask[parents[exceeded]] = True
+    return mask
+
+
+def run_qc(batch: QCBatch) -> Dict[str, np.ndarray]:
+    """Run all QC checks over a batch and return a boolean mask per flag."""
+    size = batch.values.size
+    if size == 0:
+        return {}
+
+    # Lowercase the distinct names only, then fold case variants onto one code
+    raw_names, raw_codes = np.unique(batch.analytes, return_inverse=True)
+    analyte_names, folded = np.unique(np.char.lower(raw_names.astype(str)), return_inverse=True)
+    analyte_codes = folded[raw_codes]
+    is_sample = batch.result_types == "sample"
+    is_blank = batch.result_types == "method_blank"
+    is_surrogate = batch.result_types == "surrogate"
+    has_value = ~np.isnan(batch.values)
+    masks = {}
+
+    masks[FLAG_RPD] = _field_duplicate_rpd(batch, is_sample, analyte_codes)
+
+    # Method blanks: any detection above the reporting limit (or above zero
+    # when no limit was reported) contaminates that analyte for the whole batch
+    limits = np.where(np.isnan(batch.reporting_limits), 0.0, batch.reporting_limits)
+    contaminated = is_blank & has_value & (np.nan_to_num(batch.values) > limits)
+    masks[FLAG_BLANK_CONTAMINATION] = contaminated
+    masks[FLAG_BLANK_DETECTED] = is_sample & np.isin(analyte_codes, analyte_codes[contaminated])
+
+    # Surrogates: recovery outside the window flags the surrogate and its sample's results
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recovery = batch.values / batch.spike_amounts * 100
+    low, high = SURROGATE_RECOVERY_WINDOW
+    failed = is_surrogate & ~np.isnan(recovery) & ((recovery < low) | (recovery > high))
+    failed_samples = batch.sample_ids[failed]
+    masks[FLAG_SURROGATE_RECOVERY] = failed | (
+        is_sample & (batch.sample_ids >= 0) & np.isin(batch.sample_ids, failed_samples)
+    )
+
+    # Holding time from collection to analysis, looked up once per distinct analyte
+    holding_days = np.array(
+        [HOLDING_DAYS.get(name, DEFAULT_HOLDING_DAYS) for name in analyte_names.tolist()],
+        dtype=np.int64
+    )
+    limit_ms = holding_days[analyte_codes] * DAY_MS
+    masks[FLAG_HOLDING_TIME] = (batch.collected_at >= 0) & (
+        batch.analyzed_at - batch.collected_at > limit_ms
+    )
+
+    return {flag: mask for flag, mask in masks.items() if mask.any()}
+
+
+def flag_lists(masks: Dict[str, np.ndarray], size: int) -> List[List[str]]:
+    """Turn per-flag masks into the list of flags for each row."""
+    names = list(masks)
+    bits = np.zeros(size, dtype=np.int64)
+    for bit, name in enumerate(names):
+        bits |= masks[name].astype(np.int64) << bit
+
+    # Build each distinct flag combination once and share it between rows
+    combos, codes = np.unique(bits, return_inverse=True)
+    lists = [[name for bit, name in enumerate(names) if combo >> bit & 1] for combo in combos.tolist()]
+    return [list(lists[code]) for code in codes.tolist()]
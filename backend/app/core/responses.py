@@ -0,0 +1,65 @@
+"""
+JSON responses rendered with orjson.
+
+FastJSONResponse is the app's default response class. How a route's body
+gets rendered depends on what it returns:
+- Routes with a response_model keep FastAPI's direct path: the model is
+  dumped straight to JSON bytes by pydantic-core (`serialize_json`) and
+  sent in a plain Response, so this class isn't involved. Setting
+  response_class on such a route turns that off, since FastAPI then dumps
+  the model to Python objects first and lets the class encode them; don't.
+- Routes without a response_model (plain dicts, status messages) and
+  handlers that build a response themselves are rendered by orjson, which
+  encodes datetime, date, UUID and dataclasses natively and is several
+  times faster than json.dumps.
+
+orjson doesn't know about Pydantic models or Decimal; `_default` covers
+those for handlers that pass them to the response directly.
+
+MsgpackResponse encodes the same content as MessagePack, for the bulk
+formats in app.core.formats.
+"""
+from decimal import Decimal
+from typing import Any, MutableMapping
+
+import msgpack
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# Non-string dict keys (e.g. ids) are written as strings, like json.dumps does
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes."""
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+def add_vary(headers: MutableMapping[str, str], field: str) -> None:
+    """Add a request header to Vary, keeping the ones already listed."""
+    existing = headers.get("vary")
+    headers["vary"] = f"{existing}, {field}" if existing else field
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MsgpackResponse(Response):
+    """Response encoding JSON-compatible content as MessagePack."""
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default)
@@ -7,6 +7,8 @@ from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 from app.db.session import get_db
 from app.db.queries.manager import query_manager
+from app.core import profiler
+from app.core.timing import phase, set_user, AUTH, HASHING
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -61,51 +63,60 @@ def verify_refresh_token(token: str) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with phase(HASHING):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with phase(HASHING):
+        return pwd_context.hash(password)
 
 
-async def get_current_user(
-    db = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> Dict:
+def decode_access_token(token: str) -> Dict:
+    """Verify an access token and return its claims; it must name a subject."""
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
     except jwt.JWTError:
+        payload = {}
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
+    return payload
+
+
+async def get_current_user(
+    db = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Dict:
+    with phase(AUTH):
+        payload = decode_access_token(token)
+        email: str = payload["sub"]
     
-    # Query user using the SQL query manager
-    user = await db.fetchrow(query_manager.get_user_by_email, email)
+        # Query user using the SQL query manager
+        user = await db.fetchrow(query_manager.get_user_by_email, email)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    if not user["is_active"]:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Inactive user",
-        )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        if not user["is_active"]:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Inactive user",
+            )
     
-    # Convert user to dict and add any additional claims from the token
-    user_dict = dict(user)
-    if "is_superuser" in payload:
-        user_dict["is_superuser"] = payload["is_superuser"]
-    # Always load roles with permissions from DB
-    roles = await db.fetch(query_manager.get_user_roles_with_permissions, user["id"])
-    user_dict["roles"] = [dict(row) for row in roles]
-    return user_dict
+        # Convert user to dict and add any additional claims from the token
+        user_dict = dict(user)
+        if "is_superuser" in payload:
+            user_dict["is_superuser"] = payload["is_superuser"]
+        # Always load roles with permissions from DB
+        roles = await db.fetch(query_manager.get_user_roles_with_permissions, user["id"])
+        user_dict["roles"] = [dict(row) for row in roles]
+        set_user(user["id"])
+        # Checked against the database rather than the token's claims
+        profiler.authorize(user)
+        return user_dict
@@ -0,0 +1,85 @@
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Readings are grouped into fixed, epoch-aligned chunks. Within a chunk the
+# timestamps are stored as int32 millisecond deltas (the first one relative to
+# the chunk start) and the values as float32, each zlib-compressed.
+TIMESTAMP_DTYPE = np.dtype("<i8")
+DELTA_DTYPE = np.dtype("<i4")
+VALUE_DTYPE = np.dtype("<f4")
+
+# Deltas are int32 milliseconds, so a chunk can't span more than ~24 days;
+# the settings reject a longer MONITORING_CHUNK_SECONDS.
+MAX_CHUNK_MS = np.iinfo(DELTA_DTYPE).max
+
+
+def datetime_to_ms(value: datetime) -> int:
+    """Convert a datetime to epoch milliseconds, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def ms_to_datetime(value: int) -> datetime:
+    """Convert epoch milliseconds to an aware UTC datetime."""
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def chunk_start(timestamps: np.ndarray, chunk_ms: int) -> np.ndarray:
+    """Return the start of the chunk each timestamp falls into."""
+    return timestamps - np.mod(timestamps, chunk_ms)
+
+
+def encode_chunk(start_ms: int, timestamps: np.ndarray, values: np.ndarray) -> Tuple[bytes, bytes]:
+    """Pack sorted timestamps and values into compressed blobs."""
+    deltas = np.diff(timestamps.astype(TIMESTAMP_DTYPE), prepend=start_ms)
+    return (
+        zlib.compress(deltas.astype(DELTA_DTYPE).tobytes()),
+        zlib.compress(values.astype(VALUE_DTYPE).tobytes()),
+    )
+
+
+def decode_chunk(start_ms: int, ts_data: bytes, value_data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Unpack blobs written by encode_chunk."""
+    deltas = np.frombuffer(zlib.decompress(ts_data), dtype=DELTA_DTYPE)
+    timestamps = np.cumsum(deltas, dtype=TIMESTAMP_DTYPE) + start_ms
+    values = np.frombuffer(zlib.decompress(value_data), dtype=VALUE_DTYPE)
+    return timestamps, values
+
+
+def merge_readings(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    new_timestamps: np.ndarray,
+    new_values: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge two sets of readings, sorted by time. New readings win on duplicate timestamps."""
+    all_ts = np.concatenate([new_timestamps, timestamps]).astype(TIMESTAMP_DTYPE)
+    all_values = np.concatenate([new_values, values]).astype(VALUE_DTYPE)
+    # np.unique keeps the first occurrence, which is the new reading
+    unique_ts, index = np.unique(all_ts, return_index=True)
+    return unique_ts, all_values[index]
+
+
+def split_into_chunks(
+    timestamps: np.ndarray, values: np.ndarray, chunk_ms: int
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (chunk_start, timestamps, values) for each chunk touched by the readings."""
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    values = values[order]
+    starts = chunk_start(timestamps, chunk_ms)
+    boundaries = np.flatnonzero(np.diff(starts)) + 1
+    for ts_part, value_part in zip(np.split(timestamps, boundaries), np.split(values, boundaries)):
+        yield int(ts_part[0] - ts_part[0] % chunk_ms), ts_part, value_part
+
+
+def slice_range(
+    timestamps: np.ndarray, values: np.ndarray, start_ms: int, end_ms: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return readings in [start_ms, end_ms) from sorted arrays."""
+    lo, hi = np.searchsorted(timestamps, [start_ms, end_ms])
+    return timestamps[lo:hi], values[lo:hi]
@@ -1,11 +1,38 @@
+import asyncio
+from typing import Optional
+
 import asyncpg
 from app.core.config import settings
+from app.db.instrumentation import create_pool
+
+# This worker's pool, shared by all of its requests
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
 
 # Create connection pool for raw SQL
 async def get_connection():
     """Get a database connection from the pool."""
-    return await asyncpg.create_pool(
+    instrumented = settings.METRICS_ENABLED or settings.SERVER_TIMING_ENABLED or settings.SLOW_QUERY_MS > 0
+    factory = create_pool if instrumented else asyncpg.create_pool
+    return await factory(
         dsn=settings.get_database_url,
-        min_size=1,
-        max_size=10
-    ) 
\ No newline at end of file
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE
+    )
+
+
+async def open_pool() -> asyncpg.Pool:
+    """Open this worker's pool, or return it if it is already open."""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await get_connection()
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close this worker's pool, waiting for connections in use to be released."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
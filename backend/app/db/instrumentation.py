@@ -0,0 +1,127 @@
+from time import perf_counter
+
+from asyncpg import Connection, Record
+from asyncpg.pool import Pool
+
+from app.core import metrics
+from app.core.timing import phase, DB
+from app.db import slow_queries
+from app.db.queries.manager import QUERY_NAMES
+
+
+def _status_rows(status: str) -> int:
+    """Rows affected according to a command status such as 'UPDATE 3'."""
+    count = status.rpartition(" ")[2]
+    return int(count) if count.isdigit() else 0
+
+
+class InstrumentedConnection(Connection):
+    """
+    Connection recording latency, row counts and errors of named queries.
+
+    Only queries loaded by SQLQueryManager are recorded, keyed by their name.
+    Other SQL, such as transaction control and connection resets, passes
+    straight through. Slow named queries are also handed to slow_queries.
+    """
+
+    async def _observe(self, name, query, args, call, rows_of):
+        start = perf_counter()
+        try:
+            with phase(DB):
+                result = await call
+        except BaseException as e:
+            metrics.QUERY_ERRORS.inc(name, type(e).__name__)
+            raise
+        duration = perf_counter() - start
+        metrics.QUERY_DURATION.labels(name).observe(duration)
+        metrics.QUERY_ROWS.labels(name).observe(rows_of(result))
+        slow_queries.observe(name, query, args, duration)
+        return result
+
+    async def fetch(self, query, *args, **kwargs):
+        name = QUERY_NAMES.get(query)
+        if name is None:
+            with phase(DB):
+                return await super().fetch(query, *args, **kwargs)
+        return await self._observe(name, query, args, super().fetch(query, *args, **kwargs), len)
+
+    async def fetchrow(self, query, *args, **kwargs):
+        name = QUERY_NAMES.get(query)
+        if name is None:
+            with phase(DB):
+                return await super().fetchrow(query, *args, **kwargs)
+        return await self._observe(name, query, args, super().fetchrow(query, *args, **kwargs), _one_if_present)
+
+    async def fetchval(self, query, *args, **kwargs):
+        name = QUERY_NAMES.get(query)
+        if name is None:
+            with phase(DB):
+                return await super().fetchval(query, *args, **kwargs)
+        return await self._observe(name, query, args, super().fetchval(query, *args, **kwargs), _one_if_present)
+
+    async def execute(self, query, *args, **kwargs):
+        name = QUERY_NAMES.get(query)
+        if name is None:
+            with phase(DB):
+                return await super().execute(query, *args, **kwargs)
+        return await self._observe(name, query, args, super().execute(query, *args, **kwargs), _status_rows)
+
+    async def executemany(self, command, args, **kwargs):
+        name = QUERY_NAMES.get(command)
+        if name is None:
+            with phase(DB):
+                return await super().executemany(command, args, **kwargs)
+        return await self._observe(name, command, None, super().executemany(command, args, **kwargs), _zero)
+
+
+def _one_if_present(result) -> int:
+    return 0 if result is None else 1
+
+
+def _zero(result) -> int:
+    return 0
+
+
+class InstrumentedPool(Pool):
+    """
+    Pool recording how long callers wait for a connection.
+
+    Pool._acquire and the Pool constructor's keywords are asyncpg internals,
+    which is why requirements.txt pins asyncpg to the minor version this was
+    tested with; check this class when raising the pin.
+    """
+
+    async def _acquire(self, timeout):
+        start = perf_counter()
+        try:
+            with phase(DB):
+                return await super()._acquire(timeout)
+        finally:
+            metrics.POOL_ACQUIRE.labels().observe(perf_counter() - start)
+
+
+def create_pool(
+    dsn: str,
+    *,
+    min_size: int = 10,
+    max_size: int = 10,
+    max_queries: int = 50000,
+    max_inactive_connection_lifetime: float = 300.0,
+    **connect_kwargs
+) -> InstrumentedPool:
+    """Same as asyncpg.create_pool, with instrumented pool and connection classes."""
+    return InstrumentedPool(
+        dsn,
+        connection_class=InstrumentedConnection,
+        record_class=Record,
+        min_size=min_size,
+        max_size=max_size,
+        max_queries=max_queries,
+        max_inactive_connection_lifetime=max_inactive_connection_lifetime,
+        loop=None,
+        connect=None,
+        setup=None,
+        init=None,
+        reset=None,
+        **connect_kwargs
+    )
@@ -1,40 +1,298 @@
+"""
+SQL migration runner.
+
+Every worker runs this at startup, so the common case, nothing to do, costs
+one query: the applied migrations and their checksums are read in one go and
+compared with the files. Otherwise the runner takes an advisory lock, so
+concurrent workers apply each migration once, reads the applied set again
+and runs each pending migration in its own transaction together with its
+row in the migrations table. A migration that fails leaves nothing behind.
+
+A migration file that changed after it was applied fails the run, since the
+database no longer matches what the file says. Fix forward with a new
+migration instead of editing an applied one.
+
+Online schema changes
+---------------------
+A migration whose header (the comments before its first statement) has
+
+    -- migrate: no-transaction
+
+runs its statements one at a time outside a transaction, which is what
+CREATE INDEX CONCURRENTLY needs. Progress is recorded per statement in
+migration_progress, so a run that was interrupted resumes after the last
+statement that finished. An index left invalid by an interrupted concurrent
+build is dropped and built again. Write these statements so they can run
+again safely, e.g. with IF NOT EXISTS.
+
+A statement in such a migration preceded by
+
+    -- migrate: batch size=1000 pause_ms=100
+
+is a batched backfill. It is run again and again, each time in its own
+transaction and with the batch size as $1, until it affects fewer rows than
+that. It sleeps pause_ms between batches so it doesn't starve other writers.
+The statement has to pick rows that still need the change itself:
+
+    UPDATE addresses SET city = ...
+    WHERE id IN (SELECT id FROM addresses WHERE city IS NULL LIMIT $1);
+
+The rows done so far are recorded after every batch.
+
+The advisory lock is held for the whole run, so other workers starting up
+wait for a long index build or backfill to finish. They wait by polling
+pg_try_advisory_lock rather than blocking in pg_advisory_lock: a session
+blocked in a statement holds a snapshot, and CREATE INDEX CONCURRENTLY waits
+for every older snapshot to go away, so the build and the waiting workers
+would deadlock.
+"""
+import asyncio
 import os
+import re
 import logging
 import hashlib
-from app.db.engine import get_connection
+from typing import Dict, List, NamedTuple, Optional
+
+import asyncpg
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+# Advisory lock key held while migrations are applied
+MIGRATION_LOCK_ID = 727_001
+# How long a worker sleeps between attempts to take the lock
+LOCK_POLL_SECONDS = 0.1
+# Opening tag of a dollar-quoted string, like $$ or $body$
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+_DIRECTIVE = re.compile(r"^\s*--\s*migrate:\s*(.*?)\s*$")
+_CONCURRENT_INDEX = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)",
+    re.IGNORECASE
+)
+
+
+class Batch(NamedTuple):
+    size: int
+    pause_ms: int = 0
+
+
 def split_sql_statements(sql: str) -> list[str]:
-    """Split SQL file into individual statements."""
-    # Remove comments
-    lines = []
-    for line in sql.split('\n'):
-        if not line.strip().startswith('--'):
-            lines.append(line)
-    
-    # Join lines and split by semicolon
-    sql_no_comments = '\n'.join(lines)
-    statements = [stmt.strip() for stmt in sql_no_comments.split(';') if stmt.strip()]
-    return statements
+    """Split SQL into statements on the semicolons that end them.
+
+    Semicolons inside quoted strings, quoted identifiers, dollar-quoted
+    bodies (functions, DO blocks) and comments don't end a statement.
+    Comments are kept with the statement that follows them.
+    """
+    statements = []
+    start = i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if char == "-" and sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = length if end < 0 else end + 1
+        elif char == "/" and sql.startswith("/*", i):
+            # Block comments nest in Postgres
+            depth, i = 1, i + 2
+            while i < length and depth:
+                if sql.startswith("/*", i):
+                    depth, i = depth + 1, i + 2
+                elif sql.startswith("*/", i):
+                    depth, i = depth - 1, i + 2
+                else:
+                    i += 1
+        elif char in "'\"":
+            # A doubled quote is an escaped quote, which this reads as two adjacent strings
+            end = sql.find(char, i + 1)
+            i = length if end < 0 else end + 1
+        elif char == "$" and _DOLLAR_TAG.match(sql, i):
+            tag = _DOLLAR_TAG.match(sql, i).group()
+            end = sql.find(tag, i + len(tag))
+            i = length if end < 0 else end + len(tag)
+        elif char == ";":
+            statements.append(sql[start:i])
+            start = i = i + 1
+        else:
+            i += 1
+    statements.append(sql[start:])
+    return [statement.strip() for statement in statements if _has_code(statement)]
+
+
+def _has_code(statement: str) -> bool:
+    """Whether a statement has anything besides whitespace and line comments."""
+    return any(line.strip() and not line.strip().startswith("--") for line in statement.splitlines())
+
+
+def _directives(lines: List[str]) -> List[str]:
+    """The `-- migrate:` directives in the comment lines leading a block of SQL."""
+    directives = []
+    for line in lines:
+        if line.strip() and not line.strip().startswith("--"):
+            break
+        found = _DIRECTIVE.match(line)
+        if found:
+            directives.append(found.group(1))
+    return directives
+
+
+def is_transactional(sql: str) -> bool:
+    """Whether a migration runs in a transaction, i.e. its header has no `no-transaction` directive."""
+    return "no-transaction" not in _directives(sql.splitlines())
+
+
+def batch_of(statement: str) -> Optional[Batch]:
+    """The batch directive in front of a statement, if any."""
+    for directive in _directives(statement.splitlines()):
+        words = directive.split()
+        if not words or words[0] != "batch":
+            continue
+        options = dict(word.split("=", 1) for word in words[1:])
+        unknown = options.keys() - Batch._fields
+        if unknown or "size" not in options:
+            raise ValueError(f"Invalid batch directive {directive!r}; expected 'batch size=N [pause_ms=N]'")
+        return Batch(**{key: int(value) for key, value in options.items()})
+    return None
+
 
 def calculate_checksum(content: str) -> str:
     """Calculate SHA-256 checksum of content."""
     return hashlib.sha256(content.encode()).hexdigest()
 
-async def run_migrations():
-    """Run all SQL migrations in the migrations directory."""
-    migrations_dir = os.path.join(os.path.dirname(__file__), "migrations")
-    
-    # Get all SQL files and sort them
-    migration_files = sorted([f for f in os.listdir(migrations_dir) if f.endswith('.sql')])
-    
-    # Create connection pool
-    pool = await get_connection()
-    
+
+def _read_migrations() -> Dict[str, str]:
+    """SQL of every migration file by name, in the order they apply."""
+    migrations = {}
+    for name in sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql")):
+        with open(os.path.join(MIGRATIONS_DIR, name), "r") as f:
+            migrations[name] = f.read()
+    return migrations
+
+
+async def _applied(conn: asyncpg.Connection) -> Optional[Dict[str, str]]:
+    """Checksums of applied migrations by name, or None before the first migration."""
+    try:
+        return dict(await conn.fetch("SELECT name, checksum FROM migrations"))
+    except asyncpg.UndefinedTableError:
+        return None
+
+
+async def _drop_invalid_index(conn: asyncpg.Connection, statement: str) -> None:
+    """Drop the index a concurrent build left invalid, so the build can start over."""
+    code = [line for line in statement.splitlines() if not line.strip().startswith("--")]
+    found = _CONCURRENT_INDEX.match("\n".join(code).strip())
+    if not found:
+        return
+    name = found.group(1)
+    invalid = await conn.fetchval(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name
+    )
+    if invalid:
+        logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+async def _run_batched(conn: asyncpg.Connection, name: str, index: int, statement: str, batch: Batch) -> None:
+    while True:
+        async with conn.transaction():
+            status = await conn.execute(statement, batch.size)
+            rows = int(status.rsplit(" ", 1)[-1])
+            await conn.execute(
+                "UPDATE migration_progress SET rows_done = rows_done + $3, updated_at = CURRENT_TIMESTAMP "
+                "WHERE name = $1 AND statement = $2",
+                name, index, rows
+            )
+        logger.debug(f"Migration {name} statement {index}: batch of {rows} rows")
+        if rows < batch.size:
+            return
+        if batch.pause_ms:
+            await asyncio.sleep(batch.pause_ms / 1000)
+
+
+async def _apply_online(conn: asyncpg.Connection, name: str, sql: str) -> None:
+    """Run a no-transaction migration statement by statement, resuming where a previous run stopped."""
+    checksum = calculate_checksum(sql)
+    # Progress recorded for another version of the file doesn't apply
+    await conn.execute("DELETE FROM migration_progress WHERE name = $1 AND checksum <> $2", name, checksum)
+    progress = {
+        row["statement"]: row
+        for row in await conn.fetch("SELECT * FROM migration_progress WHERE name = $1", name)
+    }
+
+    for index, statement in enumerate(split_sql_statements(sql)):
+        row = progress.get(index)
+        if row is not None and row["completed_at"] is not None:
+            continue
+        if row is None:
+            await conn.execute(
+                "INSERT INTO migration_progress (name, statement, checksum) VALUES ($1, $2, $3)",
+                name, index, checksum
+            )
+        elif row["rows_done"]:
+            logger.info(f"Resuming migration {name} statement {index} after {row['rows_done']} rows")
+
+        batch = batch_of(statement)
+        if batch is not None:
+            await _run_batched(conn, name, index, statement, batch)
+        else:
+            await _drop_invalid_index(conn, statement)
+            await conn.execute(statement)
+        await conn.execute(
+            "UPDATE migration_progress SET completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP "
+            "WHERE name = $1 AND statement = $2",
+            name, index
+        )
+
+    async with conn.transaction():
+        await conn.execute("INSERT INTO migrations (name, checksum) VALUES ($1, $2)", name, checksum)
+        await conn.execute("DELETE FROM migration_progress WHERE name = $1", name)
+
+
+async def _apply(conn: asyncpg.Connection, name: str, sql: str) -> None:
+    statements = split_sql_statements(sql)
+    if any(batch_of(statement) for statement in statements):
+        raise ValueError(f"Migration {name} has batched statements, so it needs '-- migrate: no-transaction'")
+    async with conn.transaction():
+        for statement in statements:
+            await conn.execute(statement)
+        await conn.execute(
+            "INSERT INTO migrations (name, checksum) VALUES ($1, $2)",
+            name, calculate_checksum(sql)
+        )
+
+
+async def _lock(conn: asyncpg.Connection) -> None:
+    """Take the migration lock, polling so no snapshot is held while waiting."""
+    while not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MIGRATION_LOCK_ID):
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+
+
+def _pending(migrations: Dict[str, str], applied: Dict[str, str]) -> List[str]:
+    """Migrations still to apply; raises if an applied migration's file has changed."""
+    for name, checksum in applied.items():
+        if name in migrations and calculate_checksum(migrations[name]) != checksum:
+            raise RuntimeError(
+                f"Migration {name} was changed after it was applied (checksum {checksum} in the database)"
+            )
+    return [name for name in migrations if name not in applied]
+
+
+async def run_migrations(dsn: Optional[str] = None) -> List[str]:
+    """Apply pending migrations and return their names.
+
+    Migrates the configured database unless a DSN is given.
+    """
+    migrations = _read_migrations()
+    conn = await asyncpg.connect(dsn or settings.get_database_url)
     try:
-        async with pool.acquire() as conn:
-            # First, ensure migrations table exists
+        applied = await _applied(conn)
+        if applied is not None and not _pending(migrations, applied):
+            logger.info("All %d migrations already applied", len(applied))
+            return []
+
+        await _lock(conn)
+        try:
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS migrations (
                     id SERIAL PRIMARY KEY,
@@ -43,46 +301,32 @@ async def run_migrations():
                     checksum VARCHAR(64) NOT NULL
                 );
                 CREATE INDEX IF NOT EXISTS idx_migrations_name ON migrations(name);
+                CREATE TABLE IF NOT EXISTS migration_progress (
+                    name VARCHAR(255) NOT NULL,
+                    statement INTEGER NOT NULL,
+                    checksum VARCHAR(64) NOT NULL,
+                    rows_done BIGINT NOT NULL DEFAULT 0,
+                    completed_at TIMESTAMP WITH TIME ZONE,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (name, statement)
+                );
             """)
-            
-            for migration_file in migration_files:
-                # Check if migration has already been applied
-                applied = await conn.fetchval(
-                    "SELECT EXISTS(SELECT 1 FROM migrations WHERE name = $1)",
-                    migration_file
-                )
-                
-                if applied:
-                    logger.info(f"Skipping already applied migration: {migration_file}")
-                    continue
-                
-                logger.info(f"Running migration: {migration_file}")
-                file_path = os.path.join(migrations_dir, migration_file)
-                
-                with open(file_path, 'r') as f:
-                    sql = f.read()
-                
-                # Calculate checksum of migration file
-                checksum = calculate_checksum(sql)
-                
-                # Split SQL into individual statements
-                statements = split_sql_statements(sql)
-                
-                # Execute each statement separately
-                for statement in statements:
-                    if statement:  # Skip empty statements
-                        await conn.execute(statement)
-                
-                # Record the migration
-                await conn.execute(
-                    "INSERT INTO migrations (name, checksum) VALUES ($1, $2)",
-                    migration_file, checksum
-                )
-                
-                logger.info(f"Completed migration: {migration_file}")
+            # Another worker may have applied some while this one waited for the lock
+            pending = _pending(migrations, await _applied(conn))
+            for name in pending:
+                logger.info(f"Running migration: {name}")
+                if is_transactional(migrations[name]):
+                    await _apply(conn, name, migrations[name])
+                else:
+                    await _apply_online(conn, name, migrations[name])
+                logger.info(f"Completed migration: {name}")
+            return pending
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
     finally:
-        await pool.close()
+        await conn.close()
+
 
 if __name__ == "__main__":
     import asyncio
-    asyncio.run(run_migrations()) 
\ No newline at end of file
+    asyncio.run(run_migrations())
@@ -0,0 +1,22 @@
+-- Create monitoring_chunks table for continuous air-monitoring readings.
+-- Each row holds every reading of one metric at one address within a fixed
+-- time window, packed as compressed delta-encoded timestamps and float32 values.
+CREATE TABLE IF NOT EXISTS monitoring_chunks (
+    id BIGSERIAL PRIMARY KEY,
+    address_id INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
+    metric VARCHAR(50) NOT NULL,
+    chunk_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    chunk_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    reading_count INTEGER NOT NULL,
+    min_value REAL,
+    max_value REAL,
+    ts_data BYTEA NOT NULL,
+    value_data BYTEA NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_monitoring_chunk UNIQUE (address_id, metric, chunk_start)
+);
+
+-- Add index on chunk_end so range reads only touch overlapping chunks
+CREATE INDEX IF NOT EXISTS idx_monitoring_chunks_end ON monitoring_chunks(address_id, metric, chunk_end);
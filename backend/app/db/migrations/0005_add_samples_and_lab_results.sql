@@ -0,0 +1,42 @@
+-- Create samples table. Samples are linked to their address through
+-- addresses.sample_ids, the same way addresses are linked to projects.
+CREATE TABLE IF NOT EXISTS samples (
+    id SERIAL PRIMARY KEY,
+    barcode VARCHAR(64) UNIQUE NOT NULL,
+    sample_type VARCHAR(20) NOT NULL DEFAULT 'field',
+    parent_sample_id INTEGER REFERENCES samples(id) ON DELETE SET NULL,
+    collected_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_sample_type CHECK (sample_type IN ('field', 'field_duplicate')),
+    CONSTRAINT duplicate_has_parent CHECK (sample_type = 'field' OR parent_sample_id IS NOT NULL)
+);
+
+-- Create lab_batches table
+CREATE TABLE IF NOT EXISTS lab_batches (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) UNIQUE NOT NULL,
+    imported_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create lab_results table. Method blanks have no sample; surrogates belong
+-- to the sample they were spiked into.
+CREATE TABLE IF NOT EXISTS lab_results (
+    id BIGSERIAL PRIMARY KEY,
+    batch_id INTEGER NOT NULL REFERENCES lab_batches(id) ON DELETE CASCADE,
+    sample_id INTEGER REFERENCES samples(id) ON DELETE CASCADE,
+    result_type VARCHAR(20) NOT NULL DEFAULT 'sample',
+    analyte VARCHAR(100) NOT NULL,
+    value DOUBLE PRECISION,
+    unit VARCHAR(20),
+    reporting_limit DOUBLE PRECISION,
+    spike_amount DOUBLE PRECISION,
+    analyzed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    qc_flags TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_result_type CHECK (result_type IN ('sample', 'method_blank', 'surrogate'))
+);
+
+-- Add indexes for batch and sample lookups
+CREATE INDEX IF NOT EXISTS idx_lab_results_batch_id ON lab_results(batch_id);
+CREATE INDEX IF NOT EXISTS idx_lab_results_sample_id ON lab_results(sample_id);
@@ -0,0 +1,53 @@
+-- Create sample_custody_events table. Every hand-off of a sample is appended
+-- here and never updated or deleted; project_id is copied from the sample's
+-- address so per-project reports don't have to walk the address arrays.
+CREATE TABLE IF NOT EXISTS sample_custody_events (
+    id BIGSERIAL PRIMARY KEY,
+    sample_id INTEGER NOT NULL REFERENCES samples(id),
+    project_id INTEGER NOT NULL REFERENCES projects(id),
+    relinquished_by VARCHAR(255),
+    received_by VARCHAR(255) NOT NULL,
+    holder_role VARCHAR(20) NOT NULL,
+    event_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    recorded_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_holder_role CHECK (holder_role IN ('technician', 'courier', 'lab'))
+);
+
+-- Make the event log append-only: updating or deleting an event fails.
+-- Samples and projects with custody history can't be deleted either, since
+-- their events reference them.
+CREATE OR REPLACE FUNCTION reject_custody_event_change() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'sample_custody_events is append-only; % is not allowed', TG_OP
+        USING ERRCODE = 'restrict_violation';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER sample_custody_events_append_only BEFORE UPDATE OR DELETE ON sample_custody_events
+    FOR EACH ROW EXECUTE FUNCTION reject_custody_event_change();
+
+-- Add index for a sample's custody history
+CREATE INDEX IF NOT EXISTS idx_custody_events_sample ON sample_custody_events(sample_id, event_at, id);
+
+-- Add index for per-project gap reports, ordered the way the chain is walked
+CREATE INDEX IF NOT EXISTS idx_custody_events_project ON sample_custody_events(project_id, sample_id, event_at, id)
+    INCLUDE (relinquished_by, received_by);
+
+-- Create sample_custody_current table holding the latest event of every
+-- sample. It is written in the same transaction as each event.
+CREATE TABLE IF NOT EXISTS sample_custody_current (
+    sample_id INTEGER PRIMARY KEY REFERENCES samples(id) ON DELETE CASCADE,
+    barcode VARCHAR(64) NOT NULL,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    event_id BIGINT NOT NULL,
+    holder VARCHAR(255) NOT NULL,
+    holder_role VARCHAR(20) NOT NULL,
+    since TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Add covering indexes so barcode lookups and project reports are index-only
+CREATE UNIQUE INDEX IF NOT EXISTS idx_custody_current_barcode ON sample_custody_current(barcode)
+    INCLUDE (project_id, holder, holder_role, since);
+CREATE INDEX IF NOT EXISTS idx_custody_current_project ON sample_custody_current(project_id, barcode)
+    INCLUDE (holder, holder_role, since);
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Add index on project_technicians user_id. The primary key leads with
+-- project_id, so listing a technician's projects scanned the whole table.
+-- Built concurrently so assigning and removing technicians isn't blocked.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_project_technicians_user_id ON project_technicians(user_id);
@@ -0,0 +1,2 @@
+-- Add updated_at to roles, which update_role sets but 0001 never created
+ALTER TABLE roles ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,35 @@
+-- Change counters for conditional GETs (app/core/etags.py). Every statement
+-- that writes to a tracked table sets its version to the next value of one
+-- sequence, so versions only grow, even if table_versions is rebuilt.
+CREATE SEQUENCE IF NOT EXISTS table_versions_seq;
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version)
+    VALUES (TG_TABLE_NAME, nextval('table_versions_seq'))
+    ON CONFLICT (table_name) DO UPDATE SET version = EXCLUDED.version;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Once per statement, not per row, so bulk writes bump a version once
+CREATE OR REPLACE TRIGGER users_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER roles_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON roles
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER user_roles_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON user_roles
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER permissions_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON permissions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER role_permissions_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON role_permissions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name, version)
+SELECT name, nextval('table_versions_seq')
+FROM unnest(ARRAY['users', 'roles', 'user_roles', 'permissions', 'role_permissions']) AS name
+ON CONFLICT (table_name) DO NOTHING;
@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+-- GIN indexes on the arrays linking samples to addresses and addresses to
+-- projects. Finding the address of a sample (or the project of an address)
+-- with `sample_ids @> ARRAY[id]` scanned the whole table without them.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_addresses_sample_ids ON addresses USING GIN (sample_ids);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_address_ids ON projects USING GIN (address_ids);
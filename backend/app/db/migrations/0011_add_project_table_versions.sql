@@ -0,0 +1,14 @@
+-- Change counters for projects, their addresses and their technicians, so
+-- project responses can be answered with 304 Not Modified too
+-- (app/core/etags.py; the counters and bump_table_version come from 0009)
+CREATE OR REPLACE TRIGGER projects_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON projects
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER addresses_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON addresses
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE OR REPLACE TRIGGER project_technicians_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON project_technicians
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name, version)
+SELECT name, nextval('table_versions_seq')
+FROM unnest(ARRAY['projects', 'addresses', 'project_technicians']) AS name
+ON CONFLICT (table_name) DO NOTHING;
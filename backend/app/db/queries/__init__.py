@@ -1,6 +1,6 @@
 from pathlib import Path
 import os
-from app.db.queries.manager import SQLQueryManager
+from app.db.queries.manager import query_manager
 
 # Get the directory containing this file
 QUERIES_DIR = Path(__file__).parent
@@ -11,11 +11,12 @@ def load_sql(filename: str) -> str:
     with open(file_path, 'r') as f:
         return f.read()
 
-# Create a query manager instance
-query_manager = SQLQueryManager()
-
 # Expose queries as module-level variables
 users = query_manager
 roles = query_manager
 projects = query_manager
+monitoring = query_manager
+samples = query_manager
+custody = query_manager
+versions = query_manager
 manager = query_manager 
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Compile the named queries in this directory's .sql files into compiled.py.
+
+Each query starts at a `-- name: <name>` line and runs up to the next one.
+Comments right after the name line document the query and are kept;
+comments at the end of a block, like section headings, belong to what
+follows and are dropped. Anything else outside a named query, more than one
+statement in a query or a name used twice fails the build.
+
+Every query is compiled to a Query constant with its parameter count and
+whether it reads, writes or changes the schema, so importing the queries is a
+single module load instead of parsing SQL.
+
+Usage (from backend/), after changing a .sql file:
+    python -m app.db.queries.build           # write compiled.py
+    python -m app.db.queries.build --check   # exit with status 1 if compiled.py is out of date
+"""
+import argparse
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.db.queries.query import DDL, READ, WRITE, Query
+
+QUERIES_DIR = Path(__file__).parent
+COMPILED_PATH = QUERIES_DIR / "compiled.py"
+
+_NAME = re.compile(r"^--\s*name:\s*(\w+)\s*$")
+# Literals, quoted identifiers and comments, whose contents aren't SQL, or a $N parameter
+_TOKEN = re.compile(
+    r"'(?:[^']|'')*'"
+    r"|\"(?:[^\"]|\"\")*\""
+    r"|--[^\n]*"
+    r"|/\*.*?\*/"
+    r"|(\$(?:[A-Za-z_]\w*)?\$).*?\1"
+    r"|\$(\d+)",
+    re.DOTALL
+)
+_DDL = re.compile(r"^\s*(?:CREATE|DROP|ALTER)\b", re.IGNORECASE)
+_WRITE = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b|\bFOR\s+(?:NO\s+KEY\s+UPDATE|KEY\s+SHARE|SHARE)\b"
+    r"|\bpg_advisory_(?:xact_)?lock\w*",
+    re.IGNORECASE
+)
+
+
+def _code(sql: str) -> str:
+    """The SQL with literals and comments blanked out."""
+    return _TOKEN.sub(lambda match: match.group() if match.group(2) else " ", sql)
+
+
+def count_params(sql: str) -> int:
+    """The highest $N parameter the query uses."""
+    numbers = [int(match.group(2)) for match in _TOKEN.finditer(sql) if match.group(2)]
+    return max(numbers, default=0)
+
+
+def classify(sql: str) -> str:
+    """Whether a query reads, writes (or locks) rows, or changes the schema."""
+    code = _code(sql)
+    if _DDL.match(code):
+        return DDL
+    return WRITE if _WRITE.search(code) else READ
+
+
+def _is_code(line: str) -> bool:
+    return bool(line.strip()) and not line.strip().startswith("--")
+
+
+def parse(source: str, content: str) -> List[Query]:
+    """The named queries in one .sql file."""
+    queries = []
+    name: Optional[str] = None
+    lines: List[str] = []
+
+    def finish():
+        # Trailing comments introduce what comes next, not this query
+        while lines and not _is_code(lines[-1]):
+            lines.pop()
+        sql = "\n".join(lines).strip()
+        if not sql:
+            raise ValueError(f"{source}: query {name} is empty")
+        if ";" in _code(sql).strip().rstrip(";"):
+            raise ValueError(f"{source}: query {name} has more than one statement")
+        queries.append(Query(name=name, source=source, params=count_params(sql), kind=classify(sql), sql=sql))
+
+    for number, line in enumerate(content.splitlines(), 1):
+        found = _NAME.match(line.strip())
+        if found:
+            if name is not None:
+                finish()
+            name, lines = found.group(1), []
+        elif name is not None:
+            lines.append(line)
+        elif _is_code(line):
+            raise ValueError(f"{source}:{number}: SQL outside a named query; start it with '-- name: <name>'")
+    if name is not None:
+        finish()
+    return queries
+
+
+def _sql_files() -> List[Path]:
+    return sorted(QUERIES_DIR.glob("*.sql"))
+
+
+def source_checksum() -> str:
+    """Checksum of the .sql files the queries are compiled from."""
+    digest = hashlib.sha256()
+    for path in _sql_files():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compile_queries() -> Dict[str, Query]:
+    """Every named query in the .sql files, by name."""
+    queries: Dict[str, Query] = {}
+    for path in _sql_files():
+        for query in parse(path.name, path.read_text()):
+            if query.name in queries:
+                raise ValueError(f"{path.name}: query {query.name} is already defined in {queries[query.name].source}")
+            queries[query.name] = query
+    return queries
+
+
+def _string(sql: str) -> str:
+    if '"""' in sql or "\\" in sql or sql.endswith('"'):
+        return repr(sql)
+    return f'"""\\\n{sql}"""'
+
+
+def render(queries: Dict[str, Query], checksum: str) -> str:
+    """Source of the compiled module."""
+    out = [
+        "# Generated by `python -m app.db.queries.build` from the .sql files in this directory.",
+        "# Don't edit; change the .sql files and build again.",
+        "from app.db.queries.query import Query",
+        "",
+        f'SOURCE_CHECKSUM = "{checksum}"',
+        "",
+    ]
+    for query in queries.values():
+        out += [
+            f"{query.name.upper()} = Query(",
+            f"    name={query.name!r},",
+            f"    source={query.source!r},",
+            f"    params={query.params},",
+            f"    kind={query.kind!r},",
+            f"    sql={_string(query.sql)},",
+            ")",
+            "",
+        ]
+    out.append("QUERIES = {query.name: query for query in (")
+    out += [f"    {query.name.upper()}," for query in queries.values()]
+    out.append(")}")
+    return "\n".join(out) + "\n"
+
+
+def build() -> str:
+    return render(compile_queries(), source_checksum())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only check that compiled.py is up to date")
+    args = parser.parse_args()
+
+    source = build()
+    current = COMPILED_PATH.read_text() if COMPILED_PATH.exists() else None
+    if args.check:
+        if source != current:
+            print(f"{COMPILED_PATH} is out of date; run python -m app.db.queries.build")
+            return 1
+        return 0
+    if source != current:
+        COMPILED_PATH.write_text(source)
+        print(f"Wrote {COMPILED_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
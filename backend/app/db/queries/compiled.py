@@ -0,0 +1,901 @@
+# Generated by `python -m app.db.queries.build` from the .sql files in this directory.
+# Don't edit; change the .sql files and build again.
+from app.db.queries.query import Query
+
+SOURCE_CHECKSUM = "924660f9dde7d0f67b9ebb62bab749f276ea36f20abac9a6c5d911836d7b6dc7"
+
+GET_CUSTODY_SAMPLES_BY_BARCODES = Query(
+    name='get_custody_samples_by_barcodes',
+    source='custody.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT s.id, s.barcode, p.id AS project_id
+FROM samples s
+JOIN addresses a ON a.sample_ids @> ARRAY[s.id]::integer[]
+JOIN projects p ON p.address_ids @> ARRAY[a.id]::integer[]
+WHERE s.barcode = ANY($1::text[]);""",
+)
+
+RECORD_CUSTODY_EVENTS = Query(
+    name='record_custody_events',
+    source='custody.sql',
+    params=7,
+    kind='write',
+    sql="""\
+-- Append one event per sample and move each sample's current holder forward,
+-- unless a later event was already recorded for it
+WITH events AS (
+    INSERT INTO sample_custody_events (
+        sample_id, project_id, relinquished_by, received_by, holder_role, event_at, recorded_by
+    )
+    SELECT sample_id, project_id, $3, $4, $5, $6, $7
+    FROM unnest($1::integer[], $2::integer[]) AS t(sample_id, project_id)
+    RETURNING *
+), current AS (
+    INSERT INTO sample_custody_current (sample_id, barcode, project_id, event_id, holder, holder_role, since)
+    SELECT e.sample_id, s.barcode, e.project_id, e.id, e.received_by, e.holder_role, e.event_at
+    FROM events e
+    JOIN samples s ON s.id = e.sample_id
+    ON CONFLICT (sample_id) DO UPDATE
+    SET project_id = EXCLUDED.project_id,
+        event_id = EXCLUDED.event_id,
+        holder = EXCLUDED.holder,
+        holder_role = EXCLUDED.holder_role,
+        since = EXCLUDED.since
+    WHERE sample_custody_current.since <= EXCLUDED.since
+)
+SELECT e.*, s.barcode
+FROM events e
+JOIN samples s ON s.id = e.sample_id
+ORDER BY e.id;""",
+)
+
+GET_CUSTODY_CURRENT_BY_BARCODE = Query(
+    name='get_custody_current_by_barcode',
+    source='custody.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT barcode, project_id, holder, holder_role, since
+FROM sample_custody_current
+WHERE barcode = $1;""",
+)
+
+GET_PROJECT_CUSTODY_CURRENT = Query(
+    name='get_project_custody_current',
+    source='custody.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT barcode, project_id, holder, holder_role, since
+FROM sample_custody_current
+WHERE project_id = $1
+ORDER BY barcode;""",
+)
+
+GET_SAMPLE_CUSTODY_EVENTS = Query(
+    name='get_sample_custody_events',
+    source='custody.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT e.*, s.barcode
+FROM sample_custody_events e
+JOIN samples s ON s.id = e.sample_id
+WHERE s.barcode = $1
+ORDER BY e.event_at, e.id;""",
+)
+
+GET_PROJECT_CUSTODY_GAPS = Query(
+    name='get_project_custody_gaps',
+    source='custody.sql',
+    params=1,
+    kind='read',
+    sql="""\
+-- An event is a gap when whoever relinquished the sample isn't who received
+-- it in the event before
+SELECT
+    s.barcode,
+    chain.event_id,
+    chain.event_at,
+    chain.relinquished_by,
+    chain.expected_holder,
+    chain.previous_event_at
+FROM (
+    SELECT
+        e.sample_id,
+        e.id AS event_id,
+        e.event_at,
+        e.relinquished_by,
+        LAG(e.received_by) OVER w AS expected_holder,
+        LAG(e.event_at) OVER w AS previous_event_at
+    FROM sample_custody_events e
+    WHERE e.project_id = $1
+    WINDOW w AS (PARTITION BY e.sample_id ORDER BY e.event_at, e.id)
+) chain
+JOIN samples s ON s.id = chain.sample_id
+WHERE chain.expected_holder IS NOT NULL
+  AND lower(trim(coalesce(chain.relinquished_by, ''))) <> lower(trim(chain.expected_holder))
+ORDER BY s.barcode, chain.event_at, chain.event_id;""",
+)
+
+CREATE_USER_ROLES_WITH_PERMISSIONS_VIEW = Query(
+    name='create_user_roles_with_permissions_view',
+    source='init.sql',
+    params=0,
+    kind='ddl',
+    sql="""\
+CREATE OR REPLACE VIEW user_roles_with_permissions AS
+SELECT 
+    ur.user_id,
+    r.id,
+    r.name,
+    r.description,
+    r.level,
+    r.created_at,
+    COALESCE(array_agg(p.name ORDER BY p.name) FILTER (WHERE p.name IS NOT NULL), '{}') AS permissions
+FROM user_roles ur
+JOIN roles r ON ur.role_id = r.id
+LEFT JOIN role_permissions rp ON r.id = rp.role_id
+LEFT JOIN permissions p ON rp.permission_id = p.id
+GROUP BY ur.user_id, r.id, r.name, r.description, r.level, r.created_at;""",
+)
+
+DROP_USER_ROLES_WITH_PERMISSIONS_VIEW = Query(
+    name='drop_user_roles_with_permissions_view',
+    source='init.sql',
+    params=0,
+    kind='ddl',
+    sql="""\
+DROP VIEW IF EXISTS user_roles_with_permissions;""",
+)
+
+LOCK_MONITORING_SERIES = Query(
+    name='lock_monitoring_series',
+    source='monitoring.sql',
+    params=2,
+    kind='write',
+    sql="""\
+SELECT pg_advisory_xact_lock($1, hashtext($2));""",
+)
+
+GET_MONITORING_CHUNKS_BY_START = Query(
+    name='get_monitoring_chunks_by_start',
+    source='monitoring.sql',
+    params=3,
+    kind='read',
+    sql="""\
+SELECT chunk_start, ts_data, value_data
+FROM monitoring_chunks
+WHERE address_id = $1 AND metric = $2 AND chunk_start = ANY($3::timestamptz[]);""",
+)
+
+UPSERT_MONITORING_CHUNK = Query(
+    name='upsert_monitoring_chunk',
+    source='monitoring.sql',
+    params=9,
+    kind='write',
+    sql="""\
+INSERT INTO monitoring_chunks (
+    address_id,
+    metric,
+    chunk_start,
+    chunk_end,
+    reading_count,
+    min_value,
+    max_value,
+    ts_data,
+    value_data
+) VALUES (
+    $1, $2, $3, $4, $5, $6, $7, $8, $9
+)
+ON CONFLICT (address_id, metric, chunk_start) DO UPDATE SET
+    chunk_end = EXCLUDED.chunk_end,
+    reading_count = EXCLUDED.reading_count,
+    min_value = EXCLUDED.min_value,
+    max_value = EXCLUDED.max_value,
+    ts_data = EXCLUDED.ts_data,
+    value_data = EXCLUDED.value_data,
+    version = monitoring_chunks.version + 1,
+    updated_at = CURRENT_TIMESTAMP;""",
+)
+
+GET_MONITORING_CHUNKS_IN_RANGE = Query(
+    name='get_monitoring_chunks_in_range',
+    source='monitoring.sql',
+    params=4,
+    kind='read',
+    sql="""\
+SELECT chunk_start, ts_data, value_data
+FROM monitoring_chunks
+WHERE address_id = $1
+AND metric = $2
+AND chunk_end > $3
+AND chunk_start < $4
+ORDER BY chunk_start;""",
+)
+
+GET_MONITORING_CHUNK_VERSIONS_IN_RANGE = Query(
+    name='get_monitoring_chunk_versions_in_range',
+    source='monitoring.sql',
+    params=4,
+    kind='read',
+    sql="""\
+SELECT chunk_start, version, updated_at
+FROM monitoring_chunks
+WHERE address_id = $1
+AND metric = $2
+AND chunk_end > $3
+AND chunk_start < $4
+ORDER BY chunk_start;""",
+)
+
+CREATE_PROJECT = Query(
+    name='create_project',
+    source='projects.sql',
+    params=1,
+    kind='write',
+    sql="""\
+INSERT INTO projects (name) VALUES ($1) RETURNING *;""",
+)
+
+GET_PROJECT = Query(
+    name='get_project',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT * FROM projects WHERE id = $1;""",
+)
+
+UPDATE_PROJECT = Query(
+    name='update_project',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+UPDATE projects SET name = $2 WHERE id = $1 RETURNING *;""",
+)
+
+DELETE_PROJECT = Query(
+    name='delete_project',
+    source='projects.sql',
+    params=1,
+    kind='write',
+    sql="""\
+DELETE FROM projects WHERE id = $1;""",
+)
+
+LIST_PROJECTS = Query(
+    name='list_projects',
+    source='projects.sql',
+    params=0,
+    kind='read',
+    sql="""\
+SELECT * FROM projects ORDER BY created_at DESC;""",
+)
+
+LIST_TECHNICIAN_PROJECTS = Query(
+    name='list_technician_projects',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT p.* 
+FROM projects p
+JOIN project_technicians pt ON p.id = pt.project_id
+WHERE pt.user_id = $1
+ORDER BY p.created_at DESC;""",
+)
+
+CREATE_ADDRESS = Query(
+    name='create_address',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+INSERT INTO addresses (name, date) VALUES ($1, $2) RETURNING *;""",
+)
+
+GET_ADDRESS = Query(
+    name='get_address',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT * FROM addresses WHERE id = $1;""",
+)
+
+UPDATE_ADDRESS = Query(
+    name='update_address',
+    source='projects.sql',
+    params=3,
+    kind='write',
+    sql="""\
+UPDATE addresses SET name = $2, date = $3 WHERE id = $1 RETURNING *;""",
+)
+
+DELETE_ADDRESS = Query(
+    name='delete_address',
+    source='projects.sql',
+    params=1,
+    kind='write',
+    sql="""\
+DELETE FROM addresses WHERE id = $1;""",
+)
+
+ADD_ADDRESS_TO_PROJECT = Query(
+    name='add_address_to_project',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+UPDATE projects 
+SET address_ids = array_append(address_ids, $2)
+WHERE id = $1
+RETURNING *;""",
+)
+
+REMOVE_ADDRESS_FROM_PROJECT = Query(
+    name='remove_address_from_project',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+UPDATE projects 
+SET address_ids = array_remove(address_ids, $2)
+WHERE id = $1
+RETURNING *;""",
+)
+
+GET_PROJECT_ADDRESSES = Query(
+    name='get_project_addresses',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT a.* 
+FROM addresses a
+WHERE a.id = ANY(
+    SELECT unnest(address_ids)
+    FROM projects
+    WHERE id = $1
+)
+ORDER BY a.date DESC;""",
+)
+
+GET_ADDRESS_PROJECT = Query(
+    name='get_address_project',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT id
+FROM projects
+WHERE address_ids @> ARRAY[$1]::integer[];""",
+)
+
+ASSIGN_TECHNICIAN = Query(
+    name='assign_technician',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+INSERT INTO project_technicians (project_id, user_id)
+VALUES ($1, $2)
+ON CONFLICT (project_id, user_id) DO NOTHING
+RETURNING *;""",
+)
+
+REMOVE_TECHNICIAN = Query(
+    name='remove_technician',
+    source='projects.sql',
+    params=2,
+    kind='write',
+    sql="""\
+DELETE FROM project_technicians 
+WHERE project_id = $1 AND user_id = $2;""",
+)
+
+GET_PROJECT_TECHNICIANS = Query(
+    name='get_project_technicians',
+    source='projects.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT u.* 
+FROM users u
+JOIN project_technicians pt ON u.id = pt.user_id
+WHERE pt.project_id = $1;""",
+)
+
+CHECK_TECHNICIAN_ASSIGNED = Query(
+    name='check_technician_assigned',
+    source='projects.sql',
+    params=2,
+    kind='read',
+    sql="""\
+SELECT EXISTS(
+    SELECT 1 
+    FROM project_technicians 
+    WHERE project_id = $1 AND user_id = $2
+) as is_assigned;""",
+)
+
+GET_ALL_ROLES = Query(
+    name='get_all_roles',
+    source='roles.sql',
+    params=0,
+    kind='read',
+    sql="""\
+SELECT 
+    id,
+    name,
+    description,
+    level,
+    created_at
+FROM roles
+ORDER BY level DESC;""",
+)
+
+GET_ROLE_BY_ID = Query(
+    name='get_role_by_id',
+    source='roles.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT 
+    id,
+    name,
+    description,
+    level,
+    created_at
+FROM roles
+WHERE id = $1;""",
+)
+
+GET_ROLE_BY_NAME = Query(
+    name='get_role_by_name',
+    source='roles.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT 
+    id,
+    name,
+    description,
+    level,
+    created_at
+FROM roles
+WHERE name = $1;""",
+)
+
+GET_USER_ROLES = Query(
+    name='get_user_roles',
+    source='roles.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT 
+    r.id,
+    r.name,
+    r.description,
+    r.level,
+    r.created_at
+FROM roles r
+JOIN user_roles ur ON r.id = ur.role_id
+WHERE ur.user_id = $1
+ORDER BY r.level DESC;""",
+)
+
+GET_USER_ROLES_WITH_PERMISSIONS = Query(
+    name='get_user_roles_with_permissions',
+    source='roles.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT 
+    r.id,
+    r.name,
+    r.description,
+    r.level,
+    r.created_at,
+    COALESCE(array_agg(p.name ORDER BY p.name) FILTER (WHERE p.name IS NOT NULL), '{}') AS permissions
+FROM roles r
+JOIN user_roles ur ON r.id = ur.role_id
+LEFT JOIN role_permissions rp ON r.id = rp.role_id
+LEFT JOIN permissions p ON rp.permission_id = p.id
+WHERE ur.user_id = $1
+GROUP BY r.id, r.name, r.description, r.level, r.created_at
+ORDER BY r.level DESC;""",
+)
+
+CREATE_ROLE = Query(
+    name='create_role',
+    source='roles.sql',
+    params=3,
+    kind='write',
+    sql="""\
+INSERT INTO roles (
+    name,
+    description,
+    level
+) VALUES (
+    $1, $2, $3
+) RETURNING id;""",
+)
+
+UPDATE_ROLE = Query(
+    name='update_role',
+    source='roles.sql',
+    params=4,
+    kind='write',
+    sql="""\
+UPDATE roles
+SET 
+    name = COALESCE($2, name),
+    description = COALESCE($3, description),
+    level = COALESCE($4, level),
+    updated_at = CURRENT_TIMESTAMP
+WHERE id = $1
+RETURNING *;""",
+)
+
+DELETE_ROLE = Query(
+    name='delete_role',
+    source='roles.sql',
+    params=1,
+    kind='write',
+    sql="""\
+DELETE FROM roles
+WHERE id = $1;""",
+)
+
+GET_OR_CREATE_ADMIN_ROLE = Query(
+    name='get_or_create_admin_role',
+    source='roles.sql',
+    params=0,
+    kind='write',
+    sql="""\
+INSERT INTO roles (name, description, level)
+VALUES ('admin', 'Administrator with full system access', 100)
+ON CONFLICT (name) DO UPDATE SET level = 100
+RETURNING id;""",
+)
+
+CREATE_SAMPLE = Query(
+    name='create_sample',
+    source='samples.sql',
+    params=4,
+    kind='write',
+    sql="""\
+INSERT INTO samples (barcode, sample_type, parent_sample_id, collected_at)
+VALUES ($1, $2, $3, $4)
+RETURNING *;""",
+)
+
+GET_SAMPLE_BY_BARCODE = Query(
+    name='get_sample_by_barcode',
+    source='samples.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT * FROM samples WHERE barcode = $1;""",
+)
+
+ADD_SAMPLE_TO_ADDRESS = Query(
+    name='add_sample_to_address',
+    source='samples.sql',
+    params=2,
+    kind='write',
+    sql="""\
+UPDATE addresses
+SET sample_ids = array_append(sample_ids, $2)
+WHERE id = $1
+RETURNING *;""",
+)
+
+GET_ADDRESS_SAMPLES = Query(
+    name='get_address_samples',
+    source='samples.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT s.*
+FROM samples s
+WHERE s.id = ANY(
+    SELECT unnest(sample_ids)
+    FROM addresses
+    WHERE id = $1
+)
+ORDER BY s.collected_at, s.id;""",
+)
+
+GET_SAMPLES_BY_BARCODES = Query(
+    name='get_samples_by_barcodes',
+    source='samples.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT id, barcode, sample_type, parent_sample_id, collected_at
+FROM samples
+WHERE barcode = ANY($1::text[]);""",
+)
+
+CREATE_LAB_BATCH = Query(
+    name='create_lab_batch',
+    source='samples.sql',
+    params=2,
+    kind='write',
+    sql="""\
+INSERT INTO lab_batches (name, imported_by)
+VALUES ($1, $2)
+RETURNING *;""",
+)
+
+GET_LAB_BATCH = Query(
+    name='get_lab_batch',
+    source='samples.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT * FROM lab_batches WHERE id = $1;""",
+)
+
+GET_LAB_BATCH_RESULTS = Query(
+    name='get_lab_batch_results',
+    source='samples.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT
+    lr.id,
+    lr.batch_id,
+    lr.sample_id,
+    s.barcode,
+    lr.result_type,
+    lr.analyte,
+    lr.value,
+    lr.unit,
+    lr.reporting_limit,
+    lr.spike_amount,
+    lr.analyzed_at,
+    lr.qc_flags
+FROM lab_results lr
+LEFT JOIN samples s ON lr.sample_id = s.id
+WHERE lr.batch_id = $1
+ORDER BY lr.id;""",
+)
+
+GET_USER_BY_EMAIL = Query(
+    name='get_user_by_email',
+    source='users.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT id, email, hashed_password, first_name, last_name, is_active, is_superuser
+FROM users
+WHERE email = $1;""",
+)
+
+GET_USER_HIGHEST_ROLE_LEVEL = Query(
+    name='get_user_highest_role_level',
+    source='users.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT COALESCE(MAX(r.level), 0) as highest_level
+FROM roles r 
+JOIN user_roles ur ON r.id = ur.role_id 
+WHERE ur.user_id = $1;""",
+)
+
+GET_ALL_USERS = Query(
+    name='get_all_users',
+    source='users.sql',
+    params=0,
+    kind='read',
+    sql="""\
+SELECT 
+    u.id,
+    u.email,
+    u.hashed_password,
+    u.first_name,
+    u.last_name,
+    u.is_active,
+    u.is_superuser,
+    u.created_at,
+    u.updated_at,
+    COALESCE(
+        json_agg(
+            json_build_object(
+                'id', urwp.id,
+                'name', urwp.name,
+                'description', urwp.description,
+                'level', urwp.level,
+                'created_at', urwp.created_at,
+                'permissions', urwp.permissions
+            )
+        ) FILTER (WHERE urwp.id IS NOT NULL),
+        '[]'::json
+    )::jsonb as roles
+FROM users u
+LEFT JOIN user_roles_with_permissions urwp ON u.id = urwp.user_id
+GROUP BY u.id, u.email, u.hashed_password, u.first_name, u.last_name, u.is_active, u.is_superuser, u.created_at, u.updated_at
+ORDER BY u.created_at DESC;""",
+)
+
+GET_USER_BY_ID = Query(
+    name='get_user_by_id',
+    source='users.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT 
+    u.id,
+    u.email,
+    u.hashed_password,
+    u.first_name,
+    u.last_name,
+    u.is_active,
+    u.is_superuser,
+    u.created_at,
+    u.updated_at,
+    COALESCE(
+        json_agg(
+            json_build_object(
+                'id', urwp.id,
+                'name', urwp.name,
+                'description', urwp.description,
+                'level', urwp.level,
+                'created_at', urwp.created_at,
+                'permissions', urwp.permissions
+            )
+        ) FILTER (WHERE urwp.id IS NOT NULL),
+        '[]'::json
+    )::jsonb as roles
+FROM users u
+LEFT JOIN user_roles_with_permissions urwp ON u.id = urwp.user_id
+WHERE u.id = $1
+GROUP BY u.id, u.email, u.hashed_password, u.first_name, u.last_name, u.is_active, u.is_superuser, u.created_at, u.updated_at;""",
+)
+
+CREATE_USER = Query(
+    name='create_user',
+    source='users.sql',
+    params=6,
+    kind='write',
+    sql="""\
+INSERT INTO users (
+    email,
+    hashed_password,
+    first_name,
+    last_name,
+    is_active,
+    is_superuser
+) VALUES (
+    $1, $2, $3, $4, $5, $6
+) RETURNING id;""",
+)
+
+UPDATE_USER = Query(
+    name='update_user',
+    source='users.sql',
+    params=7,
+    kind='write',
+    sql="""\
+UPDATE users
+SET 
+    email = COALESCE($2, email),
+    hashed_password = COALESCE($3, hashed_password),
+    first_name = COALESCE($4, first_name),
+    last_name = COALESCE($5, last_name),
+    is_active = COALESCE($6, is_active),
+    is_superuser = COALESCE($7, is_superuser),
+    updated_at = CURRENT_TIMESTAMP
+WHERE id = $1
+RETURNING *;""",
+)
+
+DELETE_USER = Query(
+    name='delete_user',
+    source='users.sql',
+    params=1,
+    kind='write',
+    sql="""\
+DELETE FROM users
+WHERE id = $1
+RETURNING *;""",
+)
+
+DELETE_USER_ROLES = Query(
+    name='delete_user_roles',
+    source='users.sql',
+    params=1,
+    kind='write',
+    sql="""\
+DELETE FROM user_roles WHERE user_id = $1;""",
+)
+
+INSERT_USER_ROLE = Query(
+    name='insert_user_role',
+    source='users.sql',
+    params=2,
+    kind='write',
+    sql="""\
+INSERT INTO user_roles (user_id, role_id) VALUES ($1, $2) ON CONFLICT DO NOTHING;""",
+)
+
+GET_TABLE_VERSIONS = Query(
+    name='get_table_versions',
+    source='versions.sql',
+    params=1,
+    kind='read',
+    sql="""\
+SELECT table_name, version
+FROM table_versions
+WHERE table_name = ANY($1::text[])
+ORDER BY table_name;""",
+)
+
+QUERIES = {query.name: query for query in (
+    GET_CUSTODY_SAMPLES_BY_BARCODES,
+    RECORD_CUSTODY_EVENTS,
+    GET_CUSTODY_CURRENT_BY_BARCODE,
+    GET_PROJECT_CUSTODY_CURRENT,
+    GET_SAMPLE_CUSTODY_EVENTS,
+    GET_PROJECT_CUSTODY_GAPS,
+    CREATE_USER_ROLES_WITH_PERMISSIONS_VIEW,
+    DROP_USER_ROLES_WITH_PERMISSIONS_VIEW,
+    LOCK_MONITORING_SERIES,
+    GET_MONITORING_CHUNKS_BY_START,
+    UPSERT_MONITORING_CHUNK,
+    GET_MONITORING_CHUNKS_IN_RANGE,
+    GET_MONITORING_CHUNK_VERSIONS_IN_RANGE,
+    CREATE_PROJECT,
+    GET_PROJECT,
+    UPDATE_PROJECT,
+    DELETE_PROJECT,
+    LIST_PROJECTS,
+    LIST_TECHNICIAN_PROJECTS,
+    CREATE_ADDRESS,
+    GET_ADDRESS,
+    UPDATE_ADDRESS,
+    DELETE_ADDRESS,
+    ADD_ADDRESS_TO_PROJECT,
+    REMOVE_ADDRESS_FROM_PROJECT,
+    GET_PROJECT_ADDRESSES,
+    GET_ADDRESS_PROJECT,
+    ASSIGN_TECHNICIAN,
+    REMOVE_TECHNICIAN,
+    GET_PROJECT_TECHNICIANS,
+    CHECK_TECHNICIAN_ASSIGNED,
+    GET_ALL_ROLES,
+    GET_ROLE_BY_ID,
+    GET_ROLE_BY_NAME,
+    GET_USER_ROLES,
+    GET_USER_ROLES_WITH_PERMISSIONS,
+    CREATE_ROLE,
+    UPDATE_ROLE,
+    DELETE_ROLE,
+    GET_OR_CREATE_ADMIN_ROLE,
+    CREATE_SAMPLE,
+    GET_SAMPLE_BY_BARCODE,
+    ADD_SAMPLE_TO_ADDRESS,
+    GET_ADDRESS_SAMPLES,
+    GET_SAMPLES_BY_BARCODES,
+    CREATE_LAB_BATCH,
+    GET_LAB_BATCH,
+    GET_LAB_BATCH_RESULTS,
+    GET_USER_BY_EMAIL,
+    GET_USER_HIGHEST_ROLE_LEVEL,
+    GET_ALL_USERS,
+    GET_USER_BY_ID,
+    CREATE_USER,
+    UPDATE_USER,
+    DELETE_USER,
+    DELETE_USER_ROLES,
+    INSERT_USER_ROLE,
+    GET_TABLE_VERSIONS,
+)}
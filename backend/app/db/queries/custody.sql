@@ -0,0 +1,81 @@
+-- Custody queries
+-- The containment joins go through the GIN indexes on sample_ids and address_ids
+-- name: get_custody_samples_by_barcodes
+SELECT s.id, s.barcode, p.id AS project_id
+FROM samples s
+JOIN addresses a ON a.sample_ids @> ARRAY[s.id]::integer[]
+JOIN projects p ON p.address_ids @> ARRAY[a.id]::integer[]
+WHERE s.barcode = ANY($1::text[]);
+
+-- name: record_custody_events
+-- Append one event per sample and move each sample's current holder forward,
+-- unless a later event was already recorded for it
+WITH events AS (
+    INSERT INTO sample_custody_events (
+        sample_id, project_id, relinquished_by, received_by, holder_role, event_at, recorded_by
+    )
+    SELECT sample_id, project_id, $3, $4, $5, $6, $7
+    FROM unnest($1::integer[], $2::integer[]) AS t(sample_id, project_id)
+    RETURNING *
+), current AS (
+    INSERT INTO sample_custody_current (sample_id, barcode, project_id, event_id, holder, holder_role, since)
+    SELECT e.sample_id, s.barcode, e.project_id, e.id, e.received_by, e.holder_role, e.event_at
+    FROM events e
+    JOIN samples s ON s.id = e.sample_id
+    ON CONFLICT (sample_id) DO UPDATE
+    SET project_id = EXCLUDED.project_id,
+        event_id = EXCLUDED.event_id,
+        holder = EXCLUDED.holder,
+        holder_role = EXCLUDED.holder_role,
+        since = EXCLUDED.since
+    WHERE sample_custody_current.since <= EXCLUDED.since
+)
+SELECT e.*, s.barcode
+FROM events e
+JOIN samples s ON s.id = e.sample_id
+ORDER BY e.id;
+
+-- name: get_custody_current_by_barcode
+SELECT barcode, project_id, holder, holder_role, since
+FROM sample_custody_current
+WHERE barcode = $1;
+
+-- name: get_project_custody_current
+SELECT barcode, project_id, holder, holder_role, since
+FROM sample_custody_current
+WHERE project_id = $1
+ORDER BY barcode;
+
+-- name: get_sample_custody_events
+SELECT e.*, s.barcode
+FROM sample_custody_events e
+JOIN samples s ON s.id = e.sample_id
+WHERE s.barcode = $1
+ORDER BY e.event_at, e.id;
+
+-- name: get_project_custody_gaps
+-- An event is a gap when whoever relinquished the sample isn't who received
+-- it in the event before
+SELECT
+    s.barcode,
+    chain.event_id,
+    chain.event_at,
+    chain.relinquished_by,
+    chain.expected_holder,
+    chain.previous_event_at
+FROM (
+    SELECT
+        e.sample_id,
+        e.id AS event_id,
+        e.event_at,
+        e.relinquished_by,
+        LAG(e.received_by) OVER w AS expected_holder,
+        LAG(e.event_at) OVER w AS previous_event_at
+    FROM sample_custody_events e
+    WHERE e.project_id = $1
+    WINDOW w AS (PARTITION BY e.sample_id ORDER BY e.event_at, e.id)
+) chain
+JOIN samples s ON s.id = chain.sample_id
+WHERE chain.expected_holder IS NOT NULL
+  AND lower(trim(coalesce(chain.relinquished_by, ''))) <> lower(trim(chain.expected_holder))
+ORDER BY s.barcode, chain.event_at, chain.event_id;
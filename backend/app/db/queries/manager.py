@@ -1,28 +1,18 @@
-from pathlib import Path
-import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import asyncpg
+from app.db.queries.compiled import QUERIES, SOURCE_CHECKSUM
+from app.db.queries.query import DDL, Query
+
+# Name of every loaded query keyed by its SQL text, so code holding only the
+# text (like the instrumented connection) can tell which query it is running
+QUERY_NAMES: Dict[str, str] = {query.sql: name for name, query in QUERIES.items()}
 
 class SQLQueryManager:
-    def __init__(self):
-        self._queries: Dict[str, str] = {}
-        self._load_queries()
-
-    def _load_queries(self):
-        """Load all SQL queries from .sql files in the queries directory."""
-        queries_dir = Path(__file__).parent
-        for sql_file in queries_dir.glob("*.sql"):
-            with open(sql_file, 'r') as f:
-                content = f.read()
-                # Extract named queries using regex
-                query_blocks = re.finditer(
-                    r'--\s*name:\s*(\w+)\s*\n(.*?)(?=\n--\s*name:|$)', 
-                    content, 
-                    re.DOTALL
-                )
-                for match in query_blocks:
-                    name = match.group(1).strip()
-                    query = match.group(2).strip()
-                    self._queries[name] = query
+    """Named queries, compiled from the .sql files by app.db.queries.build."""
+
+    def __init__(self, queries: Dict[str, Query] = QUERIES):
+        self.registry = queries
+        self._queries: Dict[str, str] = {name: query.sql for name, query in queries.items()}
 
     def get_query(self, name: str) -> Optional[str]:
         """Get a SQL query by name."""
@@ -35,5 +25,32 @@ class SQLQueryManager:
             raise AttributeError(f"Query '{name}' not found")
         return query
 
-# Create a singleton instance
-query_manager = SQLQueryManager() 
\ No newline at end of file
+async def check_queries(conn: asyncpg.Connection, queries: Dict[str, Query] = QUERIES) -> None:
+    """Fail fast when the queries don't match the database or their .sql files.
+
+    Every query except DDL is prepared, which makes Postgres parse and plan it
+    against the current schema without running it, and its parameter count
+    is compared with the compiled one.
+    """
+    # Only needed here, so importing the queries stays a single module load
+    from app.db.queries import build
+
+    problems: List[str] = []
+    if queries is QUERIES and build.source_checksum() != SOURCE_CHECKSUM:
+        problems.append("compiled.py is out of date with the .sql files; run python -m app.db.queries.build")
+    for query in queries.values():
+        if query.kind == DDL:
+            continue
+        try:
+            statement = await conn.prepare(query.sql)
+        except asyncpg.PostgresError as e:
+            problems.append(f"{query.name} ({query.source}): {e}")
+            continue
+        params = len(statement.get_parameters())
+        if params != query.params:
+            problems.append(f"{query.name} ({query.source}): takes {params} parameters, compiled with {query.params}")
+    if problems:
+        raise RuntimeError("Named queries don't match the database:\n  " + "\n  ".join(problems))
+
+# The one instance every module shares
+query_manager = SQLQueryManager()
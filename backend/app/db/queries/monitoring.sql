@@ -0,0 +1,50 @@
+-- Monitoring chunk queries
+-- name: lock_monitoring_series
+SELECT pg_advisory_xact_lock($1, hashtext($2));
+
+-- name: get_monitoring_chunks_by_start
+SELECT chunk_start, ts_data, value_data
+FROM monitoring_chunks
+WHERE address_id = $1 AND metric = $2 AND chunk_start = ANY($3::timestamptz[]);
+
+-- name: upsert_monitoring_chunk
+INSERT INTO monitoring_chunks (
+    address_id,
+    metric,
+    chunk_start,
+    chunk_end,
+    reading_count,
+    min_value,
+    max_value,
+    ts_data,
+    value_data
+) VALUES (
+    $1, $2, $3, $4, $5, $6, $7, $8, $9
+)
+ON CONFLICT (address_id, metric, chunk_start) DO UPDATE SET
+    chunk_end = EXCLUDED.chunk_end,
+    reading_count = EXCLUDED.reading_count,
+    min_value = EXCLUDED.min_value,
+    max_value = EXCLUDED.max_value,
+    ts_data = EXCLUDED.ts_data,
+    value_data = EXCLUDED.value_data,
+    version = monitoring_chunks.version + 1,
+    updated_at = CURRENT_TIMESTAMP;
+
+-- name: get_monitoring_chunks_in_range
+SELECT chunk_start, ts_data, value_data
+FROM monitoring_chunks
+WHERE address_id = $1
+AND metric = $2
+AND chunk_end > $3
+AND chunk_start < $4
+ORDER BY chunk_start;
+
+-- name: get_monitoring_chunk_versions_in_range
+SELECT chunk_start, version, updated_at
+FROM monitoring_chunks
+WHERE address_id = $1
+AND metric = $2
+AND chunk_end > $3
+AND chunk_start < $4
+ORDER BY chunk_start;
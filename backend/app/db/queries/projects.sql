@@ -56,6 +56,12 @@ WHERE a.id = ANY(
 )
 ORDER BY a.date DESC;
 
+-- Runs on every address access check; containment goes through the GIN index on address_ids
+-- name: get_address_project
+SELECT id
+FROM projects
+WHERE address_ids @> ARRAY[$1]::integer[];
+
 -- Project Technician queries
 -- name: assign_technician
 INSERT INTO project_technicians (project_id, user_id)
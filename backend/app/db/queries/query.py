@@ -0,0 +1,17 @@
+from typing import NamedTuple
+
+# What a query does to the database
+READ = "read"
+WRITE = "write"
+DDL = "ddl"
+
+
+class Query(NamedTuple):
+    """A named query compiled from the .sql files."""
+    name: str
+    # The .sql file it was read from
+    source: str
+    # Number of $N parameters it takes
+    params: int
+    kind: str
+    sql: str
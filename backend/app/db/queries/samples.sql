@@ -0,0 +1,57 @@
+-- Sample queries
+-- name: create_sample
+INSERT INTO samples (barcode, sample_type, parent_sample_id, collected_at)
+VALUES ($1, $2, $3, $4)
+RETURNING *;
+
+-- name: get_sample_by_barcode
+SELECT * FROM samples WHERE barcode = $1;
+
+-- name: add_sample_to_address
+UPDATE addresses
+SET sample_ids = array_append(sample_ids, $2)
+WHERE id = $1
+RETURNING *;
+
+-- name: get_address_samples
+SELECT s.*
+FROM samples s
+WHERE s.id = ANY(
+    SELECT unnest(sample_ids)
+    FROM addresses
+    WHERE id = $1
+)
+ORDER BY s.collected_at, s.id;
+
+-- name: get_samples_by_barcodes
+SELECT id, barcode, sample_type, parent_sample_id, collected_at
+FROM samples
+WHERE barcode = ANY($1::text[]);
+
+-- Lab batch queries
+-- name: create_lab_batch
+INSERT INTO lab_batches (name, imported_by)
+VALUES ($1, $2)
+RETURNING *;
+
+-- name: get_lab_batch
+SELECT * FROM lab_batches WHERE id = $1;
+
+-- name: get_lab_batch_results
+SELECT
+    lr.id,
+    lr.batch_id,
+    lr.sample_id,
+    s.barcode,
+    lr.result_type,
+    lr.analyte,
+    lr.value,
+    lr.unit,
+    lr.reporting_limit,
+    lr.spike_amount,
+    lr.analyzed_at,
+    lr.qc_flags
+FROM lab_results lr
+LEFT JOIN samples s ON lr.sample_id = s.id
+WHERE lr.batch_id = $1
+ORDER BY lr.id;
@@ -1,19 +1,3 @@
--- Create view for user roles with permissions
-CREATE OR REPLACE VIEW user_roles_with_permissions AS
-SELECT 
-    ur.user_id,
-    r.id,
-    r.name,
-    r.description,
-    r.level,
-    r.created_at,
-    COALESCE(array_agg(p.name ORDER BY p.name) FILTER (WHERE p.name IS NOT NULL), '{}') AS permissions
-FROM user_roles ur
-JOIN roles r ON ur.role_id = r.id
-LEFT JOIN role_permissions rp ON r.id = rp.role_id
-LEFT JOIN permissions p ON rp.permission_id = p.id
-GROUP BY ur.user_id, r.id, r.name, r.description, r.level, r.created_at;
-
 -- name: get_user_by_email
 SELECT id, email, hashed_password, first_name, last_name, is_active, is_superuser
 FROM users
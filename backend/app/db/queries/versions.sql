@@ -0,0 +1,7 @@
+-- Change counters kept by triggers; see migration 0009
+
+-- name: get_table_versions
+SELECT table_name, version
+FROM table_versions
+WHERE table_name = ANY($1::text[])
+ORDER BY table_name;
@@ -0,0 +1,133 @@
+"""
+Build response models from trusted database rows without validating them.
+
+Rows from the named queries already have the types the models declare:
+asyncpg decodes integers, timestamps and arrays itself. Validating every
+row with Pydantic re-checks all of that, and `Model(**dict(row))` copies the
+row first. `from_row` builds the model with model_construct instead, using a
+mapper compiled once per model.
+
+The mapper only does the conversions the models' validators did for
+database values:
+- JSON text (json_agg results) is decoded into nested models or lists.
+- ISO timestamps inside JSON become datetimes.
+- A timestamp read into a date field becomes a date.
+- NULL in a field that isn't Optional falls back to the field's default,
+  e.g. an empty list.
+
+FastAPI doesn't validate model instances it is handed back a second time,
+so a model built here is serialized as is.
+
+Only use this for rows read from the database. Anything from a request
+still goes through validation. tests/db/test_rows.py checks the result
+columns of each query against the model it is mapped to.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import NoneType, UnionType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+# Per field: how to convert a column value (None if it is used as is),
+# and whether NULL means "use the default"
+_FieldSpec = Tuple[Optional[Callable[[Any], Any]], bool]
+
+_mappers: Dict[type, Callable[[Mapping[str, Any]], BaseModel]] = {}
+
+
+def _json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _to_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_date(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _allows_none(annotation: Any) -> bool:
+    return annotation is Any or (
+        get_origin(annotation) in (Union, UnionType) and NoneType in get_args(annotation)
+    )
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """How a column value becomes the field's value, or None if it is used as is."""
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType):
+        types = [arg for arg in get_args(annotation) if arg is not NoneType]
+        inner = _converter(types[0]) if len(types) == 1 else None
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin is list:
+        item = _converter(get_args(annotation)[0]) if get_args(annotation) else None
+        if item is None:
+            return _json
+        return lambda value: [item(element) for element in _json(value)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        model = annotation
+        return lambda value: value if isinstance(value, model) else from_row(model, _json(value))
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is date:
+        return _to_date
+    if annotation is float:
+        return _to_float
+    return None
+
+
+def _compile(model: Type[M]) -> Callable[[Mapping[str, Any]], M]:
+    fields: Dict[str, _FieldSpec] = {
+        name: (_converter(field.annotation), not field.is_required() and not _allows_none(field.annotation))
+        for name, field in model.model_fields.items()
+    }
+    construct = model.model_construct
+
+    def map_row(row: Mapping[str, Any]) -> M:
+        values = {}
+        for name, value in row.items():
+            spec = fields.get(name)
+            if spec is None:
+                continue
+            convert, default_on_null = spec
+            if value is None:
+                if default_on_null:
+                    continue
+            elif convert is not None:
+                value = convert(value)
+            values[name] = value
+        return construct(**values)
+
+    return map_row
+
+
+def row_mapper(model: Type[M]) -> Callable[[Mapping[str, Any]], M]:
+    """The compiled row mapper for a model."""
+    mapper = _mappers.get(model)
+    if mapper is None:
+        mapper = _mappers[model] = _compile(model)
+    return mapper
+
+
+def from_row(model: Type[M], row: Mapping[str, Any]) -> M:
+    """Build a model from a database row (a Record or dict) without validating it."""
+    return row_mapper(model)(row)
+
+
+def from_rows(model: Type[M], rows: Iterable[Mapping[str, Any]]) -> List[M]:
+    """Build a model from each database row without validating them."""
+    mapper = row_mapper(model)
+    return [mapper(row) for row in rows]
@@ -0,0 +1,319 @@
+"""
+Synthetic data seeder for load and scale testing.
+
+Generates users with role assignments, projects with addresses, technician
+assignments, samples, and one lab batch of results per project. Rows are
+generated in chunks by a pool of worker processes as COPY text, and loaded
+with COPY over several connections while later chunks are still being
+generated.
+
+Output is deterministic: each chunk has its own random generator seeded
+from --seed and the chunk's position, so the same seed and sizes give the
+same rows however many workers run. Every user gets the same password,
+hashed once. Users 1, 2 and 3 are always an admin, a supervisor and a
+technician assigned to the first three projects, so benchmarks have known
+accounts to log in as.
+
+The CLI runs the migrations first. Tables must be empty unless --truncate
+is given, which empties them first.
+
+Usage (from backend/):
+    python -m app.db.seed --database enviro_scale --users 1000000 \\
+        --projects 5000 --addresses-per-project 2000 [--samples-per-address 1] \\
+        [--results-per-sample 3] [--seed 1] [--workers 8] [--truncate]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.labels import label_barcode
+from app.core.security import get_password_hash
+from app.db.migrate import run_migrations
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PASSWORD = "SeedPass123!@#"
+# Share of users given each role after the first three; the rest are technicians
+ROLE_MIX = {"admin": 0.01, "supervisor": 0.09}
+FIXED_ROLES = ("admin", "supervisor", "technician")
+# Rows generated per chunk, roughly; a chunk is one unit of work for a process
+CHUNK_ROWS = 50_000
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Maria",
+    "Wei", "Mei", "Ahmed", "Fatima", "Raj", "Priya", "Kenji", "Yuki", "Olga", "Ivan",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Chen", "Patel", "Khan", "Nguyen", "Kim", "Sato", "Ivanov", "Schmidt", "O'Brien",
+]
+STREETS = [
+    "Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park",
+    "River", "Church", "Mill", "Spring", "Ridge", "Sunset", "Highland", "Forest", "Meadow", "Harbor",
+]
+STREET_TYPES = ["Street", "Avenue", "Road", "Lane", "Drive", "Court", "Boulevard", "Way"]
+CITIES = ["Springfield", "Riverside", "Franklin", "Greenville", "Bristol", "Clinton", "Fairview", "Salem"]
+# Analyte, unit, reporting limit and typical value
+ANALYTES = [
+    ("lead", "mg/kg", 0.5, 12.0),
+    ("arsenic", "mg/kg", 0.5, 4.0),
+    ("benzene", "ug/L", 1.0, 3.0),
+    ("toluene", "ug/L", 1.0, 8.0),
+    ("asbestos", "%", 0.1, 0.5),
+]
+START_DATE = date(2023, 1, 1)
+
+# Tables in the order they are truncated
+TABLES = [
+    "lab_results", "lab_batches", "samples", "project_technicians", "projects",
+    "addresses", "user_roles", "refresh_tokens", "users",
+]
+# Tables with serial ids, whose sequences are moved past the seeded rows
+SERIAL_TABLES = ["users", "projects", "addresses", "samples", "lab_batches", "lab_results"]
+COLUMNS = {
+    "users": ["id", "email", "hashed_password", "first_name", "last_name", "is_active", "is_superuser"],
+    "user_roles": ["user_id", "role_id"],
+    "projects": ["id", "name", "address_ids"],
+    "addresses": ["id", "name", "date", "sample_ids"],
+    "project_technicians": ["project_id", "user_id"],
+    "samples": ["id", "barcode", "sample_type", "collected_at"],
+    "lab_batches": ["id", "name"],
+    "lab_results": [
+        "id", "batch_id", "sample_id", "result_type", "analyte", "value", "unit", "reporting_limit", "analyzed_at"
+    ],
+}
+
+
+class SeedOptions(NamedTuple):
+    users: int
+    projects: int
+    addresses_per_project: int
+    samples_per_address: int = 0
+    results_per_sample: int = 3
+    technicians_per_project: int = 5
+    seed: int = 1
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer: a fast, well-spread hash of an integer."""
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+def role_of(seed: int, user_id: int) -> str:
+    """The role of a seeded user. A pure function so project chunks can pick technicians."""
+    if user_id <= len(FIXED_ROLES):
+        return FIXED_ROLES[user_id - 1]
+    draw = _mix64(seed * 0x100000000 + user_id) / 2**64
+    for role, share in ROLE_MIX.items():
+        if draw < share:
+            return role
+        draw -= share
+    return "technician"
+
+
+def _array(ids) -> str:
+    return "{" + ",".join(map(str, ids)) + "}"
+
+
+def _user_chunk(
+    options: SeedOptions,
+    first: int,
+    last: int,
+    hashed_password: str,
+    role_ids: Dict[str, int]
+) -> Dict[str, bytes]:
+    rng = random.Random(f"{options.seed}:users:{first}")
+    users, user_roles = io.StringIO(), io.StringIO()
+    for user_id in range(first, last + 1):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first_name}.{last_name}.{user_id}@example.com".lower().replace("'", "")
+        users.write(f"{user_id}\t{email}\t{hashed_password}\t{first_name}\t{last_name}\tt\tf\n")
+        user_roles.write(f"{user_id}\t{role_ids[role_of(options.seed, user_id)]}\n")
+    return {"users": users.getvalue().encode(), "user_roles": user_roles.getvalue().encode()}
+
+
+def _project_chunk(options: SeedOptions, first: int, last: int) -> Dict[str, bytes]:
+    """Projects first..last with their addresses, technicians, samples and lab results."""
+    rng = random.Random(f"{options.seed}:projects:{first}")
+    per_project = options.addresses_per_project
+    per_address = options.samples_per_address
+    # In load order, parents before children
+    tables = ("projects", "addresses", "project_technicians", "samples", "lab_batches", "lab_results")
+    out = {table: io.StringIO() for table in tables}
+
+    for project_id in range(first, last + 1):
+        first_address = (project_id - 1) * per_project + 1
+        address_ids = range(first_address, first_address + per_project)
+        city = rng.choice(CITIES)
+        out["projects"].write(f"{project_id}\t{city} Site {project_id}\t{_array(address_ids)}\n")
+
+        # The fixed technician works on the first three projects
+        technicians = {len(FIXED_ROLES)} if project_id <= 3 else set()
+        for _ in range(options.technicians_per_project * 20):
+            if len(technicians) >= options.technicians_per_project:
+                break
+            user_id = rng.randint(1, options.users)
+            if role_of(options.seed, user_id) == "technician":
+                technicians.add(user_id)
+        for user_id in sorted(technicians):
+            out["project_technicians"].write(f"{project_id}\t{user_id}\n")
+
+        if per_address:
+            out["lab_batches"].write(f"{project_id}\tSEED-P{project_id}\n")
+        for address_id in address_ids:
+            visit = START_DATE + timedelta(days=rng.randrange(730))
+            first_sample = (address_id - 1) * per_address + 1
+            sample_ids = range(first_sample, first_sample + per_address)
+            name = f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}, {city} #{address_id}"
+            out["addresses"].write(f"{address_id}\t{name}\t{visit.isoformat()}\t{_array(sample_ids)}\n")
+
+            collected = datetime(visit.year, visit.month, visit.day, 8, tzinfo=timezone.utc)
+            for sample_id in sample_ids:
+                collected += timedelta(minutes=rng.randint(5, 90))
+                number = sample_id - (project_id - 1) * per_project * per_address
+                out["samples"].write(
+                    f"{sample_id}\t{label_barcode(project_id, number)}\tfield\t{collected.isoformat()}\n"
+                )
+                analyzed = (collected + timedelta(days=rng.randint(2, 14))).isoformat()
+                first_result = (sample_id - 1) * options.results_per_sample + 1
+                for offset in range(options.results_per_sample):
+                    analyte, unit, limit, typical = ANALYTES[offset % len(ANALYTES)]
+                    value = round(rng.lognormvariate(0, 1) * typical, 3)
+                    out["lab_results"].write(
+                        f"{first_result + offset}\t{project_id}\t{sample_id}\tsample\t{analyte}\t"
+                        f"{value}\t{unit}\t{limit}\t{analyzed}\n"
+                    )
+    return {table: buffer.getvalue().encode() for table, buffer in out.items()}
+
+
+def _chunks(total: int, size: int) -> List[Tuple[int, int]]:
+    return [(first, min(first + size - 1, total)) for first in range(1, total + 1, size)]
+
+
+async def _load(pool: asyncpg.Pool, chunk: Dict[str, bytes]) -> None:
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            for table, data in chunk.items():
+                if data:
+                    await conn.copy_to_table(table, source=io.BytesIO(data), columns=COLUMNS[table], format="text")
+
+
+async def _run_phase(pool: asyncpg.Pool, executor: ProcessPoolExecutor, jobs, in_flight: int) -> None:
+    """Generate chunks in worker processes and COPY each one as soon as it is ready."""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(in_flight)
+
+    async def job(function, *args):
+        async with slots:
+            chunk = await loop.run_in_executor(executor, function, *args)
+            await _load(pool, chunk)
+
+    await asyncio.gather(*(job(*args) for args in jobs))
+
+
+async def seed_database(
+    dsn: str,
+    options: SeedOptions,
+    password: str = DEFAULT_PASSWORD,
+    workers: int = os.cpu_count() or 1,
+    truncate: bool = False
+) -> Dict[str, int]:
+    """Seed a migrated database and return the number of rows loaded per table."""
+    hashed_password = get_password_hash(password)
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=workers)
+    try:
+        async with pool.acquire() as conn:
+            if truncate:
+                await conn.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            elif await conn.fetchval("SELECT EXISTS (SELECT 1 FROM users)"):
+                raise RuntimeError("users is not empty; pass truncate=True (--truncate) to replace its data")
+            role_ids = dict(await conn.fetch("SELECT name, id FROM roles"))
+
+        rows_per_project = options.addresses_per_project * max(1, options.samples_per_address)
+        projects_per_chunk = max(1, CHUNK_ROWS // max(1, rows_per_project))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            started = time.perf_counter()
+            await _run_phase(pool, executor, [
+                (_user_chunk, options, first, last, hashed_password, role_ids)
+                for first, last in _chunks(options.users, CHUNK_ROWS)
+            ], workers * 2)
+            logger.info("Seeded %d users in %.1fs", options.users, time.perf_counter() - started)
+
+            # Technician assignments reference users, so projects go second
+            started = time.perf_counter()
+            await _run_phase(pool, executor, [
+                (_project_chunk, options, first, last)
+                for first, last in _chunks(options.projects, projects_per_chunk)
+            ], workers * 2)
+            logger.info("Seeded %d projects in %.1fs", options.projects, time.perf_counter() - started)
+
+        async with pool.acquire() as conn:
+            for table in SERIAL_TABLES:
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST((SELECT max(id) FROM {table}), 1))"
+                )
+            await conn.execute("ANALYZE")
+            counts = {}
+            for table in COLUMNS:
+                counts[table] = await conn.fetchval(f"SELECT count(*) FROM {table}")
+    finally:
+        await pool.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=settings.POSTGRES_DB)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--addresses-per-project", type=int, default=1_000)
+    parser.add_argument("--samples-per-address", type=int, default=0)
+    parser.add_argument("--results-per-sample", type=int, default=3)
+    parser.add_argument("--technicians-per-project", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--truncate", action="store_true", help="empty the seeded tables first")
+    args = parser.parse_args()
+    if args.users < len(FIXED_ROLES):
+        parser.error(f"--users must be at least {len(FIXED_ROLES)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    settings.POSTGRES_DB = args.database
+    options = SeedOptions(
+        users=args.users,
+        projects=args.projects,
+        addresses_per_project=args.addresses_per_project,
+        samples_per_address=args.samples_per_address,
+        results_per_sample=args.results_per_sample,
+        technicians_per_project=args.technicians_per_project,
+        seed=args.seed,
+    )
+    started = time.perf_counter()
+    asyncio.run(run_migrations())
+    counts = asyncio.run(seed_database(
+        settings.get_database_url, options, args.password, args.workers, args.truncate
+    ))
+    for table, count in counts.items():
+        print(f"{table:20} {count:>12,}")
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 from typing import AsyncGenerator
-from app.db.engine import get_connection
+from app.core.timing import phase, DB
+from app.db import engine
 import asyncpg
 
 async def get_db() -> AsyncGenerator[asyncpg.Pool, None]:
-    """Dependency for getting database connection pool."""
-    pool = await get_connection()
-    try:
-        yield pool
-    finally:
-        await pool.close()
+    """Dependency for getting the worker's database connection pool.
+
+    The pool is opened at startup; without a lifespan (e.g. an in-process
+    test client) the first request opens it.
+    """
+    pool = engine._pool
+    if pool is None:
+        with phase(DB):
+            pool = await engine.open_pool()
+    yield pool
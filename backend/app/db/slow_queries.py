@@ -0,0 +1,150 @@
+"""
+Slow named query capture.
+
+A named query slower than SLOW_QUERY_MS is logged on the app.slow_queries
+logger with its name, duration and redacted parameters. When
+SLOW_QUERY_EXPLAIN is on, its plan is captured on a separate connection in
+a background task, so the request that hit the slow query doesn't wait for
+it. Reads are re-run under EXPLAIN (ANALYZE, BUFFERS) to get the plan as
+actually executed. Writes (by their kind in the query registry) only get
+a plain EXPLAIN: re-running them would consume sequence values, wait on
+row locks the request may still hold and double the write load just when
+the database is slow. The
+re-run gives up after SLOW_QUERY_EXPLAIN_TIMEOUT_MS, waiting for locks
+included, so a pathological query can't hold a connection and its locks
+for its full duration a second time; the capture then logs why the plan is
+missing.
+
+Captures are rate-limited per query name: after one capture, further slow
+runs of the same query are only counted until SLOW_QUERY_INTERVAL_SECONDS
+have passed, and the count is included in the next capture.
+"""
+import asyncio
+import datetime
+import decimal
+import json
+import logging
+import re
+from time import monotonic
+from typing import Any, Dict, Optional, Sequence, Set
+
+import asyncpg
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.queries.compiled import QUERIES
+from app.db.queries.query import READ
+
+logger = logging.getLogger("app.slow_queries")
+
+# Parameter types logged as-is; anything else (emails, hashes, names) is redacted
+_NUMBER_TYPES = (bool, int, float)
+_SCALAR_TYPES = (decimal.Decimal, datetime.date, datetime.time, datetime.timedelta)
+
+# Plans show bound parameters inline, e.g. Filter: (email = 'someone@example.com'::text)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+_last_capture: Dict[str, float] = {}
+_suppressed: Dict[str, int] = {}
+_tasks: Set[asyncio.Task] = set()
+
+
+def redact(args: Sequence[Any]) -> list:
+    """Parameters safe to log: numbers and dates as-is, other values by type and size."""
+    redacted = []
+    for value in args:
+        if value is None or isinstance(value, _NUMBER_TYPES):
+            redacted.append(value)
+        elif isinstance(value, _SCALAR_TYPES):
+            redacted.append(str(value))
+        elif isinstance(value, (str, bytes, list, tuple)):
+            redacted.append(f"<{type(value).__name__} len={len(value)}>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    return redacted
+
+
+def observe(name: str, query: str, args: Optional[Sequence[Any]], duration: float) -> None:
+    """
+    Record a finished named query, capturing it if it was slow.
+
+    `args` is None for executemany, whose batches are logged without
+    parameters or a plan.
+    """
+    threshold = settings.SLOW_QUERY_MS
+    if not threshold or duration * 1000 < threshold:
+        return
+    metrics.SLOW_QUERIES.inc(name)
+
+    now = monotonic()
+    last = _last_capture.get(name)
+    if last is not None and now - last < settings.SLOW_QUERY_INTERVAL_SECONDS:
+        _suppressed[name] = _suppressed.get(name, 0) + 1
+        return
+    _last_capture[name] = now
+    suppressed = _suppressed.pop(name, 0)
+
+    task = asyncio.get_running_loop().create_task(_capture(name, query, args, duration, suppressed))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _capture(
+    name: str,
+    query: str,
+    args: Optional[Sequence[Any]],
+    duration: float,
+    suppressed: int
+) -> None:
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN and args is not None:
+        try:
+            registered = QUERIES.get(name)
+            plan = await explain(query, args, analyze=registered is not None and registered.kind == READ)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {type(e).__name__}: {e}"
+
+    logger.warning(json.dumps({
+        "query": name,
+        "duration_ms": round(duration * 1000, 3),
+        "params": None if args is None else redact(args),
+        "suppressed": suppressed,
+        "plan": plan,
+    }))
+
+
+async def explain(query: str, args: Sequence[Any], analyze: bool = True) -> str:
+    """
+    Plan of a query, as actually executed and with buffer usage if analyze is set.
+
+    Runs in a transaction that is rolled back, on its own connection rather
+    than one from the application pool, which may be exhausted when queries
+    are slow, and is cancelled after SLOW_QUERY_EXPLAIN_TIMEOUT_MS.
+    """
+    timeout_ms = settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+    conn = await asyncpg.connect(settings.get_database_url, timeout=timeout_ms / 1000)
+    try:
+        tr = conn.transaction()
+        await tr.start()
+        try:
+            await conn.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            await conn.execute(f"SET LOCAL lock_timeout = {int(timeout_ms)}")
+            options = "(ANALYZE, BUFFERS) " if analyze else ""
+            rows = await conn.fetch(f"EXPLAIN {options}{query}", *args)
+        finally:
+            await tr.rollback()
+    finally:
+        await conn.close()
+    return _STRING_LITERAL.sub("'<redacted>'", "\n".join(row[0] for row in rows))
+
+
+async def drain(timeout: Optional[float] = None) -> None:
+    """Wait for pending captures, e.g. on shutdown."""
+    if _tasks:
+        await asyncio.wait(set(_tasks), timeout=timeout)
+
+
+def reset() -> None:
+    """Forget rate-limiting state."""
+    _last_capture.clear()
+    _suppressed.clear()
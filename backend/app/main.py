@@ -1,12 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from app.core.config import settings
-from app.api.v1 import auth, users, roles, projects
+from app.core.responses import FastJSONResponse
+from app.core import metrics
+from app.core.timing import ServerTimingMiddleware
+from app.core.loop_monitor import LoopMonitor
+from app.core.profiler import ProfilerMiddleware
+from app.core import memory
+from app.api.v1 import auth, users, roles, projects, monitoring, samples, lab, custody, labels, debug
 from app.startup import startup
-from app.db.session import get_db
-from app.db.queries.manager import query_manager
-import asyncpg
+from app.services import labels as label_service
+from app.db.engine import open_pool, close_pool
+from app.db import slow_queries
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +27,8 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
     version="1.0.0",
+    # Keeps FastAPI's direct model-to-JSON path for routes with a response_model
+    default_response_class=FastJSONResponse,
 )
 
 # Set up CORS middleware
@@ -32,32 +40,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route request latency
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Report per-phase timings in a Server-Timing header
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware, log=settings.SERVER_TIMING_LOG)
+
+# Log per-request allocation reports; tracing starts right away to cover startup
+if settings.MEMORY_TRACKING_ENABLED:
+    memory.start()
+    app.add_middleware(memory.MemoryMiddleware)
+
+# Profile requests from superusers that ask for it with X-Profile: 1
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Measure event loop lag, and with LOOP_BLOCK_DEBUG log what is blocking it
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_LAG_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+    dump_stacks=settings.LOOP_BLOCK_DEBUG
+)
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth")
 app.include_router(users.router, prefix=settings.API_V1_STR)
 app.include_router(roles.router, prefix=settings.API_V1_STR)
 app.include_router(projects.router, prefix=settings.API_V1_STR)
+app.include_router(monitoring.router, prefix=settings.API_V1_STR)
+app.include_router(samples.router, prefix=settings.API_V1_STR)
+app.include_router(lab.router, prefix=settings.API_V1_STR)
+app.include_router(custody.router, prefix=settings.API_V1_STR)
+app.include_router(labels.router, prefix=settings.API_V1_STR)
+app.include_router(debug.router, prefix=settings.API_V1_STR)
 
 @app.on_event("startup")
 async def startup_event():
-    """Run startup tasks when the application starts."""
-    await startup()
-    pool = await asyncpg.create_pool(settings.get_database_url)
-    async with pool.acquire() as conn:
-        # Create user_roles_with_permissions view
-        await conn.execute(query_manager.create_user_roles_with_permissions_view)
-    await pool.close()
+    """Run the boot tasks unless a supervisor already has, then open this worker's pool."""
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    await startup(boot_tasks=settings.RUN_BOOT_TASKS, pool=open_pool)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Clean up database objects on shutdown."""
-    pool = await asyncpg.create_pool(settings.get_database_url)
-    async with pool.acquire() as conn:
-        await conn.execute(query_manager.drop_user_roles_with_permissions_view)
-    await pool.close()
+    """Release this worker's resources once its in-flight requests are done.
+
+    Schema objects like the roles view are shared with the other workers and
+    stay in place.
+    """
+    label_service.shutdown_executor()
+    await slow_queries.drain(timeout=5)
+    await loop_monitor.stop()
+    await close_pool()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Expose query, pool and request metrics in Prometheus text format."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 logging.getLogger("passlib.handlers.bcrypt").setLevel(logging.ERROR)
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+class CustodyTransfer(BaseModel):
+    """A hand-off of one or more samples, e.g. a whole cooler scanned at once."""
+    barcodes: List[str] = Field(..., min_length=1, max_length=1000)
+    relinquished_by: Optional[str] = Field(None, min_length=1, max_length=255)
+    received_by: str = Field(..., min_length=1, max_length=255)
+    holder_role: Literal["technician", "courier", "lab"]
+    event_at: Optional[datetime] = None
+
+    @field_validator("barcodes")
+    @classmethod
+    def check_unique(cls, barcodes: List[str]) -> List[str]:
+        if len(set(barcodes)) != len(barcodes):
+            raise ValueError("barcodes must not repeat within a transfer")
+        return barcodes
+
+
+class CustodyEventInDB(BaseModel):
+    id: int
+    sample_id: int
+    barcode: str
+    project_id: int
+    relinquished_by: Optional[str] = None
+    received_by: str
+    holder_role: str
+    event_at: datetime
+    recorded_by: Optional[int] = None
+    created_at: datetime
+
+
+class CustodyHolder(BaseModel):
+    barcode: str
+    project_id: int
+    holder: str
+    holder_role: str
+    since: datetime
+
+
+class CustodyGap(BaseModel):
+    barcode: str
+    event_id: int
+    event_at: datetime
+    relinquished_by: Optional[str] = None
+    expected_holder: str
+    previous_event_at: datetime
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class MemorySite(BaseModel):
+    """Allocations grouped by where they were made."""
+    site: str
+    # Innermost frame in the app package, if the traceback reaches it
+    caller: Optional[str] = None
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = None
+    count_diff: Optional[int] = None
+
+
+class MemoryReport(BaseModel):
+    current_bytes: int
+    peak_bytes: int
+    sites: List[MemorySite]
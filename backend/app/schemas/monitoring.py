@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel, Field, model_validator
+
+
+class ReadingBatch(BaseModel):
+    metric: str = Field(..., min_length=1, max_length=50)
+    timestamps: List[datetime] = Field(..., min_length=1)
+    values: List[float] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.timestamps) != len(self.values):
+            raise ValueError("timestamps and values must have the same length")
+        return self
+
+
+class ReadingAppendResponse(BaseModel):
+    metric: str
+    accepted: int
+    chunks: int
+
+
+class ReadingSeries(BaseModel):
+    metric: str
+    timestamps: List[datetime] = Field(default_factory=list)
+    values: List[float] = Field(default_factory=list)
+
+
+class DownsampledSeries(BaseModel):
+    metric: str
+    start: datetime
+    end: datetime
+    bucket_seconds: float
+    timestamps: List[datetime] = Field(default_factory=list)
+    values: List[float] = Field(default_factory=list)
+    min_values: List[float] = Field(default_factory=list)
+    max_values: List[float] = Field(default_factory=list)
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class SampleCreate(BaseModel):
+    barcode: str = Field(..., min_length=1, max_length=64)
+    sample_type: Literal["field", "field_duplicate"] = "field"
+    parent_barcode: Optional[str] = Field(None, min_length=1, max_length=64)
+    collected_at: datetime
+
+    @model_validator(mode="after")
+    def check_parent(self):
+        if self.sample_type == "field_duplicate" and not self.parent_barcode:
+            raise ValueError("Field duplicates must reference the original sample's barcode")
+        return self
+
+
+class SampleInDB(BaseModel):
+    id: int
+    barcode: str
+    sample_type: str
+    parent_sample_id: Optional[int] = None
+    collected_at: datetime
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LabResultCreate(BaseModel):
+    barcode: Optional[str] = Field(None, min_length=1, max_length=64)
+    result_type: Literal["sample", "method_blank", "surrogate"] = "sample"
+    analyte: str = Field(..., min_length=1, max_length=100)
+    value: Optional[float] = None
+    unit: Optional[str] = Field(None, max_length=20)
+    reporting_limit: Optional[float] = None
+    spike_amount: Optional[float] = None
+    analyzed_at: datetime
+
+    @model_validator(mode="after")
+    def check_barcode(self):
+        if self.result_type != "method_blank" and not self.barcode:
+            raise ValueError("Sample and surrogate results must reference a sample barcode")
+        return self
+
+
+class LabBatchCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    results: List[LabResultCreate] = Field(..., min_length=1)
+
+
+class LabBatchResponse(BaseModel):
+    id: int
+    name: str
+    result_count: int
+    flag_counts: Dict[str, int] = Field(default_factory=dict)
+    created_at: datetime
+
+
+class LabResultInDB(BaseModel):
+    id: int
+    batch_id: int
+    sample_id: Optional[int] = None
+    barcode: Optional[str] = None
+    result_type: str
+    analyte: str
+    value: Optional[float] = None
+    unit: Optional[str] = None
+    reporting_limit: Optional[float] = None
+    spike_amount: Optional[float] = None
+    analyzed_at: datetime
+    qc_flags: List[str] = Field(default_factory=list)
+
+    model_config = ConfigDict(from_attributes=True)
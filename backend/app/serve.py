@@ -0,0 +1,64 @@
+"""
+Production entry point: run the boot tasks once, then start the workers.
+
+    python -m app.serve [--workers N] [--host 0.0.0.0] [--port 8000]
+
+With plain `uvicorn --workers N` every worker would wait for the database,
+migrate, create the views and check the queries itself. Here the supervisor
+process does that once, then starts uvicorn's workers with RUN_BOOT_TASKS
+turned off, so a worker only opens its own pool. Workers default to WEB_CONCURRENCY, which
+defaults to the number of CPUs.
+
+On SIGTERM or SIGINT uvicorn stops accepting connections and each worker
+waits up to GRACEFUL_SHUTDOWN_SECONDS for its in-flight requests before it
+closes its pool. Shutdown never touches shared schema, so a worker stopping
+(or being restarted) doesn't break the others.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.startup import startup
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.BACKEND_PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY)
+    parser.add_argument("--skip-boot", action="store_true", help="don't run the boot tasks, e.g. when a release job did")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
+
+    if not args.skip_boot:
+        asyncio.run(startup())
+    # Worker processes read the environment; a single worker runs in this process
+    os.environ["RUN_BOOT_TASKS"] = "false"
+    settings.RUN_BOOT_TASKS = False
+
+    logger.info(f"Starting {args.workers} worker(s) on {args.host}:{args.port}")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from typing import List
+from fastapi import HTTPException, status
+from asyncpg.pool import Pool
+
+from app.schemas.custody import CustodyTransfer, CustodyEventInDB, CustodyHolder, CustodyGap
+from app.db.queries import custody as queries
+from app.db.queries import projects as project_queries
+from app.db.rows import from_row, from_rows
+from app.services.projects import check_project_access
+from app.services.roles import get_user_role_level
+
+async def record_transfer(
+    db: Pool,
+    transfer: CustodyTransfer,
+    current_user_id: int
+) -> List[CustodyEventInDB]:
+    """
+    Record a hand-off of every scanned sample in one transaction.
+
+    Requires technician role or higher, and supervisor role or higher or
+    assignment to the project of every scanned sample.
+    """
+    role_level = await get_user_role_level(db, current_user_id)
+    if role_level < 50:  # Technician level
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only technicians and higher roles can record custody transfers"
+        )
+
+    event_at = transfer.event_at or datetime.now(timezone.utc)
+
+    rows = await db.fetch(queries.get_custody_samples_by_barcodes, transfer.barcodes)
+    samples = {row["barcode"]: row for row in rows}
+    unknown = [barcode for barcode in transfer.barcodes if barcode not in samples]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sample barcodes: {', '.join(unknown)}"
+        )
+    for project_id in sorted({row["project_id"] for row in rows}):
+        await check_project_access(db, project_id, current_user_id, min_role_level=80)
+
+    async with db.acquire() as conn:
+        async with conn.transaction():
+            events = await conn.fetch(
+                queries.record_custody_events,
+                [samples[barcode]["id"] for barcode in transfer.barcodes],
+                [samples[barcode]["project_id"] for barcode in transfer.barcodes],
+                transfer.relinquished_by,
+                transfer.received_by,
+                transfer.holder_role,
+                event_at,
+                current_user_id
+            )
+
+    return from_rows(CustodyEventInDB, events)
+
+async def get_current_holder(
+    db: Pool,
+    barcode: str,
+    current_user_id: int
+) -> CustodyHolder:
+    """Get who holds a sample right now. Requires supervisor role or higher, or assignment to the project."""
+    holder = await db.fetchrow(queries.get_custody_current_by_barcode, barcode)
+    if not holder:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No custody recorded for this sample"
+        )
+
+    await check_project_access(db, holder["project_id"], current_user_id, min_role_level=80)
+    return from_row(CustodyHolder, holder)
+
+async def get_sample_events(
+    db: Pool,
+    barcode: str,
+    current_user_id: int
+) -> List[CustodyEventInDB]:
+    """Get a sample's full custody history. Requires supervisor role or higher, or assignment to the project."""
+    events = await db.fetch(queries.get_sample_custody_events, barcode)
+    if not events:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No custody recorded for this sample"
+        )
+
+    await check_project_access(db, events[-1]["project_id"], current_user_id, min_role_level=80)
+    return from_rows(CustodyEventInDB, events)
+
+async def _check_project(db: Pool, project_id: int, current_user_id: int) -> None:
+    project = await db.fetchrow(project_queries.get_project, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    await check_project_access(db, project_id, current_user_id, min_role_level=80)
+
+async def get_project_holders(
+    db: Pool,
+    project_id: int,
+    current_user_id: int
+) -> List[CustodyHolder]:
+    """Get the current holder of every sample in a project. Requires supervisor role or higher, or assignment to the project."""
+    await _check_project(db, project_id, current_user_id)
+    rows = await db.fetch(queries.get_project_custody_current, project_id)
+    return from_rows(CustodyHolder, rows)
+
+async def get_project_gaps(
+    db: Pool,
+    project_id: int,
+    current_user_id: int
+) -> List[CustodyGap]:
+    """Get every break in a project's custody chains. Requires supervisor role or higher, or assignment to the project."""
+    await _check_project(db, project_id, current_user_id)
+    rows = await db.fetch(queries.get_project_custody_gaps, project_id)
+    return from_rows(CustodyGap, rows)
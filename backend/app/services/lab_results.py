@@ -0,0 +1,139 @@
+from typing import List
+
+import numpy as np
+from fastapi import HTTPException, status
+from asyncpg import Record
+from asyncpg.pool import Pool
+
+from app.core.qaqc import QCBatch, run_qc, flag_lists
+from app.core.timeseries import datetime_to_ms
+from app.schemas.sample import LabBatchCreate, LabBatchResponse, LabResultInDB
+from app.db.queries import samples as queries
+from app.db.rows import from_rows
+from app.services.roles import get_user_role_level
+
+LAB_RESULT_COLUMNS = [
+    "batch_id", "sample_id", "result_type", "analyte", "value", "unit",
+    "reporting_limit", "spike_amount", "analyzed_at", "qc_flags"
+]
+
+async def import_batch(
+    db: Pool,
+    batch: LabBatchCreate,
+    current_user_id: int
+) -> LabBatchResponse:
+    """Import a batch of lab results, running QA/QC checks over the whole batch."""
+    role_level = await get_user_role_level(db, current_user_id)
+    if role_level < 80:  # Supervisor level
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only supervisors and higher can import lab results"
+        )
+
+    results = batch.results
+    barcodes = sorted({result.barcode for result in results if result.barcode})
+    rows = await db.fetch(queries.get_samples_by_barcodes, barcodes)
+    samples = {row["barcode"]: row for row in rows}
+    missing = [barcode for barcode in barcodes if barcode not in samples]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sample barcodes: {', '.join(missing)}"
+        )
+
+    # Build column arrays once and run every check as a vectorized pass
+    size = len(results)
+    result_samples = [samples.get(result.barcode) for result in results]
+    qc_batch = QCBatch(
+        sample_ids=np.fromiter(
+            (s["id"] if s else -1 for s in result_samples), dtype=np.int64, count=size
+        ),
+        parent_ids=np.fromiter(
+            ((s["parent_sample_id"] or -1) if s else -1 for s in result_samples), dtype=np.int64, count=size
+        ),
+        result_types=np.array([result.result_type for result in results]),
+        analytes=np.array([result.analyte for result in results]),
+        values=np.array([result.value for result in results], dtype=np.float64),
+        reporting_limits=np.array([result.reporting_limit for result in results], dtype=np.float64),
+        spike_amounts=np.array([result.spike_amount for result in results], dtype=np.float64),
+        collected_at=np.fromiter(
+            (datetime_to_ms(s["collected_at"]) if s else -1 for s in result_samples), dtype=np.int64, count=size
+        ),
+        analyzed_at=np.fromiter(
+            (datetime_to_ms(result.analyzed_at) for result in results), dtype=np.int64, count=size
+        ),
+    )
+    masks = run_qc(qc_batch)
+    flags = flag_lists(masks, size)
+
+    try:
+        async with db.acquire() as conn:
+            async with conn.transaction():
+                lab_batch = await conn.fetchrow(
+                    queries.create_lab_batch,
+                    batch.name, current_user_id
+                )
+                await conn.copy_records_to_table(
+                    "lab_results",
+                    columns=LAB_RESULT_COLUMNS,
+                    records=[
+                        (
+                            lab_batch["id"],
+                            sample["id"] if sample else None,
+                            result.result_type,
+                            result.analyte,
+                            result.value,
+                            result.unit,
+                            result.reporting_limit,
+                            result.spike_amount,
+                            result.analyzed_at,
+                            row_flags
+                        )
+                        for result, sample, row_flags in zip(results, result_samples, flags)
+                    ]
+                )
+    except Exception as e:
+        if "lab_batches_name_key" in str(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A lab batch with this name already exists"
+            )
+        raise
+
+    return LabBatchResponse(
+        id=lab_batch["id"],
+        name=lab_batch["name"],
+        result_count=size,
+        flag_counts={flag: int(mask.sum()) for flag, mask in masks.items()},
+        created_at=lab_batch["created_at"]
+    )
+
+async def get_batch_result_rows(
+    db: Pool,
+    batch_id: int,
+    current_user_id: int
+) -> List[Record]:
+    """Get the rows of every result of a lab batch with its QC flags."""
+    role_level = await get_user_role_level(db, current_user_id)
+    if role_level < 50:  # Technician level
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only technicians and higher can view lab results"
+        )
+
+    lab_batch = await db.fetchrow(queries.get_lab_batch, batch_id)
+    if not lab_batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lab batch not found"
+        )
+
+    return await db.fetch(queries.get_lab_batch_results, batch_id)
+
+async def get_batch_results(
+    db: Pool,
+    batch_id: int,
+    current_user_id: int
+) -> List[LabResultInDB]:
+    """Get every result of a lab batch with its QC flags."""
+    return from_rows(LabResultInDB, await get_batch_result_rows(db, batch_id, current_user_id))
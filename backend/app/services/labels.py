@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from asyncpg.pool import Pool
+
+from app.core.config import settings
+from app.core.labels import TEMPLATES, label_barcode, render_pdf_page, render_png_page, build_pdf
+from app.db.queries import projects as queries
+from app.services.roles import get_user_role_level
+
+# Bump when the rendering changes so old sheets in the cache aren't served
+RENDER_VERSION = 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+_locks: Dict[str, asyncio.Lock] = {}
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Rendering is CPU-bound, so it runs in worker processes rather than on the event loop."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.LABEL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def sweep_cache(cache_dir: Path, keep: Path) -> None:
+    """
+    Delete sheets older than LABEL_CACHE_MAX_AGE_SECONDS, then the least
+    recently used ones until the cache fits in LABEL_CACHE_MAX_BYTES.
+
+    Cache hits touch their file, so mtime is the last use. `keep`, the sheet
+    just rendered, is never deleted.
+    """
+    files = []
+    for entry in os.scandir(cache_dir):
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            # Deleted or renamed by another worker meanwhile
+            continue
+    files.sort()
+
+    expired = time.time() - settings.LABEL_CACHE_MAX_AGE_SECONDS
+    total = sum(size for _, size, _ in files)
+    for mtime, size, file_path in files:
+        if mtime >= expired and total <= settings.LABEL_CACHE_MAX_BYTES:
+            break
+        if file_path == str(keep):
+            continue
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def _render(
+    project_id: int,
+    caption: str,
+    start: int,
+    end: int,
+    template: str,
+    fmt: str,
+    page: int
+) -> bytes:
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    per_page = TEMPLATES[template].per_page
+    labels = [(label_barcode(project_id, n), caption) for n in range(start, end + 1)]
+    pages = [labels[i:i + per_page] for i in range(0, len(labels), per_page)]
+
+    if fmt == "png":
+        return await loop.run_in_executor(executor, render_png_page, template, pages[page - 1])
+
+    streams = await asyncio.gather(*(
+        loop.run_in_executor(executor, render_pdf_page, template, page_labels)
+        for page_labels in pages
+    ))
+    return await loop.run_in_executor(executor, build_pdf, template, streams)
+
+async def get_label_sheet(
+    db: Pool,
+    project_id: int,
+    start: int,
+    end: int,
+    template: str,
+    fmt: str,
+    page: int,
+    current_user_id: int
+) -> Path:
+    """
+    Get the path of a rendered label sheet for sample labels start..end of a project.
+    Requires supervisor role or higher.
+
+    Sheets are cached on disk by project, range, template and format, so
+    repeated downloads only render once. The cache is swept by age and size
+    (see sweep_cache) whenever a new sheet is written.
+    """
+    role_level = await get_user_role_level(db, current_user_id)
+    if role_level < 80:  # Supervisor level
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only supervisors and higher roles can print label sheets"
+        )
+
+    project = await db.fetchrow(queries.get_project, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    if template not in TEMPLATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown label template. Available: {', '.join(TEMPLATES)}"
+        )
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'end' must not be before 'start'"
+        )
+    count = end - start + 1
+    if count > settings.LABEL_MAX_COUNT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.LABEL_MAX_COUNT} labels can be printed at once"
+        )
+    if fmt == "pdf":
+        page = 1
+    elif page > -(-count // TEMPLATES[template].per_page):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Page is past the end of the sheet"
+        )
+
+    # The project name is printed on every label, so renaming a project yields new sheets
+    key = hashlib.sha256(
+        f"{RENDER_VERSION}:{project_id}:{project['name']}:{start}:{end}:{template}:{fmt}:{page}".encode()
+    ).hexdigest()
+    path = Path(settings.LABEL_CACHE_DIR) / f"{key}.{fmt}"
+    if _touch(path):
+        return path
+
+    lock = _locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            if _touch(path):
+                return path
+            data = await _render(project_id, project["name"], start, end, template, fmt, page)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+    finally:
+        # Requests already waiting hold the lock itself; later ones find the file
+        if _locks.get(key) is lock:
+            del _locks[key]
+    await asyncio.to_thread(sweep_cache, path.parent, path)
+    return path
+
+def _touch(path: Path) -> bool:
+    """Mark a cached sheet as just used; False if it isn't cached."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
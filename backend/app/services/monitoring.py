@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from asyncpg.pool import Pool
+
+from app.core.config import settings
+from app.core.downsample import lttb
+from app.core.timeseries import (
+    TIMESTAMP_DTYPE, VALUE_DTYPE, datetime_to_ms, ms_to_datetime,
+    encode_chunk, decode_chunk, merge_readings, split_into_chunks, slice_range
+)
+from app.db.queries import monitoring as queries
+from app.schemas.monitoring import ReadingBatch, ReadingAppendResponse, ReadingSeries, DownsampledSeries
+from app.services.projects import check_address_access
+
+EMPTY_TIMESTAMPS = np.empty(0, dtype=TIMESTAMP_DTYPE)
+EMPTY_VALUES = np.empty(0, dtype=VALUE_DTYPE)
+
+# Downsampled series keyed by (address, metric, range, bucket, chunk versions).
+# Every append bumps the version and updated_at of the chunks it touches, so
+# stale entries are never hit.
+_series_cache: "OrderedDict[tuple, DownsampledSeries]" = OrderedDict()
+
+async def append_readings(
+    db: Pool,
+    address_id: int,
+    batch: ReadingBatch,
+    current_user_id: int
+) -> ReadingAppendResponse:
+    """Append readings to an address, merging them into the chunks they fall in."""
+    await check_address_access(db, address_id, current_user_id)
+
+    chunk_ms = settings.MONITORING_CHUNK_SECONDS * 1000
+    timestamps = np.fromiter(
+        (datetime_to_ms(ts) for ts in batch.timestamps),
+        dtype=TIMESTAMP_DTYPE, count=len(batch.timestamps)
+    )
+    values = np.asarray(batch.values, dtype=VALUE_DTYPE)
+    parts = list(split_into_chunks(timestamps, values, chunk_ms))
+
+    async with db.acquire() as conn:
+        async with conn.transaction():
+            # Serialize writers of the same series so concurrent merges don't drop readings
+            await conn.execute(queries.lock_monitoring_series, address_id, batch.metric)
+            existing = await conn.fetch(
+                queries.get_monitoring_chunks_by_start,
+                address_id, batch.metric,
+                [ms_to_datetime(start) for start, _, _ in parts]
+            )
+            existing = {datetime_to_ms(row["chunk_start"]): row for row in existing}
+
+            records = []
+            for start, chunk_ts, chunk_values in parts:
+                row = existing.get(start)
+                if row:
+                    old_ts, old_values = decode_chunk(start, row["ts_data"], row["value_data"])
+                else:
+                    old_ts, old_values = EMPTY_TIMESTAMPS, EMPTY_VALUES
+                chunk_ts, chunk_values = merge_readings(old_ts, old_values, chunk_ts, chunk_values)
+                ts_data, value_data = encode_chunk(start, chunk_ts, chunk_values)
+                records.append((
+                    address_id,
+                    batch.metric,
+                    ms_to_datetime(start),
+                    ms_to_datetime(start + chunk_ms),
+                    len(chunk_ts),
+                    float(chunk_values.min()),
+                    float(chunk_values.max()),
+                    ts_data,
+                    value_data
+                ))
+
+            await conn.executemany(queries.upsert_monitoring_chunk, records)
+
+    return ReadingAppendResponse(
+        metric=batch.metric,
+        accepted=len(timestamps),
+        chunks=len(records)
+    )
+
+async def read_range(
+    db: Pool,
+    address_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode the readings in [start, end) from the chunks overlapping that range."""
+    rows = await db.fetch(
+        queries.get_monitoring_chunks_in_range,
+        address_id, metric, start, end
+    )
+    if not rows:
+        return EMPTY_TIMESTAMPS, EMPTY_VALUES
+
+    decoded = [
+        decode_chunk(datetime_to_ms(row["chunk_start"]), row["ts_data"], row["value_data"])
+        for row in rows
+    ]
+    timestamps = np.concatenate([ts for ts, _ in decoded])
+    values = np.concatenate([vals for _, vals in decoded])
+
+    # Chunks written under a different chunk size may overlap
+    if timestamps.size > 1 and np.any(np.diff(timestamps) <= 0):
+        timestamps, values = merge_readings(EMPTY_TIMESTAMPS, EMPTY_VALUES, timestamps, values)
+
+    return slice_range(timestamps, values, datetime_to_ms(start), datetime_to_ms(end))
+
+def _check_range(start: datetime, end: datetime) -> None:
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be later than 'from'"
+        )
+
+async def get_readings(
+    db: Pool,
+    address_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    current_user_id: int
+) -> ReadingSeries:
+    """Get the raw readings of a metric at an address."""
+    _check_range(start, end)
+    await check_address_access(db, address_id, current_user_id, min_role_level=80)
+    timestamps, values = await read_range(db, address_id, metric, start, end)
+
+    return ReadingSeries(
+        metric=metric,
+        timestamps=[ms_to_datetime(ts) for ts in timestamps.tolist()],
+        values=values.tolist()
+    )
+
+async def get_series(
+    db: Pool,
+    address_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    points: int,
+    current_user_id: int
+) -> DownsampledSeries:
+    """Get a metric downsampled to at most `points` points for charting."""
+    _check_range(start, end)
+    await check_address_access(db, address_id, current_user_id, min_role_level=80)
+
+    # Snap the range to whole buckets of whole seconds so nearby requests share
+    # a cache entry; using points - 1 keeps the snapped range within `points` buckets.
+    start_ms, end_ms = datetime_to_ms(start), datetime_to_ms(end)
+    bucket_ms = -(-(end_ms - start_ms) // max(points - 1, 1))
+    bucket_ms = -(-bucket_ms // 1000) * 1000
+    start_ms = start_ms // bucket_ms * bucket_ms
+    end_ms = -(-end_ms // bucket_ms) * bucket_ms
+    start, end = ms_to_datetime(start_ms), ms_to_datetime(end_ms)
+
+    versions = await db.fetch(
+        queries.get_monitoring_chunk_versions_in_range,
+        address_id, metric, start, end
+    )
+    key = (
+        address_id, metric, start_ms, end_ms, bucket_ms,
+        tuple(tuple(row) for row in versions)
+    )
+    series = _series_cache.get(key)
+    if series is not None:
+        _series_cache.move_to_end(key)
+        return series
+
+    timestamps, values = await read_range(db, address_id, metric, start, end)
+    result = lttb(timestamps, values, start_ms, bucket_ms)
+    series = DownsampledSeries(
+        metric=metric,
+        start=start,
+        end=end,
+        bucket_seconds=bucket_ms / 1000,
+        timestamps=[ms_to_datetime(ts) for ts in result.timestamps.tolist()],
+        values=result.values.tolist(),
+        min_values=result.min_values.tolist(),
+        max_values=result.max_values.tolist()
+    )
+
+    _series_cache[key] = series
+    if len(_series_cache) > settings.SERIES_CACHE_SIZE:
+        _series_cache.popitem(last=False)
+    return series
@@ -1,6 +1,7 @@
 from datetime import date
 from typing import List, Optional
 from fastapi import HTTPException, status
+from asyncpg import Record
 from asyncpg.pool import Pool
 
 from app.schemas.project import (
@@ -8,6 +9,7 @@ from app.schemas.project import (
     AddressCreate, AddressUpdate, AddressInDB
 )
 from app.db.queries import projects as queries
+from app.db.rows import from_row, from_rows
 from app.services.roles import get_user_role_level
 
 async def create_project(
@@ -24,7 +26,7 @@ async def create_project(
         )
     
     result = await db.fetchrow(queries.create_project, project.name)
-    return ProjectInDB(**result)
+    return from_row(ProjectInDB, result)
 
 async def get_project(
     db: Pool,
@@ -58,9 +60,23 @@ async def get_project(
         queries.get_project_addresses,
         project_id
     )
-    addresses = [AddressInDB(**addr) for addr in addresses]
+    addresses = from_rows(AddressInDB, addresses)
     
-    return ProjectWithAddresses(**project, addresses=addresses)
+    return from_row(ProjectWithAddresses, {**project, "addresses": addresses})
+
+async def get_project_address_rows(
+    db: Pool,
+    project_id: int,
+    current_user_id: int
+) -> List[Record]:
+    """Get a project's address rows. Requires supervisor role or higher, or assignment to the project."""
+    if not await db.fetchrow(queries.get_project, project_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    await check_project_access(db, project_id, current_user_id, min_role_level=80)
+    return await db.fetch(queries.get_project_addresses, project_id)
 
 async def update_project(
     db: Pool,
@@ -91,7 +107,7 @@ async def update_project(
             detail="Project not found"
         )
     
-    return ProjectInDB(**updated_project)
+    return from_row(ProjectInDB, updated_project)
 
 async def create_address(
     db: Pool,
@@ -124,7 +140,7 @@ async def create_address(
             project_id, new_address["id"]
         )
         
-        return AddressInDB(**new_address)
+        return from_row(AddressInDB, new_address)
     except Exception as e:
         if "unique_address_per_day" in str(e):
             raise HTTPException(
@@ -176,7 +192,7 @@ async def update_address(
                 detail="Address not found"
             )
         
-        return AddressInDB(**updated_address)
+        return from_row(AddressInDB, updated_address)
     except Exception as e:
         if "unique_address_per_day" in str(e):
             raise HTTPException(
@@ -240,4 +256,40 @@ async def remove_technician(
     await db.execute(
         queries.remove_technician,
         project_id, user_id
-    ) 
\ No newline at end of file
+    )
+
+async def check_project_access(
+    db: Pool,
+    project_id: int,
+    current_user_id: int,
+    min_role_level: int = 50
+) -> None:
+    """Allow users assigned to a project, or with at least min_role_level."""
+    is_assigned = await db.fetchval(
+        queries.check_technician_assigned,
+        project_id, current_user_id
+    )
+    role_level = await get_user_role_level(db, current_user_id)
+    
+    if not is_assigned and role_level < min_role_level:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this project"
+        )
+
+async def check_address_access(
+    db: Pool,
+    address_id: int,
+    current_user_id: int,
+    min_role_level: int = 50
+) -> int:
+    """Return the ID of the project owning an address the user may access."""
+    project_id = await db.fetchval(queries.get_address_project, address_id)
+    if project_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Address not found"
+        )
+    
+    await check_project_access(db, project_id, current_user_id, min_role_level)
+    return project_id
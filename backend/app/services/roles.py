@@ -2,6 +2,7 @@ from typing import Optional, List
 from asyncpg import Pool
 from app.schemas.role import RoleCreate, RoleUpdate, RoleResponse
 from app.db.queries.manager import query_manager
+from app.db.rows import from_row, from_rows
 
 async def get_user_role_level(pool: Pool, user_id: int) -> int:
     """Get the highest role level for a user."""
@@ -22,13 +23,13 @@ class RoleService:
         """Get all roles."""
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(query_manager.get_all_roles)
-            return [RoleResponse(**dict(row)) for row in rows]
+            return from_rows(RoleResponse, rows)
 
     async def get_role_by_id(self, role_id: int) -> Optional[RoleResponse]:
         """Get a role by ID."""
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query_manager.get_role_by_id, role_id)
-            return RoleResponse(**dict(row)) if row else None
+            return from_row(RoleResponse, row) if row else None
 
     async def create_role(self, role_in: RoleCreate) -> RoleResponse:
         """Create a new role."""
@@ -55,7 +56,7 @@ class RoleService:
                 update_data.get('description'),
                 update_data.get('level')
             )
-            return RoleResponse(**dict(row)) if row else None
+            return from_row(RoleResponse, row) if row else None
 
     async def delete_role(self, role_id: int) -> bool:
         """Delete a role."""
@@ -0,0 +1,68 @@
+from typing import List
+from fastapi import HTTPException, status
+from asyncpg import Record
+from asyncpg.pool import Pool
+
+from app.schemas.sample import SampleCreate, SampleInDB
+from app.db.queries import samples as queries
+from app.db.rows import from_row, from_rows
+from app.services.projects import check_address_access
+
+async def create_sample(
+    db: Pool,
+    address_id: int,
+    sample: SampleCreate,
+    current_user_id: int
+) -> SampleInDB:
+    """Create a sample at an address. Requires technician role or higher, or assignment to the project."""
+    await check_address_access(db, address_id, current_user_id)
+
+    parent_id = None
+    if sample.parent_barcode:
+        parent = await db.fetchrow(queries.get_sample_by_barcode, sample.parent_barcode)
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent sample not found"
+            )
+        parent_id = parent["id"]
+
+    try:
+        async with db.acquire() as conn:
+            async with conn.transaction():
+                new_sample = await conn.fetchrow(
+                    queries.create_sample,
+                    sample.barcode, sample.sample_type, parent_id, sample.collected_at
+                )
+
+                # Add sample to address
+                await conn.execute(
+                    queries.add_sample_to_address,
+                    address_id, new_sample["id"]
+                )
+
+        return from_row(SampleInDB, new_sample)
+    except Exception as e:
+        if "samples_barcode_key" in str(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A sample with this barcode already exists"
+            )
+        raise
+
+async def get_address_sample_rows(
+    db: Pool,
+    address_id: int,
+    current_user_id: int
+) -> List[Record]:
+    """Get the rows of the samples taken at an address. Requires supervisor role or higher, or assignment to the project."""
+    await check_address_access(db, address_id, current_user_id, min_role_level=80)
+    return await db.fetch(queries.get_address_samples, address_id)
+
+async def get_address_samples(
+    db: Pool,
+    address_id: int,
+    current_user_id: int
+) -> List[SampleInDB]:
+    """Get the samples taken at an address. Requires supervisor role or higher, or assignment to the project."""
+    return from_rows(SampleInDB, await get_address_sample_rows(db, address_id, current_user_id))
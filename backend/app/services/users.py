@@ -3,6 +3,7 @@ from asyncpg import Pool
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserInDB
 from app.core.security import get_password_hash, verify_password
 from app.db.queries.manager import query_manager
+from app.db.rows import from_row, from_rows
 import asyncpg
 
 class UserService:
@@ -25,7 +26,7 @@ class UserService:
                 query_manager.get_user_by_id,
                 user_id
             )
-            return UserResponse(**dict(row)) if row else None
+            return from_row(UserResponse, row) if row else None
 
     async def create_user(self, user_in: UserCreate) -> UserResponse:
         """Create a new user."""
@@ -52,7 +53,7 @@ class UserService:
                 query_manager.get_user_by_email,
                 email
             )
-            return UserInDB(**dict(row)) if row else None
+            return from_row(UserInDB, row) if row else None
 
     async def update_user(self, user_id: int, user_in: UserUpdate) -> Optional[UserResponse]:
         """Update a user's information."""
@@ -84,7 +85,7 @@ class UserService:
                 query_manager.update_user,
                 *params
             )
-            return UserResponse(**dict(row)) if row else None
+            return from_row(UserResponse, row) if row else None
 
     async def create_superuser(self, user_in: UserCreate) -> UserResponse:
         """Create a new superuser."""
@@ -124,14 +125,17 @@ class UserService:
                     )
                     if not user:
                         raise ValueError("Failed to fetch created superuser")
-                    return UserResponse(**dict(user))
+                    return from_row(UserResponse, user)
                 except Exception as e:
                     # Log the error for debugging
                     print(f"Error creating superuser: {str(e)}")
                     raise ValueError(f"Failed to create superuser: {str(e)}")
 
+    async def get_all_user_rows(self) -> List[asyncpg.Record]:
+        """Get the rows of all users, including their password hashes."""
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(query_manager.get_all_users)
+
     async def get_all_users(self) -> List[UserResponse]:
         """Get all users."""
-        async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query_manager.get_all_users)
-            return [UserResponse(**dict(row)) for row in rows] 
\ No newline at end of file
+        return from_rows(UserResponse, await self.get_all_user_rows()) 
\ No newline at end of file
@@ -1,47 +1,122 @@
 import asyncio
-import socket
 import logging
+import random
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+import asyncpg
+from app.core.config import settings
 from app.db.migrate import run_migrations
+from app.db.queries.manager import check_queries, query_manager
 
 logger = logging.getLogger(__name__)
 
-async def wait_for_db(host: str = "db", port: int = 5432, timeout: int = 30):
-    """Wait for the database to be ready."""
-    start_time = asyncio.get_event_loop().time()
+T = TypeVar("T")
+
+# Errors that mean the server isn't up yet, rather than a wrong password or database name
+NOT_READY_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.ConnectionDoesNotExistError,
+)
+
+class StartupReport:
+    """When each startup step started and how long it took, to see where cold start goes."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (step, start offset, duration) in seconds
+        self.steps: List[Tuple[str, float, float]] = []
+
+    async def run(self, name: str, step: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await step
+        finally:
+            self.steps.append((name, start - self.started, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        return max((offset + duration for _, offset, duration in self.steps), default=0.0)
+
+    def render(self) -> str:
+        lines = [f"Startup took {self.total * 1000:.1f} ms"]
+        for name, offset, duration in sorted(self.steps, key=lambda step: step[1]):
+            lines.append(f"  {name:<10} at {offset * 1000:8.1f} ms  took {duration * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait after a failed attempt: exponential backoff with full jitter."""
+    cap = min(settings.DB_READY_BACKOFF_MAX_MS, settings.DB_READY_BACKOFF_MS * 2 ** (attempt - 1))
+    return random.uniform(0, cap) / 1000
+
+async def wait_for_db(dsn: Optional[str] = None, timeout: Optional[float] = None) -> int:
+    """Wait until the database answers a query, and return the number of attempts it took."""
+    timeout = settings.DB_READY_TIMEOUT_SECONDS if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
     while True:
+        attempt += 1
         try:
-            # Try to connect to the database
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            
-            if result == 0:
-                logger.info("Database is ready!")
-                return True
-                
-        except Exception as e:
-            logger.debug(f"Database not ready: {e}")
-            
-        # Check if we've exceeded the timeout
-        if asyncio.get_event_loop().time() - start_time > timeout:
-            raise TimeoutError(f"Database not ready after {timeout} seconds")
-            
-        await asyncio.sleep(0.1)
-
-async def startup():
-    """Run startup tasks."""
+            conn = await asyncpg.connect(
+                dsn or settings.get_database_url, timeout=max(deadline - loop.time(), 0.1)
+            )
+            try:
+                await conn.fetchval("SELECT 1")
+            finally:
+                await conn.close()
+            logger.info(f"Database is ready after {attempt} attempt(s)")
+            return attempt
+        except NOT_READY_ERRORS as e:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Database not ready after {timeout} seconds: {e!r}") from e
+            delay = min(backoff_delay(attempt), remaining)
+            logger.info(f"Database not ready ({e!r}), retrying in {delay:.2f} s")
+            await asyncio.sleep(delay)
+
+async def create_views():
+    """Create the views the queries read; they are shared by every worker and never dropped."""
+    conn = await asyncpg.connect(settings.get_database_url)
+    try:
+        await conn.execute(query_manager.create_user_roles_with_permissions_view)
+    finally:
+        await conn.close()
+
+async def validate_queries():
+    """Prepare every named query, so one that doesn't match the schema stops startup."""
+    conn = await asyncpg.connect(settings.get_database_url)
+    try:
+        await check_queries(conn)
+    finally:
+        await conn.close()
+
+async def _migrate(report: StartupReport) -> None:
+    # The views read the tables the migrations create, and the queries read both
+    await report.run("migrations", run_migrations())
+    await report.run("views", create_views())
+    await report.run("queries", validate_queries())
+
+async def startup(boot_tasks: bool = True, **steps: Callable[[], Awaitable]) -> StartupReport:
+    """Run the boot tasks and the given steps.
+
+    The boot tasks wait for the database, migrate, create the views and
+    check the queries. Once the database is ready, the migrations and the
+    steps, e.g. opening the worker's pool, run concurrently. Logs and returns
+    a report of how long each step took.
+    """
+    report = StartupReport()
     try:
-        # Wait for database
-        logger.info("Waiting for database to be ready...")
-        await wait_for_db()
-        
-        # Run migrations
-        logger.info("Running migrations...")
-        await run_migrations()
-        
-        logger.info("Startup completed successfully!")
-        
+        if boot_tasks:
+            await report.run("database", wait_for_db())
+        await asyncio.gather(
+            *([_migrate(report)] if boot_tasks else []),
+            *(report.run(name, step()) for name, step in steps.items())
+        )
     except Exception as e:
-        logger.error(f"Startup failed: {e}")
-        raise 
\ No newline at end of file
+        logger.error(f"Startup failed: {e}\n{report.render()}")
+        raise
+    logger.info(report.render())
+    return report
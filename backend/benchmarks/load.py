@@ -0,0 +1,309 @@
+"""
+Load test the API end to end and report throughput and latency per endpoint.
+
+Creates (or reuses) a benchmark database, runs the migrations and seeds it
+with app.db.seed: users in a mix of roles, projects with addresses, and
+technician assignments. Then it sends a fixed number of requests to each endpoint
+with a fixed concurrency. Requests go through httpx, either to the ASGI app
+in this process or, with --uvicorn, to a uvicorn server started for the run.
+
+The report gives requests per second and p50/p95/p99 latency per endpoint.
+With SERVER_TIMING_ENABLED=true it also gives the mean time per phase from
+the Server-Timing header and each phase's share of the server-side total,
+e.g. how much of GET /users goes to serialize. It is written as JSON so runs
+on different commits can be diffed.
+
+The benchmark database is truncated before seeding. It must not be the
+database configured in POSTGRES_DB.
+
+Usage (from backend/):
+    python -m benchmarks.load [--users 200] [--projects 20] [--addresses 50]
+                              [--requests 200] [--concurrency 10]
+                              [--uvicorn [--workers 1]] [--output load.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import asyncpg
+import httpx
+
+from app.core.config import settings
+from app.db.engine import close_pool
+from app.db.migrate import run_migrations
+from app.db.queries.manager import query_manager
+from app.db.seed import SeedOptions, seed_database
+
+PASSWORD = "BenchPass123!@#"
+
+
+def _dsn(database: str) -> str:
+    return (
+        f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+        f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{database}"
+    )
+
+
+async def prepare_database(database: str) -> None:
+    """Create the benchmark database if needed and bring its schema up to date."""
+    conn = await asyncpg.connect(_dsn("postgres"))
+    try:
+        exists = await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", database)
+        if not exists:
+            await conn.execute(f'CREATE DATABASE "{database}"')
+    finally:
+        await conn.close()
+
+    settings.POSTGRES_DB = database
+    await run_migrations()
+    conn = await asyncpg.connect(_dsn(database))
+    try:
+        await conn.execute(query_manager.create_user_roles_with_permissions_view)
+    finally:
+        await conn.close()
+
+
+async def seed(database: str, users: int, projects: int, addresses: int, seed_value: int) -> Dict:
+    """Replace the benchmark data and return the accounts and projects the scenarios use."""
+    options = SeedOptions(users=users, projects=projects, addresses_per_project=addresses, seed=seed_value)
+    await seed_database(_dsn(database), options, password=PASSWORD, truncate=True)
+    conn = await asyncpg.connect(_dsn(database))
+    try:
+        # The seeder always makes user 1 an admin and user 3 a technician on projects 1 to 3
+        emails = dict(await conn.fetch("SELECT id, email FROM users WHERE id IN (1, 3)"))
+    finally:
+        await conn.close()
+    return {
+        "admin": emails[1],
+        "technician": emails[3],
+        "technician_projects": list(range(1, min(3, projects) + 1)),
+    }
+
+
+async def _token(client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def scenarios(client: httpx.AsyncClient, fixtures: Dict) -> Dict[str, Callable[[int], object]]:
+    """Request factories by endpoint; each takes the request's sequence number."""
+    admin = await _token(client, fixtures["admin"])
+    technician = await _token(client, fixtures["technician"])
+    project_ids = fixtures["technician_projects"]
+    run_id = int(time.time())
+    # Revalidating a list the client already has; answered with 304
+    users_etag = (await client.get("/api/v1/users", headers=admin)).headers.get("etag", "")
+
+    def create_address(i: int):
+        project_id = project_ids[i % len(project_ids)]
+        return client.post(
+            f"/api/v1/projects/{project_id}/addresses",
+            json={"name": f"Load {run_id}-{i} Bench Street", "date": "2024-06-01"},
+            headers=technician
+        )
+
+    return {
+        "POST /auth/login": lambda i: client.post(
+            "/api/v1/auth/login", data={"username": fixtures["technician"], "password": PASSWORD}
+        ),
+        "GET /users": lambda i: client.get("/api/v1/users", headers=admin),
+        "GET /users (If-None-Match)": lambda i: client.get(
+            "/api/v1/users", headers={**admin, "If-None-Match": users_etag}
+        ),
+        "GET /users/me": lambda i: client.get("/api/v1/users/me", headers=technician),
+        "GET /projects/{id}": lambda i: client.get(
+            f"/api/v1/projects/{project_ids[i % len(project_ids)]}", headers=technician
+        ),
+        "POST /projects/{id}/addresses": create_address,
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Milliseconds per phase from a Server-Timing header, including total."""
+    phases = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        if duration:
+            phases[name] = float(duration)
+    return phases
+
+
+def phase_shares(timings: List[Dict[str, float]]) -> Dict:
+    """Mean milliseconds per phase and each phase's share of the mean total."""
+    means = {
+        name: sum(timing.get(name, 0.0) for timing in timings) / len(timings)
+        for name in sorted({name for timing in timings for name in timing})
+    }
+    total = means.pop("total", 0.0)
+    return {
+        "total_ms": round(total, 3),
+        "phases_ms": {name: round(mean, 3) for name, mean in means.items()},
+        "share": {name: round(mean / total, 3) if total else 0.0 for name, mean in means.items()},
+    }
+
+
+async def run_endpoint(make_request: Callable[[int], object], requests: int, concurrency: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        await make_request(-1 - i)
+
+    latencies: List[float] = []
+    timings: List[Dict[str, float]] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif "server-timing" in response.headers:
+                timings.append(parse_server_timing(response.headers["server-timing"]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+    if timings:
+        result["server_timing"] = phase_shares(timings)
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _start_uvicorn(database: str, port: int, workers: int) -> subprocess.Popen:
+    # The harness has already migrated the database, so the server skips its startup tasks
+    env = {**os.environ, "POSTGRES_DB": database}
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+            "--lifespan", "off", "--log-level", "warning", "--no-access-log",
+        ],
+        env=env
+    )
+
+
+async def _wait_for_server(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def run(args) -> Dict:
+    await prepare_database(args.database)
+    fixtures = await seed(args.database, args.users, args.projects, args.addresses, args.seed)
+
+    server = None
+    if args.uvicorn:
+        server = _start_uvicorn(args.database, args.port, args.workers)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = {}
+    try:
+        async with client:
+            if server is not None:
+                await _wait_for_server(client)
+            for name, make_request in (await scenarios(client, fixtures)).items():
+                if args.endpoint and name not in args.endpoint:
+                    continue
+                results[name] = await run_endpoint(make_request, args.requests, args.concurrency, args.warmup)
+                print(
+                    f"{name:32} {results[name]['rps']:>9.1f} rps  "
+                    f"p50 {results[name]['p50_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms  "
+                    f"p99 {results[name]['p99_ms']:>8.2f} ms  errors {results[name]['errors']}"
+                )
+                if "server_timing" in results[name]:
+                    shares = results[name]["server_timing"]["share"]
+                    print(f"{'':32} " + "  ".join(f"{phase} {share:.0%}" for phase, share in shares.items()))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        else:
+            await close_pool()
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "mode": f"uvicorn ({args.workers} workers)" if args.uvicorn else "in-process",
+        "dataset": {"users": args.users, "projects": args.projects, "addresses": args.addresses, "seed": args.seed},
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "endpoints": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="enviro_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--addresses", type=int, default=50, help="addresses per project")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per endpoint")
+    parser.add_argument("--endpoint", action="append", help="only run this endpoint, e.g. 'GET /users'")
+    parser.add_argument("--uvicorn", action="store_true", help="drive a real uvicorn server")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default="load-results.json")
+    args = parser.parse_args()
+
+    if os.environ.get("TESTING") == "True":
+        parser.error("unset TESTING; it points every connection at the test database")
+    if args.users < 3 or args.projects < 1:
+        parser.error("the scenarios need at least 3 users and 1 project")
+    if args.database == settings.POSTGRES_DB:
+        parser.error(f"refusing to truncate the application database {args.database!r}")
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure the overhead query instrumentation adds to each named query.
+
+Runs the instrumented wrapper around a coroutine that completes immediately,
+so the difference from awaiting the coroutine directly is the cost of the
+name lookup, timing and histogram updates.
+
+Usage (from backend/):
+    python -m benchmarks.metrics [--iterations 200000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.core import metrics
+from app.db.instrumentation import InstrumentedConnection
+from app.db.queries import users as queries
+from app.db.queries.manager import QUERY_NAMES
+
+ROWS = [object()] * 10
+
+
+async def _query():
+    return ROWS
+
+
+async def _direct(iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await _query()
+    return time.perf_counter() - started
+
+
+async def _instrumented(iterations: int) -> float:
+    query = queries.get_user_by_id
+    observe = InstrumentedConnection._observe
+    started = time.perf_counter()
+    for _ in range(iterations):
+        name = QUERY_NAMES.get(query)
+        await observe(None, name, query, (), _query(), len)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    direct = asyncio.run(_direct(args.iterations))
+    instrumented = asyncio.run(_instrumented(args.iterations))
+    metrics.reset()
+    overhead_us = (instrumented - direct) / args.iterations * 1e6
+    print(f"iterations: {args.iterations}")
+    print(f"overhead:   {overhead_us:.2f} us per query")
+
+
+if __name__ == "__main__":
+    main()
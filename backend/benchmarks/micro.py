@@ -0,0 +1,331 @@
+"""
+Micro-benchmarks for hot paths that don't touch the database.
+
+Each case is timed with timeit: the number of loops is picked so one run
+takes at least 0.2 s, then the run is repeated. The per-call minimum is what
+gets compared, since it is the least affected by other load on the machine.
+
+Results can be saved as a named baseline under .benchmarks/ and compared
+later. compare exits with status 1 when a case got slower by more than the
+threshold, so it can gate optimization work or CI. Baselines only mean
+something on the machine that recorded them.
+
+Usage (from backend/):
+    python -m benchmarks.micro run [--case validate_email] [--repeat 5] [--save NAME]
+    python -m benchmarks.micro compare BASELINE [CURRENT] [--threshold 10]
+
+BASELINE and CURRENT are saved names or paths to result files; without
+CURRENT the cases are run now.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(".benchmarks")
+
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    """Register a benchmark; the decorated setup function returns the callable to time."""
+    def register(setup: Callable[[], Callable[[], object]]):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _user_row(user_id: int) -> Dict:
+    """A row as get_user_by_id and get_all_users return it, roles still as JSON text."""
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    roles = [
+        {
+            "id": role_id,
+            "name": name,
+            "description": f"{name.title()} role",
+            "level": level,
+            "created_at": created.isoformat(),
+            "permissions": [f"{name}:read", f"{name}:write", "projects:read"],
+        }
+        for role_id, name, level in ((1, "admin", 100), (2, "supervisor", 80), (3, "technician", 50))
+    ]
+    return {
+        "id": user_id,
+        "email": f"user{user_id}@example.com",
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "first_name": "Mary",
+        "last_name": "Smith",
+        "is_active": True,
+        "is_superuser": False,
+        "created_at": created,
+        "updated_at": created,
+        "roles": json.dumps(roles),
+    }
+
+
+@case("validate_email")
+def _validate_email():
+    from app.core.validators import validate_email
+    return lambda: validate_email("mary.smith@example.com")
+
+
+@case("validate_password")
+def _validate_password():
+    from app.core.validators import validate_password
+    return lambda: validate_password("TestPass123!@#")
+
+
+@case("create_access_token")
+def _create_access_token():
+    from app.core.security import create_access_token
+    return lambda: create_access_token("mary.smith@example.com")
+
+
+@case("jwt_decode")
+def _jwt_decode():
+    from jose import jwt
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    token = create_access_token("mary.smith@example.com", expires_delta=timedelta(days=365))
+    return lambda: jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
+@case("user_response_from_row")
+def _user_response_from_row():
+    from app.schemas.user import UserResponse
+    row = _user_row(1)
+    return lambda: UserResponse(**row)
+
+
+@case("user_response_construct")
+def _user_response_construct():
+    from app.db.rows import from_row
+    from app.schemas.user import UserResponse
+    row = _user_row(1)
+    return lambda: from_row(UserResponse, row)
+
+
+@case("load_queries")
+def _load_queries():
+    # Queries are precompiled into app.db.queries.compiled; loading them is
+    # importing that module and building the manager from its registry
+    import importlib
+    from app.db.queries import compiled
+    from app.db.queries.manager import SQLQueryManager
+
+    def load():
+        return SQLQueryManager(importlib.reload(compiled).QUERIES)
+    return load
+
+
+@case("serialize_user_list")
+def _serialize_user_list():
+    """GET /users with 100 users, validated and dumped to JSON the way the route does it."""
+    from app.api.v1.users import router
+    from app.schemas.user import UserResponse
+    route = next(r for r in router.routes if r.path == "/users" and "GET" in r.methods)
+    field = route.response_field
+    users = [UserResponse(**_user_row(user_id)) for user_id in range(1, 101)]
+
+    def serialize():
+        value, errors = field.validate(users, {}, loc=("response",))
+        return field.serialize_json(value)
+    return serialize
+
+
+@case("user_list_encoder_path")
+def _user_list_encoder_path():
+    """The same list through jsonable_encoder and json.dumps, the path without serialize_json."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.schemas.user import UserResponse
+    users = [UserResponse(**_user_row(user_id)) for user_id in range(1, 101)]
+    response = JSONResponse([])
+    return lambda: response.render(jsonable_encoder(users))
+
+
+def _address_rows(count: int) -> List[Dict]:
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": i, "name": f"{i} Main Street", "date": (created + timedelta(days=i)).date(),
+         "sample_ids": [i * 10 + n for n in range(5)], "created_at": created + timedelta(hours=i)}
+        for i in range(1, count + 1)
+    ]
+
+
+@case("render_addresses_stdlib")
+def _render_addresses_stdlib():
+    """500 address dicts rendered by FastAPI's JSONResponse after jsonable_encoder."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    rows = _address_rows(500)
+    response = JSONResponse([])
+    return lambda: response.render(jsonable_encoder(rows))
+
+
+@case("render_addresses_orjson")
+def _render_addresses_orjson():
+    """500 address dicts rendered by the app's default response class."""
+    from app.core.responses import FastJSONResponse
+    rows = _address_rows(500)
+    response = FastJSONResponse([])
+    return lambda: response.render(rows)
+
+
+@case("bulk_addresses_json")
+def _bulk_addresses_json():
+    """2000 address rows to JSON through a list response model, as GET /projects/{id}/addresses does."""
+    from pydantic import TypeAdapter
+    from app.db.rows import from_rows
+    from app.schemas.project import AddressInDB
+    rows = _address_rows(2000)
+    adapter = TypeAdapter(List[AddressInDB])
+    return lambda: adapter.dump_json(from_rows(AddressInDB, rows))
+
+
+@case("bulk_addresses_msgpack")
+def _bulk_addresses_msgpack():
+    """The same rows as MessagePack."""
+    from app.core.formats import MSGPACK, bulk_response
+    from app.schemas.project import AddressInDB
+    rows = _address_rows(2000)
+    return lambda: bulk_response(MSGPACK, AddressInDB, rows).body
+
+
+@case("bulk_addresses_arrow")
+def _bulk_addresses_arrow():
+    """The same rows as an Arrow stream."""
+    from app.core.formats import arrow_batches
+    from app.schemas.project import AddressInDB
+    rows = _address_rows(2000)
+    return lambda: b"".join(arrow_batches(AddressInDB, rows, 10000))
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number * 1e9 for total in timer.repeat(repeat, number)]
+    return {
+        "loops": number,
+        "repeat": repeat,
+        "min_ns": round(min(per_call), 1),
+        "median_ns": round(statistics.median(per_call), 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(names: List[str], repeat: int) -> Dict:
+    results = {}
+    for name in names:
+        results[name] = measure(CASES[name](), repeat)
+        print(f"{name:28} {_format_ns(results[name]['min_ns']):>12}  (median {_format_ns(results[name]['median_ns'])})")
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "benchmarks": results,
+    }
+
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def _path(name_or_path: str) -> Path:
+    path = Path(name_or_path)
+    if path.suffix == ".json" or path.exists():
+        return path
+    return BASELINE_DIR / f"{name_or_path}.json"
+
+
+def load(name_or_path: str) -> Dict:
+    with open(_path(name_or_path)) as f:
+        return json.load(f)
+
+
+def save(report: Dict, name: str) -> Path:
+    path = BASELINE_DIR / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print each case's change from the baseline and return the cases that regressed."""
+    regressions = []
+    before, after = baseline["benchmarks"], current["benchmarks"]
+    print(f"baseline {baseline['commit']} ({baseline['timestamp']}), current {current['commit']} ({current['timestamp']})")
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            print(f"{name:28} {'only in current' if name in after else 'only in baseline'}")
+            continue
+        change = (after[name]["min_ns"] / before[name]["min_ns"] - 1) * 100
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:28} {_format_ns(before[name]['min_ns']):>12} -> {_format_ns(after[name]['min_ns']):>12}"
+            f"  {change:+7.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--case", action="append", choices=sorted(CASES), help="only run this case")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--save", metavar="NAME", help="save the results as a baseline")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="saved results to compare; runs the cases if omitted")
+    compare_parser.add_argument("--case", action="append", choices=sorted(CASES), help="only run this case")
+    compare_parser.add_argument("--repeat", type=int, default=5)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=10, help="percentage slowdown reported as a regression"
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.case or list(CASES), args.repeat)
+        if args.save:
+            print(f"baseline saved to {save(report, args.save)}")
+        return None
+
+    baseline = load(args.baseline)
+    if args.current:
+        current = load(args.current)
+    else:
+        names = args.case or [name for name in CASES if name in baseline["benchmarks"]]
+        baseline["benchmarks"] = {name: baseline["benchmarks"][name] for name in names if name in baseline["benchmarks"]}
+        current = run(names, args.repeat)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark the QA/QC pass over a synthetic lab batch.
+
+Usage (from backend/):
+    python -m benchmarks.qaqc [--results 100000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.qaqc import QCBatch, run_qc, flag_lists, DAY_MS
+
+ANALYTES = np.array(["Lead", "Mercury", "Benzene", "Toluene", "Hexavalent Chromium", "Asbestos"])
+
+
+def make_batch(size: int, seed: int = 0) -> QCBatch:
+    """Build a batch of about `size` results: samples, field duplicates, blanks and surrogates."""
+    rng = np.random.default_rng(seed)
+    n_analytes = ANALYTES.size
+    n_samples = max(size // (n_analytes + 1), 1)
+
+    # Every sample gets one result per analyte plus a surrogate; 10% are duplicates of the previous sample
+    sample_ids = np.repeat(np.arange(n_samples, dtype=np.int64), n_analytes + 1)
+    parents = np.where(rng.random(n_samples) < 0.1, np.arange(n_samples) - 1, -1).clip(min=-1)
+    parent_ids = np.repeat(parents, n_analytes + 1).astype(np.int64)
+    result_types = np.tile(np.array(["sample"] * n_analytes + ["surrogate"]), n_samples)
+    analytes = np.tile(np.append(ANALYTES, "Toluene-d8"), n_samples)
+    values = rng.lognormal(1.0, 0.5, sample_ids.size)
+    spike_amounts = np.where(result_types == "surrogate", values / rng.normal(1.0, 0.2, sample_ids.size), np.nan)
+    collected = np.repeat(rng.integers(0, 30, n_samples) * DAY_MS, n_analytes + 1).astype(np.int64)
+    analyzed = collected + rng.integers(0, 20, sample_ids.size) * DAY_MS
+
+    # One method blank per analyte per 20 samples
+    n_blanks = max(n_samples // 20, 1) * n_analytes
+    blank_values = rng.exponential(0.2, n_blanks)
+
+    return QCBatch(
+        sample_ids=np.concatenate([sample_ids, np.full(n_blanks, -1, dtype=np.int64)]),
+        parent_ids=np.concatenate([parent_ids, np.full(n_blanks, -1, dtype=np.int64)]),
+        result_types=np.concatenate([result_types, np.full(n_blanks, "method_blank")]),
+        analytes=np.concatenate([analytes, np.resize(ANALYTES, n_blanks)]),
+        values=np.concatenate([values, blank_values]),
+        reporting_limits=np.concatenate([np.full(sample_ids.size, 0.5), np.full(n_blanks, 0.5)]),
+        spike_amounts=np.concatenate([spike_amounts, np.full(n_blanks, np.nan)]),
+        collected_at=np.concatenate([collected, np.full(n_blanks, -1, dtype=np.int64)]),
+        analyzed_at=np.concatenate([analyzed, np.full(n_blanks, 20 * DAY_MS, dtype=np.int64)]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    batch = make_batch(args.results)
+    size = batch.values.size
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        masks = run_qc(batch)
+        flag_lists(masks, size)
+        timings.append(time.perf_counter() - started)
+
+    counts = {flag: int(mask.sum()) for flag, mask in masks.items()}
+    print(f"results: {size}")
+    print(f"flags:   {counts}")
+    print(f"latency: best {min(timings) * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms over {args.repeat} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Replay recorded API traffic against a seeded database.
+
+Reads the JSON access log lines ServerTimingMiddleware writes on the
+app.timing logger (SERVER_TIMING_LOG=true), one request per line; anything
+before the first "{" on a line, such as a log formatter's prefix, is ignored.
+Each request is sent at its original offset from the first one, divided by
+--speed, without waiting for earlier responses. Concurrency therefore
+follows the recording, and --speed 10 replays an hour in six minutes.
+
+The recording's ids don't exist in the benchmark data, so they are mapped
+onto it. User ids, project ids and address ids wrap around the number of
+seeded rows, and batch ids follow project ids since the seeder makes one lab
+batch per project. Requests are authenticated with tokens minted for the
+mapped users. Logins and new addresses get generated bodies. Other writes
+are skipped and counted, because the log doesn't record request bodies.
+
+The report gives latency percentiles per route template, with the recorded
+durations next to them. It also counts responses whose status differs from
+the recording, and how late requests started when the target fell behind.
+
+The database is prepared and seeded the same way as benchmarks.load, unless
+--no-seed reuses data a previous run left there.
+
+Usage (from backend/):
+    python -m benchmarks.replay access.log [more.log ...] [--speed 1]
+                                [--users 200] [--projects 20] [--addresses 50] [--no-seed]
+                                [--uvicorn [--workers 1]] [--output replay.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+import asyncpg
+import httpx
+from starlette.routing import compile_path
+
+from app.core.config import settings
+from app.db.engine import close_pool
+from app.core.security import create_access_token
+from benchmarks.load import (
+    PASSWORD, _dsn, _git_commit, _start_uvicorn, _wait_for_server, percentile, prepare_database, seed
+)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH"}
+# Keeps generated address names unique across runs on the same data
+RUN_ID = int(time.time())
+
+
+class Record(NamedTuple):
+    """One logged request; `at` is seconds after the first request in the log."""
+    at: float
+    method: str
+    path: str
+    query: str
+    status: int
+    user_id: Optional[int]
+    duration_ms: float
+
+
+class Dataset(NamedTuple):
+    users: int
+    projects: int
+    addresses: int
+
+
+def read_log(paths: Iterable[str]) -> List[Record]:
+    entries = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                start = line.find("{")
+                if start < 0:
+                    continue
+                try:
+                    entry = json.loads(line[start:])
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and {"ts", "method", "path"} <= entry.keys():
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry["ts"])
+    if not entries:
+        return []
+    first = entries[0]["ts"]
+    return [
+        Record(
+            at=entry["ts"] - first,
+            method=entry["method"],
+            path=entry["path"],
+            query=entry.get("query", ""),
+            status=entry.get("status", 0),
+            user_id=entry.get("user_id"),
+            duration_ms=entry.get("duration_ms", 0.0),
+        )
+        for entry in entries
+    ]
+
+
+def route_templates(app) -> List[Tuple[str, str, Pattern]]:
+    """(method, path template, regex) for every route in the app's OpenAPI schema."""
+    routes = []
+    for template, operations in app.openapi()["paths"].items():
+        regex, _, _ = compile_path(template)
+        for method in operations:
+            routes.append((method.upper(), template, regex))
+    return routes
+
+
+def match(routes: List[Tuple[str, str, Pattern]], method: str, path: str) -> Tuple[str, Dict[str, str]]:
+    """The route template a request was served by and its path parameters."""
+    for route_method, template, regex in routes:
+        found = regex.match(path)
+        if found and route_method == method:
+            return template, found.groupdict()
+    return path, {}
+
+
+def _wrap(value: int, size: int) -> int:
+    return (value - 1) % max(size, 1) + 1
+
+
+def map_user(dataset: Dataset, user_id: int) -> int:
+    return _wrap(user_id, dataset.users)
+
+
+# Path parameters holding ids of seeded rows, and how to map them
+ID_PARAMS: Dict[str, Callable[[Dataset, int], int]] = {
+    "user_id": map_user,
+    "project_id": lambda dataset, value: _wrap(value, dataset.projects),
+    "address_id": lambda dataset, value: _wrap(value, dataset.addresses),
+    "batch_id": lambda dataset, value: _wrap(value, dataset.projects),
+}
+
+
+def rewrite_path(template: str, params: Dict[str, str], dataset: Dataset) -> str:
+    def replace(found: re.Match) -> str:
+        name = found.group(1)
+        value = params[name]
+        if name in ID_PARAMS and value.isdigit():
+            return str(ID_PARAMS[name](dataset, int(value)))
+        return value
+    return re.sub(r"{(\w+)}", replace, template)
+
+
+def _login_body(index: int, dataset: Dataset, emails: Dict[int, str]) -> Dict:
+    # Logins aren't attributed to a user, so they cycle through the seeded users
+    return {"data": {"username": emails[login_user(dataset, index)], "password": PASSWORD}}
+
+
+def _address_body(index: int, dataset: Dataset, emails: Dict[int, str]) -> Dict:
+    visit = date(2024, 1, 1) + timedelta(days=index % 365)
+    return {"json": {"name": f"Replay {RUN_ID}-{index} Street", "date": visit.isoformat()}}
+
+
+def login_user(dataset: Dataset, index: int) -> int:
+    return _wrap(index + 1, dataset.users)
+
+
+# Request bodies for the writes that can be replayed, by route
+BODIES: Dict[str, Callable[[int, Dataset, Dict[int, str]], Dict]] = {
+    f"POST {settings.API_V1_STR}/auth/login": _login_body,
+    f"POST {settings.API_V1_STR}/projects/{{project_id}}/addresses": _address_body,
+}
+
+
+class Request(NamedTuple):
+    at: float
+    route: str
+    method: str
+    url: str
+    user_id: Optional[int]
+    # Builds the request body for writes, from the request's position
+    body: Optional[Callable[[int, Dataset, Dict[int, str]], Dict]]
+    recorded: Record
+
+
+def plan(records: List[Record], routes, dataset: Dataset) -> Tuple[List[Request], Dict[str, int]]:
+    """Turn logged requests into requests against the dataset; also return skipped counts by route."""
+    requests, skipped = [], defaultdict(int)
+    for index, record in enumerate(records):
+        template, params = match(routes, record.method, record.path)
+        route = f"{record.method} {template}"
+        body = None
+        if record.method in WRITE_METHODS:
+            if route not in BODIES:
+                skipped[route] += 1
+                continue
+            body = BODIES[route]
+        url = rewrite_path(template, params, dataset) if params else record.path
+        if record.query:
+            url = f"{url}?{record.query}"
+        user_id = map_user(dataset, record.user_id) if record.user_id is not None else None
+        requests.append(Request(record.at, route, record.method, url, user_id, body, record))
+    return requests, dict(skipped)
+
+
+async def dataset_of(dsn: str) -> Dataset:
+    conn = await asyncpg.connect(dsn)
+    try:
+        return Dataset(*[
+            await conn.fetchval(f"SELECT count(*) FROM {table}") for table in ("users", "projects", "addresses")
+        ])
+    finally:
+        await conn.close()
+
+
+async def user_emails(dsn: str, user_ids: Iterable[int]) -> Dict[int, str]:
+    conn = await asyncpg.connect(dsn)
+    try:
+        return dict(await conn.fetch("SELECT id, email FROM users WHERE id = ANY($1::int[])", list(user_ids)))
+    finally:
+        await conn.close()
+
+
+async def replay(client: httpx.AsyncClient, requests: List[Request], dataset: Dataset,
+                 emails: Dict[int, str], speed: float, max_in_flight: int) -> Dict:
+    loop = asyncio.get_running_loop()
+    headers = {
+        user_id: {"Authorization": f"Bearer {create_access_token(email)}"} for user_id, email in emails.items()
+    }
+    slots = asyncio.Semaphore(max_in_flight)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    recorded: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    mismatches: Dict[str, int] = defaultdict(int)
+    lags: List[float] = []
+    in_flight = peak = 0
+
+    async def send(index: int, request: Request, due: float) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        lags.append(max(0.0, loop.time() - due))
+        kwargs = request.body(index, dataset, emails) if request.body is not None else {}
+        started = perf_counter()
+        try:
+            response = await client.request(
+                request.method, request.url, headers=headers.get(request.user_id), **kwargs
+            )
+            status = response.status_code
+        except httpx.TransportError:
+            status = 0
+        finally:
+            in_flight -= 1
+            slots.release()
+        latencies[request.route].append(perf_counter() - started)
+        recorded[request.route].append(request.recorded.duration_ms / 1000)
+        if status == 0 or status >= 500:
+            errors[request.route] += 1
+        if status != request.recorded.status:
+            mismatches[request.route] += 1
+
+    tasks = set()
+    start = loop.time()
+    for index, request in enumerate(requests):
+        due = start + request.at / speed
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        task = loop.create_task(send(index, request, due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    lags.sort()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "peak_in_flight": peak,
+        "start_lag_ms": {
+            "p50": round(percentile(lags, 50) * 1000, 3),
+            "p99": round(percentile(lags, 99) * 1000, 3),
+            "max": round(lags[-1] * 1000, 3),
+        } if lags else {},
+        "routes": {
+            route: {
+                "requests": len(values),
+                "errors": errors[route],
+                "status_mismatches": mismatches[route],
+                **_distribution(values),
+                "recorded": _distribution(recorded[route]),
+            }
+            for route, values in sorted(latencies.items())
+        },
+    }
+
+
+def _distribution(seconds: List[float]) -> Dict:
+    values = sorted(seconds)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+def recorded_peak(records: List[Record]) -> int:
+    """Most requests the recording had in flight at once."""
+    events = sorted(
+        [(record.at, 1) for record in records] + [(record.at + record.duration_ms / 1000, -1) for record in records]
+    )
+    peak = current = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+async def run(args) -> Dict:
+    records = read_log(args.log)
+    if not records:
+        raise SystemExit("no access log entries found")
+
+    await prepare_database(args.database)
+    if not args.no_seed:
+        await seed(args.database, args.users, args.projects, args.addresses, args.seed)
+    dsn = _dsn(args.database)
+    dataset = await dataset_of(dsn)
+
+    from app.main import app
+    requests, skipped = plan(records, route_templates(app), dataset)
+    logins = sum(1 for request in requests if request.body is _login_body)
+    needed = {request.user_id for request in requests if request.user_id is not None}
+    needed |= {login_user(dataset, index) for index in range(len(requests))} if logins else set()
+    emails = await user_emails(dsn, needed)
+
+    server = None
+    if args.uvicorn:
+        server = _start_uvicorn(args.database, args.port, args.workers)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=60)
+
+    try:
+        async with client:
+            if server is not None:
+                await _wait_for_server(client)
+            results = await replay(client, requests, dataset, emails, args.speed, args.max_in_flight)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        else:
+            await close_pool()
+
+    for route, stats in results["routes"].items():
+        print(
+            f"{route:56} {stats['requests']:>7}  p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+            f"p99 {stats['p99_ms']:>8.2f} ms  (recorded p50 {stats['recorded']['p50_ms']:.2f} ms)  "
+            f"errors {stats['errors']}  mismatched {stats['status_mismatches']}"
+        )
+    for route, count in sorted(skipped.items()):
+        print(f"{route:56} {count:>7}  skipped, no request body")
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "mode": f"uvicorn ({args.workers} workers)" if args.uvicorn else "in-process",
+        "logs": args.log,
+        "speed": args.speed,
+        "dataset": dataset._asdict(),
+        "recorded": {
+            "requests": len(records),
+            "duration_s": round(records[-1].at, 3),
+            "peak_in_flight": recorded_peak(records),
+        },
+        "skipped": skipped,
+        **results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="+", help="access log files")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay this many times faster than recorded")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=50,
+        help="cap on requests waiting for a response; later requests start late instead"
+    )
+    parser.add_argument("--database", default="enviro_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--addresses", type=int, default=50, help="addresses per project")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--uvicorn", action="store_true", help="drive a real uvicorn server")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default="replay-results.json")
+    args = parser.parse_args()
+
+    if os.environ.get("TESTING") == "True":
+        parser.error("unset TESTING; it points every connection at the test database")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.database == settings.POSTGRES_DB:
+        parser.error(f"refusing to replay writes against the application database {args.database!r}")
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# Run the boot tasks once, then start WEB_CONCURRENCY workers (default: one per CPU)
+exec python -m app.serve --host 0.0.0.0 --port "${BACKEND_PORT:-8000}"
@@ -0,0 +1,71 @@
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+async def create_samples(client: AsyncClient, headers: dict, barcodes: list) -> int:
+    project = await client.post("/api/v1/projects/", json={"name": "Custody Project"}, headers=headers)
+    project_id = project.json()["id"]
+    address = await client.post(
+        f"/api/v1/projects/{project_id}/addresses",
+        json={"name": "123 Custody St", "date": date(2024, 1, 1).isoformat()},
+        headers=headers
+    )
+    for barcode in barcodes:
+        await client.post(
+            f"/api/v1/addresses/{address.json()['id']}/samples",
+            json={"barcode": barcode, "collected_at": "2024-01-01T09:00:00Z"},
+            headers=headers
+        )
+    return project_id
+
+async def test_scan_cooler_and_look_up(client: AsyncClient, admin_token_headers):
+    """Test scanning a cooler of samples and reading custody back."""
+    project_id = await create_samples(client, admin_token_headers, ["S-0001", "S-0002"])
+
+    response = await client.post(
+        "/api/v1/custody/transfers",
+        json={"barcodes": ["S-0001", "S-0002"], "received_by": "Courier B", "holder_role": "courier"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    response = await client.get("/api/v1/custody/samples/S-0002", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json()["holder"] == "Courier B"
+
+    response = await client.get("/api/v1/custody/samples/S-0002/events", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+    response = await client.get(f"/api/v1/custody/projects/{project_id}", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert [h["barcode"] for h in response.json()] == ["S-0001", "S-0002"]
+
+    response = await client.get(f"/api/v1/custody/projects/{project_id}/gaps", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+async def test_scan_repeated_barcode(client: AsyncClient, admin_token_headers):
+    """Test that a scan can't list the same barcode twice."""
+    response = await client.post(
+        "/api/v1/custody/transfers",
+        json={"barcodes": ["S-0001", "S-0001"], "received_by": "Courier B", "holder_role": "courier"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 422
+
+async def test_scan_unauthorized(client: AsyncClient):
+    """Test scanning without a token."""
+    response = await client.post(
+        "/api/v1/custody/transfers",
+        json={"barcodes": ["S-0001"], "received_by": "Courier B", "holder_role": "courier"}
+    )
+    assert response.status_code == 401
+
+async def test_unknown_sample(client: AsyncClient, admin_token_headers):
+    """Test looking up custody of a sample that was never scanned."""
+    response = await client.get("/api/v1/custody/samples/S-9999", headers=admin_token_headers)
+    assert response.status_code == 404
@@ -0,0 +1,119 @@
+import tracemalloc
+import pytest
+from httpx import AsyncClient
+from app.core import memory, profiler
+from app.core.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture(autouse=True)
+def profile_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1)
+
+async def test_superuser_request_is_profiled(client: AsyncClient, superuser_token_headers):
+    """Test that a superuser's request is profiled and the profile can be downloaded."""
+    # Password hashing keeps the loop busy long enough for plenty of samples
+    response = await client.post(
+        "/api/v1/users",
+        headers={**superuser_token_headers, "X-Profile": "1"},
+        json={
+            "email": "profiled@example.com",
+            "password": "TestPass123!@#",
+            "first_name": "Profiled",
+            "last_name": "User"
+        }
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile"]
+
+    response = await client.get(f"/api/v1/debug/profiles/{profile_id}", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    stacks = {}
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    assert any("create_user" in stack and "get_password_hash" in stack for stack in stacks)
+
+async def test_query_flag(client: AsyncClient, superuser_token_headers):
+    """Test that profiling can also be requested with a query parameter."""
+    response = await client.get("/api/v1/users/me?profile=1", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert profiler.profile_path(response.headers["x-profile"]).exists()
+
+async def test_non_superuser_is_not_profiled(client: AsyncClient, normal_user_token_headers):
+    """Test that other users' requests run normally without a profile."""
+    response = await client.get(
+        "/api/v1/users/me", headers={**normal_user_token_headers, "X-Profile": "1"}
+    )
+    assert response.status_code == 200
+    assert response.headers["x-profile"] == "denied"
+
+async def test_unrequested_request_has_no_profile(client: AsyncClient, superuser_token_headers):
+    """Test that requests are only profiled when they ask for it."""
+    response = await client.get("/api/v1/users/me", headers=superuser_token_headers)
+    assert "x-profile" not in response.headers
+
+async def test_concurrency_cap(client: AsyncClient, superuser_token_headers):
+    """Test that requests beyond the concurrency cap aren't profiled."""
+    assert profiler._semaphore.acquire(blocking=False)
+    try:
+        response = await client.get(
+            "/api/v1/users/me", headers={**superuser_token_headers, "X-Profile": "1"}
+        )
+    finally:
+        profiler._semaphore.release()
+    assert response.status_code == 200
+    assert response.headers["x-profile"] == "busy"
+
+async def test_download_requires_superuser(client: AsyncClient, normal_user_token_headers):
+    """Test that only superusers can download profiles."""
+    response = await client.get(
+        "/api/v1/debug/profiles/20240101T000000-0123abcd", headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+async def test_missing_profile(client: AsyncClient, superuser_token_headers):
+    """Test that unknown and malformed profile ids are rejected."""
+    response = await client.get(
+        "/api/v1/debug/profiles/20240101T000000-0123abcd", headers=superuser_token_headers
+    )
+    assert response.status_code == 404
+    response = await client.get("/api/v1/debug/profiles/..%2Fetc", headers=superuser_token_headers)
+    assert response.status_code in (404, 422)
+
+@pytest.fixture
+def stop_tracing():
+    yield
+    memory.stop()
+
+async def test_memory_snapshot_and_diff(client: AsyncClient, superuser_token_headers, stop_tracing):
+    """Test taking a baseline snapshot and diffing against it."""
+    response = await client.get("/api/v1/debug/memory/diff", headers=superuser_token_headers)
+    assert response.status_code == 409
+
+    response = await client.post("/api/v1/debug/memory/snapshot", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert tracemalloc.is_tracing()
+
+    response = await client.get("/api/v1/debug/memory?limit=5", headers=superuser_token_headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["current_bytes"] > 0
+    assert len(report["sites"]) <= 5
+
+    response = await client.get("/api/v1/debug/memory/diff", headers=superuser_token_headers)
+    assert response.status_code == 200
+    for site in response.json()["sites"]:
+        assert site["size_diff_bytes"] > 0
+
+    response = await client.delete("/api/v1/debug/memory/snapshot", headers=superuser_token_headers)
+    assert response.status_code == 204
+    assert not tracemalloc.is_tracing()
+
+async def test_memory_requires_superuser(client: AsyncClient, normal_user_token_headers):
+    """Test that only superusers can inspect memory."""
+    response = await client.post("/api/v1/debug/memory/snapshot", headers=normal_user_token_headers)
+    assert response.status_code == 403
+    assert not tracemalloc.is_tracing()
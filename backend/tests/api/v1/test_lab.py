@@ -0,0 +1,63 @@
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+async def create_sample(client: AsyncClient, headers: dict, barcode: str) -> None:
+    project = await client.post("/api/v1/projects/", json={"name": f"Project {barcode}"}, headers=headers)
+    address = await client.post(
+        f"/api/v1/projects/{project.json()['id']}/addresses",
+        json={"name": f"Address {barcode}", "date": date(2024, 1, 1).isoformat()},
+        headers=headers
+    )
+    await client.post(
+        f"/api/v1/addresses/{address.json()['id']}/samples",
+        json={"barcode": barcode, "collected_at": "2024-01-01T09:00:00Z"},
+        headers=headers
+    )
+
+BATCH = {
+    "name": "Batch 1",
+    "results": [
+        {"barcode": "S-0001", "analyte": "Lead", "value": 12.0, "analyzed_at": "2024-01-03T09:00:00Z"},
+        {"result_type": "method_blank", "analyte": "Lead", "value": 1.0, "reporting_limit": 0.5, "analyzed_at": "2024-01-03T09:00:00Z"}
+    ]
+}
+
+async def test_import_batch_and_get_results(client: AsyncClient, admin_token_headers):
+    """Test importing a lab batch and reading its flagged results."""
+    await create_sample(client, admin_token_headers, "S-0001")
+
+    response = await client.post("/api/v1/lab-batches", json=BATCH, headers=admin_token_headers)
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["result_count"] == 2
+    assert batch["flag_counts"] == {"blank_contamination": 1, "blank_detected": 1}
+
+    response = await client.get(f"/api/v1/lab-batches/{batch['id']}/results", headers=admin_token_headers)
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["qc_flags"] == ["blank_detected"]
+    assert results[1]["qc_flags"] == ["blank_contamination"]
+
+async def test_import_batch_unauthorized(client: AsyncClient):
+    """Test importing a batch without a token."""
+    response = await client.post("/api/v1/lab-batches", json=BATCH)
+    assert response.status_code == 401
+
+async def test_import_batch_requires_barcode_for_samples(client: AsyncClient, admin_token_headers):
+    """Test that sample results must reference a barcode."""
+    batch = {"name": "Batch 1", "results": [{"analyte": "Lead", "value": 1.0, "analyzed_at": "2024-01-03T09:00:00Z"}]}
+    response = await client.post("/api/v1/lab-batches", json=batch, headers=admin_token_headers)
+    assert response.status_code == 422
+
+async def test_import_empty_batch(client: AsyncClient, admin_token_headers):
+    """Test that a batch must contain results."""
+    response = await client.post("/api/v1/lab-batches", json={"name": "Batch 1", "results": []}, headers=admin_token_headers)
+    assert response.status_code == 422
+
+async def test_get_results_forbidden(client: AsyncClient, normal_user_token_headers):
+    """Test that users without a role can't read lab results."""
+    response = await client.get("/api/v1/lab-batches/1/results", headers=normal_user_token_headers)
+    assert response.status_code == 403
@@ -0,0 +1,50 @@
+import pytest
+from httpx import AsyncClient
+from app.core.config import settings
+from app.services import labels as label_service
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def label_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LABEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "LABEL_WORKERS", 2)
+    yield tmp_path
+    label_service.shutdown_executor()
+
+async def test_download_label_sheet(client: AsyncClient, admin_token_headers, label_cache):
+    """Test downloading label sheets as PDF and PNG."""
+    project = await client.post("/api/v1/projects/", json={"name": "Label Project"}, headers=admin_token_headers)
+    project_id = project.json()["id"]
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/labels",
+        params={"start": 1, "end": 30},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert f"labels-project-{project_id}-1-30.pdf" in response.headers["content-disposition"]
+    assert response.content.startswith(b"%PDF")
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/labels",
+        params={"start": 1, "end": 30, "format": "png", "template": "avery-5163", "page": 3},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+
+async def test_download_label_sheet_invalid_format(client: AsyncClient, admin_token_headers):
+    """Test requesting an unsupported format."""
+    response = await client.get(
+        "/api/v1/projects/1/labels",
+        params={"start": 1, "end": 30, "format": "svg"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 422
+
+async def test_download_label_sheet_unauthorized(client: AsyncClient):
+    """Test downloading labels without a token."""
+    response = await client.get("/api/v1/projects/1/labels", params={"start": 1, "end": 30})
+    assert response.status_code == 401
@@ -0,0 +1,97 @@
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+async def create_address(client: AsyncClient, headers: dict) -> int:
+    """Create a project with one address and return the address ID."""
+    project = await client.post("/api/v1/projects/", json={"name": "Monitoring Project"}, headers=headers)
+    response = await client.post(
+        f"/api/v1/projects/{project.json()['id']}/addresses",
+        json={"name": "123 Monitor St", "date": date(2024, 1, 1).isoformat()},
+        headers=headers
+    )
+    return response.json()["id"]
+
+READINGS = {
+    "metric": "pm25",
+    "timestamps": ["2024-01-01T00:00:00Z", "2024-01-01T00:00:05Z", "2024-01-01T01:00:00Z"],
+    "values": [12.5, 13.0, 9.75]
+}
+
+async def test_append_and_read_readings(client: AsyncClient, admin_token_headers):
+    """Test appending readings and reading them back over a time range."""
+    address_id = await create_address(client, admin_token_headers)
+
+    response = await client.post(
+        f"/api/v1/addresses/{address_id}/readings", json=READINGS, headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {"metric": "pm25", "accepted": 3, "chunks": 2}
+
+    response = await client.get(
+        f"/api/v1/addresses/{address_id}/readings",
+        params={"metric": "pm25", "from": "2024-01-01T00:00:00Z", "to": "2024-01-01T00:30:00Z"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metric"] == "pm25"
+    assert data["values"] == [12.5, 13.0]
+    assert len(data["timestamps"]) == 2
+
+async def test_append_readings_unauthorized(client: AsyncClient):
+    """Test appending readings without a token."""
+    response = await client.post("/api/v1/addresses/1/readings", json=READINGS)
+    assert response.status_code == 401
+
+async def test_append_readings_length_mismatch(client: AsyncClient, admin_token_headers):
+    """Test that timestamps and values must line up."""
+    address_id = await create_address(client, admin_token_headers)
+    response = await client.post(
+        f"/api/v1/addresses/{address_id}/readings",
+        json={**READINGS, "values": [1.0]},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 422
+
+async def test_read_readings_invalid_range(client: AsyncClient, admin_token_headers):
+    """Test that the end of the range must be after its start."""
+    address_id = await create_address(client, admin_token_headers)
+    response = await client.get(
+        f"/api/v1/addresses/{address_id}/readings",
+        params={"metric": "pm25", "from": "2024-01-02T00:00:00Z", "to": "2024-01-01T00:00:00Z"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 400
+
+async def test_read_readings_missing_params(client: AsyncClient, admin_token_headers):
+    """Test that metric and range are required."""
+    response = await client.get("/api/v1/addresses/1/readings", headers=admin_token_headers)
+    assert response.status_code == 422
+
+async def test_get_series(client: AsyncClient, admin_token_headers):
+    """Test getting a downsampled series with min/max envelopes."""
+    address_id = await create_address(client, admin_token_headers)
+    await client.post(f"/api/v1/addresses/{address_id}/readings", json=READINGS, headers=admin_token_headers)
+
+    response = await client.get(
+        f"/api/v1/addresses/{address_id}/series",
+        params={"metric": "pm25", "from": "2024-01-01T00:00:00Z", "to": "2024-01-02T00:00:00Z", "points": 10},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["timestamps"]) <= 10
+    assert data["bucket_seconds"] > 0
+    assert set(data) >= {"values", "min_values", "max_values", "start", "end"}
+
+async def test_get_series_invalid_points(client: AsyncClient, admin_token_headers):
+    """Test that the number of points is bounded."""
+    response = await client.get(
+        "/api/v1/addresses/1/series",
+        params={"metric": "pm25", "from": "2024-01-01T00:00:00Z", "to": "2024-01-02T00:00:00Z", "points": 1},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 422
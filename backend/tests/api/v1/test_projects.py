@@ -1,3 +1,5 @@
+import msgpack
+import pyarrow as pa
 import pytest
 from datetime import date
 from httpx import AsyncClient
@@ -202,4 +204,43 @@ async def test_update_address_preserves_date(client: AsyncClient, db_pool, techn
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "456 New St"
-    assert data["date"] == original_date.isoformat() 
\ No newline at end of file
+    assert data["date"] == original_date.isoformat() 
+
+@pytest.mark.asyncio
+async def test_list_project_addresses_in_each_format(client: AsyncClient, admin_token_headers):
+    """Test listing a project's addresses as JSON, MessagePack and Arrow."""
+    create_response = await client.post("/api/v1/projects/", json={"name": "Bulk Project"}, headers=admin_token_headers)
+    project_id = create_response.json()["id"]
+    for i in range(3):
+        await client.post(
+            f"/api/v1/projects/{project_id}/addresses",
+            json={"name": f"{i} Bulk St", "date": date(2024, 1, i + 1).isoformat()},
+            headers=admin_token_headers
+        )
+
+    url = f"/api/v1/projects/{project_id}/addresses"
+    response = await client.get(url, headers=admin_token_headers)
+    assert response.status_code == 200
+    assert "Accept" in response.headers["vary"]
+    addresses = response.json()
+    assert sorted(address["name"] for address in addresses) == ["0 Bulk St", "1 Bulk St", "2 Bulk St"]
+
+    response = await client.get(url, headers={**admin_token_headers, "Accept": "application/msgpack"})
+    assert msgpack.unpackb(response.content) == addresses
+
+    response = await client.get(url, headers={**admin_token_headers, "Accept": "application/vnd.apache.arrow.stream"})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("name").to_pylist() == [address["name"] for address in addresses]
+    assert [day.isoformat() for day in table.column("date").to_pylist()] == [address["date"] for address in addresses]
+
+@pytest.mark.asyncio
+async def test_list_project_addresses_access(client: AsyncClient, admin_token_headers, technician_token_headers):
+    """Test that unknown projects are 404 and unassigned technicians get 403."""
+    response = await client.get("/api/v1/projects/999/addresses", headers=admin_token_headers)
+    assert response.status_code == 404
+
+    create_response = await client.post("/api/v1/projects/", json={"name": "Other Project"}, headers=admin_token_headers)
+    response = await client.get(
+        f"/api/v1/projects/{create_response.json()['id']}/addresses", headers=technician_token_headers
+    )
+    assert response.status_code == 403
@@ -0,0 +1,52 @@
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+async def create_address(client: AsyncClient, headers: dict) -> int:
+    project = await client.post("/api/v1/projects/", json={"name": "Sample Project"}, headers=headers)
+    response = await client.post(
+        f"/api/v1/projects/{project.json()['id']}/addresses",
+        json={"name": "123 Sample St", "date": date(2024, 1, 1).isoformat()},
+        headers=headers
+    )
+    return response.json()["id"]
+
+async def test_create_and_list_samples(client: AsyncClient, admin_token_headers):
+    """Test creating samples at an address and listing them."""
+    address_id = await create_address(client, admin_token_headers)
+    response = await client.post(
+        f"/api/v1/addresses/{address_id}/samples",
+        json={"barcode": "S-0001", "collected_at": "2024-01-01T09:00:00Z"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["barcode"] == "S-0001"
+
+    response = await client.get(f"/api/v1/addresses/{address_id}/samples", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert [s["barcode"] for s in response.json()] == ["S-0001"]
+
+async def test_create_sample_unauthorized(client: AsyncClient):
+    """Test creating a sample without a token."""
+    response = await client.post(
+        "/api/v1/addresses/1/samples",
+        json={"barcode": "S-0001", "collected_at": "2024-01-01T09:00:00Z"}
+    )
+    assert response.status_code == 401
+
+async def test_create_duplicate_sample_requires_parent(client: AsyncClient, admin_token_headers):
+    """Test that a field duplicate must name its original sample."""
+    address_id = await create_address(client, admin_token_headers)
+    response = await client.post(
+        f"/api/v1/addresses/{address_id}/samples",
+        json={"barcode": "S-0002", "sample_type": "field_duplicate", "collected_at": "2024-01-01T09:00:00Z"},
+        headers=admin_token_headers
+    )
+    assert response.status_code == 422
+
+async def test_list_samples_address_not_found(client: AsyncClient, admin_token_headers):
+    """Test listing samples of an address that doesn't exist."""
+    response = await client.get("/api/v1/addresses/999/samples", headers=admin_token_headers)
+    assert response.status_code == 404
@@ -1,3 +1,6 @@
+import json
+import msgpack
+import pyarrow as pa
 import pytest
 from fastapi import status
 from httpx import AsyncClient
@@ -45,6 +48,35 @@ async def test_get_all_users_with_permission(client: AsyncClient, admin_token_he
     assert len(data) > 0
     assert any(user["id"] == test_user.id for user in data)
 
+async def test_get_all_users_as_msgpack(client: AsyncClient, superuser_token_headers, test_user):
+    """Test that MessagePack carries the same document as JSON."""
+    as_json = await client.get("/api/v1/users", headers=superuser_token_headers)
+    response = await client.get("/api/v1/users", headers={**superuser_token_headers, "Accept": "application/msgpack"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in response.headers["vary"]
+    assert msgpack.unpackb(response.content) == as_json.json()
+
+async def test_get_all_users_as_arrow(client: AsyncClient, superuser_token_headers, test_user):
+    """Test that Arrow has a row per user with the response model's columns."""
+    as_json = (await client.get("/api/v1/users", headers=superuser_token_headers)).json()
+    response = await client.get(
+        "/api/v1/users", headers={**superuser_token_headers, "Accept": "application/vnd.apache.arrow.stream"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    users = pa.ipc.open_stream(response.content).read_all().to_pylist()
+    assert [user["id"] for user in users] == [user["id"] for user in as_json]
+    assert set(users[0]) == set(as_json[0])
+    for user, expected in zip(users, as_json):
+        assert user["email"] == expected["email"]
+        assert [role["name"] for role in json.loads(user["roles"])] == [role["name"] for role in expected["roles"]]
+
+async def test_get_all_users_binary_formats_need_permission(client: AsyncClient, normal_user_token_headers):
+    """Test that asking for another format doesn't skip the permission check."""
+    response = await client.get("/api/v1/users", headers={**normal_user_token_headers, "Accept": "application/msgpack"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
 # Update User Tests
 async def test_update_user_unauthorized(client: AsyncClient):
     """Test updating a user without authentication."""
@@ -14,6 +14,7 @@ from app.schemas.user import UserCreate, UserResponse
 from app.services.users import UserService
 from app.services.roles import RoleService
 from app.db.session import get_db
+from app.db.migrate import MIGRATIONS_DIR
 
 # Set test environment
 os.environ["TESTING"] = "True"
@@ -142,9 +143,125 @@ async def create_test_database():
             )
         """)
 
+        # Create monitoring_chunks table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS monitoring_chunks (
+                id BIGSERIAL PRIMARY KEY,
+                address_id INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
+                metric VARCHAR(50) NOT NULL,
+                chunk_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                chunk_end TIMESTAMP WITH TIME ZONE NOT NULL,
+                reading_count INTEGER NOT NULL,
+                min_value REAL,
+                max_value REAL,
+                ts_data BYTEA NOT NULL,
+                value_data BYTEA NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT unique_monitoring_chunk UNIQUE (address_id, metric, chunk_start)
+            )
+        """)
+
+        # Create samples table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                id SERIAL PRIMARY KEY,
+                barcode VARCHAR(64) UNIQUE NOT NULL,
+                sample_type VARCHAR(20) NOT NULL DEFAULT 'field',
+                parent_sample_id INTEGER REFERENCES samples(id) ON DELETE SET NULL,
+                collected_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT valid_sample_type CHECK (sample_type IN ('field', 'field_duplicate')),
+                CONSTRAINT duplicate_has_parent CHECK (sample_type = 'field' OR parent_sample_id IS NOT NULL)
+            )
+        """)
+
+        # Create lab_batches table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS lab_batches (
+                id SERIAL PRIMARY KEY,
+                name VARCHAR(255) UNIQUE NOT NULL,
+                imported_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Create lab_results table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS lab_results (
+                id BIGSERIAL PRIMARY KEY,
+                batch_id INTEGER NOT NULL REFERENCES lab_batches(id) ON DELETE CASCADE,
+                sample_id INTEGER REFERENCES samples(id) ON DELETE CASCADE,
+                result_type VARCHAR(20) NOT NULL DEFAULT 'sample',
+                analyte VARCHAR(100) NOT NULL,
+                value DOUBLE PRECISION,
+                unit VARCHAR(20),
+                reporting_limit DOUBLE PRECISION,
+                spike_amount DOUBLE PRECISION,
+                analyzed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                qc_flags TEXT[] NOT NULL DEFAULT '{}',
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT valid_result_type CHECK (result_type IN ('sample', 'method_blank', 'surrogate'))
+            )
+        """)
+
+        # Create sample_custody_events table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS sample_custody_events (
+                id BIGSERIAL PRIMARY KEY,
+                sample_id INTEGER NOT NULL REFERENCES samples(id),
+                project_id INTEGER NOT NULL REFERENCES projects(id),
+                relinquished_by VARCHAR(255),
+                received_by VARCHAR(255) NOT NULL,
+                holder_role VARCHAR(20) NOT NULL,
+                event_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                recorded_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT valid_holder_role CHECK (holder_role IN ('technician', 'courier', 'lab'))
+            )
+        """)
+        await conn.execute("""
+            CREATE OR REPLACE FUNCTION reject_custody_event_change() RETURNS trigger AS $$
+            BEGIN
+                RAISE EXCEPTION 'sample_custody_events is append-only; % is not allowed', TG_OP
+                    USING ERRCODE = 'restrict_violation';
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        await conn.execute("CREATE OR REPLACE TRIGGER sample_custody_events_append_only BEFORE UPDATE OR DELETE ON sample_custody_events FOR EACH ROW EXECUTE FUNCTION reject_custody_event_change()")
+
+        # Create sample_custody_current table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS sample_custody_current (
+                sample_id INTEGER PRIMARY KEY REFERENCES samples(id) ON DELETE CASCADE,
+                barcode VARCHAR(64) NOT NULL,
+                project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+                event_id BIGINT NOT NULL,
+                holder VARCHAR(255) NOT NULL,
+                holder_role VARCHAR(20) NOT NULL,
+                since TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        """)
+
         # Create indexes
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_addresses_date ON addresses(date)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_addresses_name ON addresses(name)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_project_technicians_user_id ON project_technicians(user_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_addresses_sample_ids ON addresses USING GIN (sample_ids)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_address_ids ON projects USING GIN (address_ids)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_monitoring_chunks_end ON monitoring_chunks(address_id, metric, chunk_end)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_results_batch_id ON lab_results(batch_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_results_sample_id ON lab_results(sample_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_custody_events_sample ON sample_custody_events(sample_id, event_at, id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_custody_events_project ON sample_custody_events(project_id, sample_id, event_at, id) INCLUDE (relinquished_by, received_by)")
+        await conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_custody_current_barcode ON sample_custody_current(barcode) INCLUDE (project_id, holder, holder_role, since)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_custody_current_project ON sample_custody_current(project_id, barcode) INCLUDE (holder, holder_role, since)")
+
+        # Change counters and their triggers, straight from the migration
+        for migration in ("0009_add_table_versions.sql", "0011_add_project_table_versions.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                await conn.execute(f.read())
 
         # Create user_roles_with_permissions view
         await conn.execute("""
@@ -204,6 +321,13 @@ async def create_test_database():
     # Cleanup after tests
     async with test_pool.acquire() as conn:
         await conn.execute("DROP VIEW IF EXISTS user_roles_with_permissions")
+        await conn.execute("DROP TABLE IF EXISTS sample_custody_current")
+        await conn.execute("DROP TABLE IF EXISTS sample_custody_events")
+        await conn.execute("DROP FUNCTION IF EXISTS reject_custody_event_change")
+        await conn.execute("DROP TABLE IF EXISTS lab_results")
+        await conn.execute("DROP TABLE IF EXISTS lab_batches")
+        await conn.execute("DROP TABLE IF EXISTS samples")
+        await conn.execute("DROP TABLE IF EXISTS monitoring_chunks")
         await conn.execute("DROP TABLE IF EXISTS project_technicians")
         await conn.execute("DROP TABLE IF EXISTS projects")
         await conn.execute("DROP TABLE IF EXISTS addresses")
@@ -212,6 +336,9 @@ async def create_test_database():
         await conn.execute("DROP TABLE IF EXISTS permissions")
         await conn.execute("DROP TABLE IF EXISTS roles")
         await conn.execute("DROP TABLE IF EXISTS users")
+        await conn.execute("DROP TABLE IF EXISTS table_versions")
+        await conn.execute("DROP FUNCTION IF EXISTS bump_table_version")
+        await conn.execute("DROP SEQUENCE IF EXISTS table_versions_seq")
     
     await test_pool.close()
 
@@ -223,6 +350,12 @@ async def db_pool(create_test_database) -> AsyncGenerator[Pool, None]:
     # Clean up the tables after each test
     async with pool.acquire() as conn:
         await conn.execute("DROP VIEW IF EXISTS user_roles_with_permissions")
+        await conn.execute("TRUNCATE TABLE sample_custody_current RESTART IDENTITY CASCADE")
+        await conn.execute("TRUNCATE TABLE sample_custody_events RESTART IDENTITY CASCADE")
+        await conn.execute("TRUNCATE TABLE lab_results RESTART IDENTITY CASCADE")
+        await conn.execute("TRUNCATE TABLE lab_batches RESTART IDENTITY CASCADE")
+        await conn.execute("TRUNCATE TABLE samples RESTART IDENTITY CASCADE")
+        await conn.execute("TRUNCATE TABLE monitoring_chunks RESTART IDENTITY CASCADE")
         await conn.execute("TRUNCATE TABLE project_technicians RESTART IDENTITY CASCADE")
         await conn.execute("TRUNCATE TABLE projects RESTART IDENTITY CASCADE")
         await conn.execute("TRUNCATE TABLE addresses RESTART IDENTITY CASCADE")
@@ -0,0 +1,56 @@
+import numpy as np
+from app.core.downsample import lttb
+
+def test_lttb_one_point_per_bucket():
+    """Test that every non-empty bucket contributes exactly one point and its envelope."""
+    timestamps = np.arange(0, 100_000, 100, dtype=np.int64)
+    values = np.sin(timestamps / 5000).astype(np.float32)
+
+    result = lttb(timestamps, values, 0, 10_000)
+
+    assert result.timestamps.size == 10
+    assert result.min_values.size == result.max_values.size == 10
+    assert np.all(np.diff(result.timestamps) > 0)
+    assert np.all(result.min_values <= result.values)
+    assert np.all(result.values <= result.max_values)
+
+def test_lttb_keeps_spikes():
+    """Test that a single spike survives downsampling."""
+    timestamps = np.arange(0, 10_000, 10, dtype=np.int64)
+    values = np.zeros(timestamps.size, dtype=np.float32)
+    values[537] = 50.0
+
+    result = lttb(timestamps, values, 0, 1000)
+
+    assert 5370 in result.timestamps.tolist()
+    assert result.max_values[5] == 50.0
+
+def test_lttb_keeps_first_and_last_readings():
+    """Test that the first and last readings are always kept, even when they aren't extremes."""
+    timestamps = np.arange(50, 9_950, 10, dtype=np.int64)
+    values = np.cos(timestamps / 800).astype(np.float32)
+    values[0] = values[-1] = 0.0
+    values[1] = values[-2] = 10.0
+
+    result = lttb(timestamps, values, 0, 1000)
+
+    assert result.timestamps[0] == timestamps[0]
+    assert result.timestamps[-1] == timestamps[-1]
+    assert result.values[0] == values[0] and result.values[-1] == values[-1]
+
+def test_lttb_skips_empty_buckets():
+    """Test that gaps in the data don't produce points."""
+    timestamps = np.array([0, 10, 20, 5000, 5010], dtype=np.int64)
+    values = np.array([1, 2, 3, 4, 5], dtype=np.float32)
+
+    result = lttb(timestamps, values, 0, 100)
+
+    assert result.timestamps.size == 2
+    assert result.min_values.tolist() == [1, 4]
+    assert result.max_values.tolist() == [3, 5]
+
+def test_lttb_empty_input():
+    """Test downsampling an empty series."""
+    result = lttb(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), 0, 1000)
+    assert result.timestamps.size == 0
+    assert result.values.size == 0
@@ -0,0 +1,152 @@
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.etags import etag_matches, weak_etag
+from app.core.security import get_current_user
+from app.db.queries.manager import query_manager
+
+pytestmark = pytest.mark.asyncio
+
+def test_weak_etag():
+    """Test that ETags are weak, stable and change with their parts."""
+    etag = weak_etag("roles", "mary@example.com", [("roles", 3)])
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == weak_etag("roles", "mary@example.com", [("roles", 3)])
+    assert etag != weak_etag("roles", "mary@example.com", [("roles", 4)])
+    assert etag != weak_etag("roles", "john@example.com", [("roles", 3)])
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"other", W/"abc"', True),
+    ("*", True),
+    ('W/"abcd"', False),
+])
+def test_etag_matches(if_none_match, matches):
+    """Test weak comparison against If-None-Match lists."""
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
+
+async def test_writes_bump_table_versions(db_pool):
+    """Test that each write statement moves its table's version forward, and only that table's."""
+    async with db_pool.acquire() as conn:
+        before = dict(await conn.fetch(query_manager.get_table_versions, ["roles", "users"]))
+        await conn.execute("UPDATE roles SET description = description WHERE name = 'admin'")
+        after = dict(await conn.fetch(query_manager.get_table_versions, ["roles", "users"]))
+    assert after["roles"] > before["roles"]
+    assert after["users"] == before["users"]
+
+async def test_current_user_not_modified(client: AsyncClient, normal_user_token_headers):
+    """Test that a matching If-None-Match gets 304 before the user and roles are loaded."""
+    response = await client.get("/api/v1/users/me", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert "Authorization" in response.headers["vary"]
+
+    async def not_loaded():
+        raise AssertionError("the user must not be loaded for a 304")
+
+    app.dependency_overrides[get_current_user] = not_loaded
+    try:
+        response = await client.get("/api/v1/users/me", headers={**normal_user_token_headers, "If-None-Match": etag})
+    finally:
+        del app.dependency_overrides[get_current_user]
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+async def test_current_user_etag_changes_on_update(client: AsyncClient, normal_user_token_headers):
+    """Test that changing the profile invalidates the ETag."""
+    etag = (await client.get("/api/v1/users/me", headers=normal_user_token_headers)).headers["etag"]
+    await client.put("/api/v1/users/me", json={"first_name": "Renamed"}, headers=normal_user_token_headers)
+    response = await client.get("/api/v1/users/me", headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Renamed"
+    assert response.headers["etag"] != etag
+
+async def test_etag_is_per_user(client: AsyncClient, normal_user_token_headers, superuser_token_headers):
+    """Test that one user's ETag doesn't match for another."""
+    etag = (await client.get("/api/v1/roles", headers=normal_user_token_headers)).headers["etag"]
+    response = await client.get("/api/v1/roles", headers={**superuser_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+async def test_roles_not_modified_until_a_role_changes(client: AsyncClient, superuser_token_headers):
+    """Test that /roles answers 304 until a role is created."""
+    etag = (await client.get("/api/v1/roles", headers=superuser_token_headers)).headers["etag"]
+    conditional = {**superuser_token_headers, "If-None-Match": etag}
+    assert (await client.get("/api/v1/roles", headers=conditional)).status_code == 304
+
+    await client.post("/api/v1/roles", json={"name": "auditor", "description": "Reads things", "level": 10},
+                      headers=superuser_token_headers)
+    response = await client.get("/api/v1/roles", headers=conditional)
+    assert response.status_code == 200
+    assert "auditor" in [role["name"] for role in response.json()]
+
+async def test_users_etag_per_format(client: AsyncClient, superuser_token_headers):
+    """Test that each format of the user list has its own ETag and honors If-None-Match."""
+    as_json = await client.get("/api/v1/users", headers=superuser_token_headers)
+    msgpack_headers = {**superuser_token_headers, "Accept": "application/msgpack"}
+    as_msgpack = await client.get("/api/v1/users", headers=msgpack_headers)
+    assert as_msgpack.headers["etag"] != as_json.headers["etag"]
+    assert as_msgpack.headers["cache-control"] == "private, no-cache"
+    assert "Accept" in as_msgpack.headers["vary"] and "Authorization" in as_msgpack.headers["vary"]
+
+    response = await client.get(
+        "/api/v1/users", headers={**msgpack_headers, "If-None-Match": as_msgpack.headers["etag"]}
+    )
+    assert response.status_code == 304
+    response = await client.get(
+        "/api/v1/users", headers={**msgpack_headers, "If-None-Match": as_json.headers["etag"]}
+    )
+    assert response.status_code == 200
+
+async def test_invalid_token_is_still_rejected(client: AsyncClient):
+    """Test that If-None-Match doesn't bypass token checks."""
+    response = await client.get("/api/v1/roles", headers={"Authorization": "Bearer nope", "If-None-Match": "*"})
+    assert response.status_code == 401
+
+async def test_project_addresses_not_modified_until_an_address_is_added(client: AsyncClient, admin_token_headers):
+    """Test that a project's addresses answer 304 until an address is added to it."""
+    project_id = (await client.post("/api/v1/projects/", json={"name": "Cached Project"},
+                                    headers=admin_token_headers)).json()["id"]
+    url = f"/api/v1/projects/{project_id}/addresses"
+    response = await client.get(url, headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert "Accept" in response.headers["vary"] and "Authorization" in response.headers["vary"]
+    conditional = {**admin_token_headers, "If-None-Match": response.headers["etag"]}
+    assert (await client.get(url, headers=conditional)).status_code == 304
+
+    await client.post(url, json={"name": "1 Cached St", "date": "2024-01-01"}, headers=admin_token_headers)
+    response = await client.get(url, headers=conditional)
+    assert response.status_code == 200
+    assert [address["name"] for address in response.json()] == ["1 Cached St"]
+
+async def test_project_etag_is_per_project(client: AsyncClient, admin_token_headers):
+    """Test that a project's ETag doesn't match for another project."""
+    first, second = [
+        (await client.post("/api/v1/projects/", json={"name": name}, headers=admin_token_headers)).json()["id"]
+        for name in ("First Project", "Second Project")
+    ]
+    response = await client.get(f"/api/v1/projects/{first}", headers=admin_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    conditional = {**admin_token_headers, "If-None-Match": etag}
+    assert (await client.get(f"/api/v1/projects/{first}", headers=conditional)).status_code == 304
+    response = await client.get(f"/api/v1/projects/{second}", headers=conditional)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Second Project"
+
+async def test_project_etag_changes_when_technicians_change(client: AsyncClient, admin_token_headers, technician_user):
+    """Test that assigning a technician invalidates the project's ETag, since access depends on it."""
+    project_id = (await client.post("/api/v1/projects/", json={"name": "Staffed Project"},
+                                    headers=admin_token_headers)).json()["id"]
+    etag = (await client.get(f"/api/v1/projects/{project_id}", headers=admin_token_headers)).headers["etag"]
+    response = await client.post(f"/api/v1/projects/{project_id}/technicians", json={"user_id": technician_user.id},
+                                 headers=admin_token_headers)
+    assert response.status_code == 204
+    response = await client.get(f"/api/v1/projects/{project_id}", headers={**admin_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
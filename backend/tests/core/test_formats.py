@@ -0,0 +1,74 @@
+import json
+import pytest
+import pyarrow as pa
+from datetime import date, datetime, timezone
+from app.core.formats import ARROW, JSON, MSGPACK, arrow_batches, arrow_schema, negotiate
+from app.schemas.project import AddressInDB
+from app.schemas.user import UserResponse
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("*/*", JSON),
+    ("text/html, application/json", JSON),
+    ("application/msgpack", MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    ("application/json;q=0.5, application/vnd.apache.arrow.stream", ARROW),
+    ("application/msgpack;q=0.8, application/vnd.apache.arrow.stream;q=0.9", ARROW),
+    ("application/json, application/msgpack", JSON),
+    ("application/msgpack;q=0", JSON),
+    ("application/msgpack;q=oops", JSON),
+])
+def test_negotiate(accept, expected):
+    """Test that the supported type with the highest q wins, with ties going to the first listed."""
+    assert negotiate(accept) == expected
+
+def read_stream(chunks) -> pa.Table:
+    return pa.ipc.open_stream(b"".join(chunks)).read_all()
+
+def test_arrow_batches_are_built_from_rows():
+    """Test that rows become record batches with the model's columns and types."""
+    rows = [
+        {"id": i, "name": f"{i} Main St", "date": date(2024, 1, i), "sample_ids": [i, i + 1] if i % 2 else None,
+         "created_at": CREATED, "unused": "not in the model"}
+        for i in range(1, 6)
+    ]
+    chunks = list(arrow_batches(AddressInDB, rows, batch_rows=2))
+    reader = pa.ipc.open_stream(b"".join(chunks))
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    # A chunk per batch plus the end of the stream
+    assert len(chunks) == 4
+
+    table = pa.Table.from_batches(batches)
+    assert table.schema.names == list(AddressInDB.model_fields)
+    assert table.schema.field("created_at").type == pa.date32()
+    assert table.column("created_at").to_pylist()[0] == date(2024, 1, 2)
+    assert table.column("sample_ids").to_pylist()[:2] == [[1, 2], []]
+
+def test_arrow_stream_without_rows_has_the_schema():
+    """Test that an empty list is still a readable stream with the model's schema."""
+    table = read_stream(arrow_batches(AddressInDB, [], batch_rows=100))
+    assert table.num_rows == 0
+    assert table.schema == arrow_schema(AddressInDB)[0]
+
+def test_arrow_users_leave_out_password_hashes():
+    """Test that only model fields are sent, with nested roles as their JSON text."""
+    roles = json.dumps([{"id": 1, "name": "admin", "permissions": ["users:read"]}])
+    row = {"id": 7, "email": "mary@example.com", "hashed_password": "hash", "first_name": "Mary",
+           "last_name": None, "is_active": True, "is_superuser": False,
+           "created_at": CREATED, "updated_at": None, "roles": roles}
+    table = read_stream(arrow_batches(UserResponse, [row], batch_rows=100))
+    assert "hashed_password" not in table.schema.names
+    user = table.to_pylist()[0]
+    assert user["roles"] == roles
+    assert user["created_at"] == CREATED
+    assert user["last_name"] is None
+
+def test_arrow_null_takes_the_field_default():
+    """Test that NULL in a field with a default is sent as the default, in the column's type."""
+    row = {"id": 3, "is_superuser": None, "roles": None}
+    user = read_stream(arrow_batches(UserResponse, [row], batch_rows=100)).to_pylist()[0]
+    assert user["is_superuser"] is False
+    assert user["roles"] == "[]"
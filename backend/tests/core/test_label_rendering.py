@@ -0,0 +1,36 @@
+import io
+import re
+from PIL import Image
+from app.core.labels import TEMPLATES, label_barcode, render_pdf_page, render_png_page, build_pdf
+
+def make_labels(count):
+    return [(label_barcode(7, n), "Test (Project)") for n in range(1, count + 1)]
+
+def test_label_barcode():
+    """Test that label barcodes are zero-padded per project."""
+    assert label_barcode(7, 12) == "P7-00012"
+
+def test_render_pdf():
+    """Test that pages are assembled into a PDF with one page object per page."""
+    template = TEMPLATES["avery-5160"]
+    labels = make_labels(template.per_page + 1)
+    pages = [
+        render_pdf_page("avery-5160", labels[:template.per_page]),
+        render_pdf_page("avery-5160", labels[template.per_page:]),
+    ]
+    assert b"(P7-00001) Tj" in pages[0]
+    assert b"(Test \\(Project\\)) Tj" in pages[0]
+
+    pdf = build_pdf("avery-5160", pages)
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert len(re.findall(rb"/Type /Page ", pdf)) == 2
+    assert b"/Count 2" in pdf
+
+def test_render_png():
+    """Test rendering a page as a 1-bit letter-size PNG."""
+    data = render_png_page("avery-5163", make_labels(3), dpi=100)
+    image = Image.open(io.BytesIO(data))
+    assert image.format == "PNG"
+    assert image.mode == "1"
+    assert image.size == (850, 1100)
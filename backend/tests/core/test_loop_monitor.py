@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import time
+import pytest
+from app.core import metrics
+from app.core.loop_monitor import LoopMonitor
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def blocking_work():
+    time.sleep(0.2)
+
+async def test_lag_is_recorded():
+    """Test that blocking the loop shows up as lag."""
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_work()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    lag = metrics.LOOP_LAG.children[()]
+    assert sum(lag.counts) >= 2
+    assert lag.sum >= 0.15
+    assert metrics.LOOP_BLOCKED.values == {(): 1}
+
+async def test_blocking_stack_is_dumped(caplog):
+    """Test that the watchdog logs the stack of the code blocking the loop."""
+    monitor = LoopMonitor(interval=0.01, threshold=0.05, dump_stacks=True)
+    monitor.start()
+    # Found by the watchdog the way it finds the scope of an ASGI middleware frame
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/slow"}
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.loop"):
+            await asyncio.sleep(0.05)
+            blocking_work()
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    [record] = [r for r in caplog.records if r.name == "app.loop"]
+    message = record.getMessage()
+    assert "in blocking_work" in message
+    assert "request: GET /api/v1/slow" in message
+
+async def test_idle_loop_is_not_reported(caplog):
+    """Test that an idle loop records small lag and no warnings."""
+    monitor = LoopMonitor(interval=0.01, threshold=0.1, dump_stacks=True)
+    monitor.start()
+    with caplog.at_level(logging.WARNING, logger="app.loop"):
+        await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert metrics.LOOP_BLOCKED.values == {}
+    assert not [r for r in caplog.records if r.name == "app.loop"]
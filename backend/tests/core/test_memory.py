@@ -0,0 +1,58 @@
+import json
+import logging
+import tracemalloc
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.core import memory
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def tracing():
+    memory.start()
+    yield
+    memory.stop()
+
+_kept = []
+
+async def allocating_app(scope, receive, send):
+    # A transient 1 MB list and a small list that outlives the request
+    transient = [0] * 125_000
+    _kept.append(list(range(1000)))
+    del transient
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def test_request_report(tracing, caplog):
+    """Test that the report has the request's peak and the sites of memory it kept."""
+    transport = ASGITransport(app=memory.MemoryMiddleware(allocating_app))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        with caplog.at_level(logging.INFO, logger="app.memory"):
+            response = await client.get("/things")
+
+    assert int(response.headers["x-memory-peak"]) >= 1_000_000
+    [record] = [r for r in caplog.records if r.name == "app.memory"]
+    report = json.loads(record.getMessage())
+    assert report["path"] == "/things"
+    assert report["peak_bytes"] >= 1_000_000
+    assert 0 < report["allocated_bytes"] < 1_000_000
+    assert any(site["site"].endswith("test_memory.py:21") for site in report["top"])
+
+async def test_no_report_without_tracing(caplog):
+    """Test that requests pass through untouched when tracing is off."""
+    assert not tracemalloc.is_tracing()
+    transport = ASGITransport(app=memory.MemoryMiddleware(allocating_app))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        with caplog.at_level(logging.INFO, logger="app.memory"):
+            response = await client.get("/things")
+    assert "x-memory-peak" not in response.headers
+    assert not [r for r in caplog.records if r.name == "app.memory"]
+
+async def test_caller_is_innermost_app_frame(tracing):
+    """Test that sites are attributed to the nearest frame in the app package."""
+    from app.core.labels import label_barcode
+    snapshot = memory.take_snapshot()
+    barcodes = [label_barcode(1, n) for n in range(2000)]
+    sites = memory.diff_sites(memory.take_snapshot(), snapshot, 5)
+    assert len(barcodes) == 2000
+    assert sites[0]["caller"].startswith("app/core/labels.py:")
@@ -0,0 +1,40 @@
+from app.core.metrics import HistogramFamily, CounterFamily, route_template
+
+def test_histogram_buckets_are_cumulative():
+    """Test that rendered buckets are cumulative and end with +Inf."""
+    family = HistogramFamily("test_seconds", "Test.", ("query",), (0.1, 1.0))
+    histogram = family.labels("get_user")
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    lines = family.render()
+    assert lines[:2] == ["# HELP test_seconds Test.", "# TYPE test_seconds histogram"]
+    assert 'test_seconds_bucket{query="get_user",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{query="get_user",le="1"} 3' in lines
+    assert 'test_seconds_bucket{query="get_user",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{query="get_user"} 2.65' in lines
+    assert 'test_seconds_count{query="get_user"} 4' in lines
+
+def test_histogram_without_labels():
+    """Test rendering a histogram that has no labels."""
+    family = HistogramFamily("wait_seconds", "Wait.", (), (1.0,))
+    family.labels().observe(0.5)
+    assert 'wait_seconds_bucket{le="1"} 1' in family.render()
+    assert "wait_seconds_count 1" in family.render()
+
+def test_counter_escapes_labels():
+    """Test that label values are escaped."""
+    family = CounterFamily("errors_total", "Errors.", ("error",))
+    family.inc('bad "value"')
+    family.inc('bad "value"')
+    assert family.render()[-1] == 'errors_total{error="bad \\"value\\""} 2'
+
+def test_route_template():
+    """Test rebuilding route templates from path parameters, including repeated values."""
+    scope = {
+        "path": "/api/v1/projects/1/addresses/1",
+        "endpoint": object(),
+        "path_params": {"project_id": 1, "address_id": 1},
+    }
+    assert route_template(scope) == "/api/v1/projects/{project_id}/addresses/{address_id}"
+    assert route_template({"path": "/wp-admin"}) == "unmatched"
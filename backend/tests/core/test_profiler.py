@@ -0,0 +1,36 @@
+import asyncio
+import sys
+import threading
+import time
+import pytest
+from app.core.profiler import Sampler, NOT_RUNNING
+
+pytestmark = pytest.mark.asyncio
+
+def busy_loop(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+async def profiled_work():
+    busy_loop(0.05)
+    await asyncio.sleep(0.05)
+
+async def test_sampler_keeps_stacks_under_root_frame():
+    """Test that samples are rooted at the profiled frame and waiting time is counted separately."""
+    async def root():
+        sampler = Sampler(threading.get_ident(), sys._getframe(), 0.002)
+        sampler.start()
+        try:
+            await profiled_work()
+        finally:
+            sampler.stop()
+        return sampler
+
+    sampler = await root()
+    stacks = sampler.collapsed().splitlines()
+    running = [line for line in stacks if not line.startswith(NOT_RUNNING)]
+    assert running
+    assert all(line.startswith("root (test_profiler.py:") for line in running)
+    assert any("profiled_work" in line and "busy_loop" in line for line in running)
+    assert sampler.samples[NOT_RUNNING] > 0
@@ -0,0 +1,79 @@
+import numpy as np
+from app.core.qaqc import (
+    QCBatch, run_qc, flag_lists, DAY_MS,
+    FLAG_RPD, FLAG_BLANK_CONTAMINATION, FLAG_BLANK_DETECTED,
+    FLAG_SURROGATE_RECOVERY, FLAG_HOLDING_TIME
+)
+
+def make_batch(rows):
+    """Build a QCBatch from (sample_id, parent_id, result_type, analyte, value, rl, spike, collected, analyzed) rows."""
+    columns = list(zip(*rows))
+    return QCBatch(
+        sample_ids=np.array(columns[0], dtype=np.int64),
+        parent_ids=np.array(columns[1], dtype=np.int64),
+        result_types=np.array(columns[2]),
+        analytes=np.array(columns[3]),
+        values=np.array(columns[4], dtype=np.float64),
+        reporting_limits=np.array(columns[5], dtype=np.float64),
+        spike_amounts=np.array(columns[6], dtype=np.float64),
+        collected_at=np.array(columns[7], dtype=np.int64),
+        analyzed_at=np.array(columns[8], dtype=np.int64),
+    )
+
+def test_field_duplicate_rpd():
+    """Test that only duplicate pairs over the RPD limit are flagged, per analyte."""
+    batch = make_batch([
+        (1, -1, "sample", "Lead", 10.0, None, None, 0, DAY_MS),
+        (1, -1, "sample", "Mercury", 5.0, None, None, 0, DAY_MS),
+        (2, 1, "sample", "Lead", 15.0, None, None, 0, DAY_MS),
+        (2, 1, "sample", "Mercury", 5.5, None, None, 0, DAY_MS),
+    ])
+    masks = run_qc(batch)
+    assert masks[FLAG_RPD].tolist() == [True, False, True, False]
+
+def test_method_blank_contamination():
+    """Test that a contaminated blank flags itself and the batch's results for that analyte."""
+    batch = make_batch([
+        (-1, -1, "method_blank", "Lead", 0.8, 0.5, None, -1, DAY_MS),
+        (-1, -1, "method_blank", "Mercury", 0.1, 0.5, None, -1, DAY_MS),
+        (1, -1, "sample", "Lead", 10.0, 0.5, None, 0, DAY_MS),
+        (1, -1, "sample", "Mercury", 3.0, 0.5, None, 0, DAY_MS),
+    ])
+    masks = run_qc(batch)
+    assert masks[FLAG_BLANK_CONTAMINATION].tolist() == [True, False, False, False]
+    assert masks[FLAG_BLANK_DETECTED].tolist() == [False, False, True, False]
+
+def test_surrogate_recovery():
+    """Test that a surrogate outside the recovery window flags its sample's results."""
+    batch = make_batch([
+        (1, -1, "surrogate", "Toluene-d8", 50.0, None, 100.0, 0, DAY_MS),
+        (1, -1, "sample", "Benzene", 3.0, None, None, 0, DAY_MS),
+        (2, -1, "surrogate", "Toluene-d8", 95.0, None, 100.0, 0, DAY_MS),
+        (2, -1, "sample", "Benzene", 4.0, None, None, 0, DAY_MS),
+    ])
+    masks = run_qc(batch)
+    assert masks[FLAG_SURROGATE_RECOVERY].tolist() == [True, True, False, False]
+
+def test_holding_time():
+    """Test holding times per analyte, with the default for unknown analytes."""
+    batch = make_batch([
+        (1, -1, "sample", "Hexavalent Chromium", 1.0, None, None, 0, 2 * DAY_MS),
+        (1, -1, "sample", "Mercury", 1.0, None, None, 0, 20 * DAY_MS),
+        (1, -1, "sample", "Benzene", 1.0, None, None, 0, 20 * DAY_MS),
+        (-1, -1, "method_blank", "Benzene", 0.0, None, None, -1, 20 * DAY_MS),
+    ])
+    masks = run_qc(batch)
+    assert masks[FLAG_HOLDING_TIME].tolist() == [True, False, True, False]
+
+def test_clean_batch_has_no_flags():
+    """Test that a batch passing every check returns no masks."""
+    batch = make_batch([
+        (1, -1, "sample", "Lead", 10.0, 0.5, None, 0, DAY_MS),
+        (-1, -1, "method_blank", "Lead", None, 0.5, None, -1, DAY_MS),
+    ])
+    assert run_qc(batch) == {}
+
+def test_flag_lists():
+    """Test combining masks into per-row flag lists."""
+    masks = {"a": np.array([True, False, True]), "b": np.array([True, False, False])}
+    assert flag_lists(masks, 3) == [["a", "b"], [], ["a"]]
@@ -0,0 +1,58 @@
+import json
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from app.main import app
+from app.core.responses import FastJSONResponse
+from app.schemas.project import AddressInDB
+
+pytestmark = pytest.mark.asyncio
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+def test_renders_dates_models_and_decimals():
+    """Test that datetimes, dates, models, decimals and int keys are encoded like the JSON API expects."""
+    address = AddressInDB(id=1, name="1 Main St", date=date(2024, 1, 1), sample_ids=[3], created_at=date(2024, 1, 2))
+    response = FastJSONResponse({
+        "at": CREATED,
+        "on": date(2024, 1, 1),
+        "address": address,
+        "level": Decimal("1.5"),
+        "by_id": {7: "seven"},
+    })
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == {
+        "at": "2024-01-02T03:04:05+00:00",
+        "on": "2024-01-01",
+        "address": json.loads(address.model_dump_json()),
+        "level": 1.5,
+        "by_id": {"7": "seven"},
+    }
+
+def test_unknown_types_are_rejected():
+    """Test that values orjson can't encode still fail loudly."""
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
+
+def test_model_routes_keep_direct_serialization():
+    """Test that no route with a response model overrides the response class and loses the serialize_json path."""
+    overridden = [
+        f"{sorted(route.methods)} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.response_field is not None
+        and not isinstance(route.response_class, DefaultPlaceholder)
+    ]
+    assert not overridden
+    assert all(
+        route.response_class.value is FastJSONResponse
+        for route in app.routes
+        if isinstance(route, APIRoute) and isinstance(route.response_class, DefaultPlaceholder)
+    )
+
+async def test_routes_without_model_use_fast_response(client):
+    """Test that a plain dict route is rendered by the default response class."""
+    response = await client.get("/")
+    assert response.status_code == 200
+    assert response.content == b'{"message":"Welcome to the API"}'
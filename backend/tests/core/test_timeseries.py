@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from app.core import config
+from app.core.config import Settings
+from app.core.timeseries import (
+    MAX_CHUNK_MS, datetime_to_ms, ms_to_datetime, encode_chunk, decode_chunk,
+    merge_readings, split_into_chunks, slice_range
+)
+
+HOUR_MS = 3600 * 1000
+
+def test_encode_decode_roundtrip():
+    """Test that a chunk decodes to the timestamps and float32 values it was built from."""
+    start = 1_700_000_000_000 - 1_700_000_000_000 % HOUR_MS
+    timestamps = start + np.arange(0, HOUR_MS, 5000, dtype=np.int64)
+    values = np.random.default_rng(0).random(timestamps.size).astype(np.float32)
+
+    ts_data, value_data = encode_chunk(start, timestamps, values)
+    decoded_ts, decoded_values = decode_chunk(start, ts_data, value_data)
+
+    assert np.array_equal(decoded_ts, timestamps)
+    assert np.array_equal(decoded_values, values)
+    # Regular 5 second deltas compress far below 8 bytes per timestamp
+    assert len(ts_data) < timestamps.size
+
+def test_merge_readings_new_values_win():
+    """Test that merging sorts readings and keeps the newer value for duplicate timestamps."""
+    timestamps, values = merge_readings(
+        np.array([1000, 3000], dtype=np.int64), np.array([1.0, 3.0], dtype=np.float32),
+        np.array([2000, 3000], dtype=np.int64), np.array([2.0, 30.0], dtype=np.float32)
+    )
+    assert timestamps.tolist() == [1000, 2000, 3000]
+    assert values.tolist() == [1.0, 2.0, 30.0]
+
+def test_split_into_chunks():
+    """Test that unsorted readings are grouped into epoch-aligned chunks."""
+    timestamps = np.array([HOUR_MS + 10, 5, HOUR_MS * 3, 20], dtype=np.int64)
+    values = np.array([2.0, 1.0, 3.0, 1.5], dtype=np.float32)
+
+    chunks = list(split_into_chunks(timestamps, values, HOUR_MS))
+
+    assert [start for start, _, _ in chunks] == [0, HOUR_MS, HOUR_MS * 3]
+    assert chunks[0][1].tolist() == [5, 20]
+    assert chunks[0][2].tolist() == [1.0, 1.5]
+
+def test_slice_range_is_half_open():
+    """Test that slicing includes the start and excludes the end."""
+    timestamps = np.array([10, 20, 30, 40], dtype=np.int64)
+    values = np.array([1, 2, 3, 4], dtype=np.float32)
+    ts, vals = slice_range(timestamps, values, 20, 40)
+    assert ts.tolist() == [20, 30]
+    assert vals.tolist() == [2, 3]
+
+def test_datetime_conversion_treats_naive_as_utc():
+    """Test that naive datetimes are interpreted as UTC."""
+    aware = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    assert datetime_to_ms(aware.replace(tzinfo=None)) == datetime_to_ms(aware)
+    assert ms_to_datetime(datetime_to_ms(aware)) == aware
+
+@pytest.mark.parametrize("seconds", [0, MAX_CHUNK_MS // 1000 + 1])
+def test_chunk_seconds_must_fit_int32_deltas(seconds):
+    """Test that a chunk length whose millisecond deltas could overflow int32 is rejected."""
+    with pytest.raises(ValueError, match="MONITORING_CHUNK_SECONDS"):
+        Settings(MONITORING_CHUNK_SECONDS=seconds)
+    assert Settings(MONITORING_CHUNK_SECONDS=MAX_CHUNK_MS // 1000).MONITORING_CHUNK_SECONDS == MAX_CHUNK_MS // 1000
+
+def test_settings_chunk_bound_matches_delta_dtype():
+    """Test that the settings check chunk lengths against the real int32 delta limit."""
+    assert config.MAX_CHUNK_MS == MAX_CHUNK_MS
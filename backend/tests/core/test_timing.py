@@ -0,0 +1,33 @@
+import pytest
+import time
+from app.core import timing
+from app.core.timing import Timing, phase
+
+def test_phases_are_exclusive():
+    """Test that a nested phase pauses the enclosing one."""
+    current = Timing()
+    token = timing._timing.set(current)
+    try:
+        with phase("auth"):
+            time.sleep(0.01)
+            with phase("db"):
+                time.sleep(0.02)
+        current.switch(None)
+    finally:
+        timing._timing.reset(token)
+
+    assert 0.009 < current.phases["auth"] < 0.019
+    assert 0.019 < current.phases["db"] < 0.03
+    assert current.current is None
+
+def test_phase_without_timing_is_a_no_op():
+    """Test that phases do nothing outside a timed request."""
+    with phase("db"):
+        pass
+
+def test_header():
+    """Test the Server-Timing header format."""
+    current = Timing()
+    current.phases = {"db": 0.0012345}
+    header = current.header()
+    assert header.startswith("db;dur=1.23, total;dur=")
@@ -0,0 +1,41 @@
+import pytest
+from app.core import metrics
+from app.core.config import settings
+from app.db.instrumentation import create_pool
+from app.db.queries.manager import QUERY_NAMES
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def instrumented_pool(create_test_database):
+    metrics.reset()
+    pool = await create_pool(settings.get_database_url, min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+    metrics.reset()
+
+async def test_named_queries_are_recorded(instrumented_pool, monkeypatch):
+    """Test that latency, rows and pool waits are recorded per query name."""
+    query = "SELECT generate_series(1, $1)"
+    monkeypatch.setitem(QUERY_NAMES, query, "list_numbers")
+    rows = await instrumented_pool.fetch(query, 3)
+    assert len(rows) == 3
+    await instrumented_pool.fetchval(query, 1)
+
+    assert sum(metrics.QUERY_DURATION.children[("list_numbers",)].counts) == 2
+    assert metrics.QUERY_ROWS.children[("list_numbers",)].sum == 4
+    assert sum(metrics.POOL_ACQUIRE.children[()].counts) == 2
+
+async def test_unnamed_queries_are_not_recorded(instrumented_pool):
+    """Test that SQL not loaded from the query files passes through unrecorded."""
+    assert await instrumented_pool.fetchval("SELECT 1") == 1
+    assert metrics.QUERY_DURATION.children == {}
+
+async def test_query_errors_are_counted(instrumented_pool, monkeypatch):
+    """Test that failing queries are counted by name and error."""
+    query = "SELECT * FROM missing_table"
+    monkeypatch.setitem(QUERY_NAMES, query, "broken_query")
+    with pytest.raises(Exception):
+        await instrumented_pool.fetch(query)
+    assert metrics.QUERY_ERRORS.values == {("broken_query", "UndefinedTableError"): 1}
+    assert ("broken_query",) not in metrics.QUERY_DURATION.children
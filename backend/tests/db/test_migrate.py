@@ -0,0 +1,206 @@
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.db import migrate
+from app.db.migrate import run_migrations, split_sql_statements
+
+MIGRATE_DATABASE_URL = settings.get_database_url.replace("/test_db", "/migrate_test_db")
+
+
+@pytest.fixture
+async def migrate_dsn():
+    """An empty database for the runner to migrate."""
+    conn = await asyncpg.connect(settings.get_database_url.replace("/test_db", "/postgres"))
+    try:
+        await conn.execute("DROP DATABASE IF EXISTS migrate_test_db")
+        await conn.execute("CREATE DATABASE migrate_test_db")
+        yield MIGRATE_DATABASE_URL
+    finally:
+        await conn.execute("DROP DATABASE IF EXISTS migrate_test_db WITH (FORCE)")
+        await conn.close()
+
+
+def write_migrations(directory, files):
+    for name, sql in files.items():
+        (directory / name).write_text(sql)
+
+
+def test_split_sql_statements():
+    """Test that semicolons in strings, dollar quotes and comments don't split statements."""
+    sql = """
+    -- Leading comment; not a statement
+    CREATE TABLE t (note TEXT DEFAULT 'a;b', "odd;name" INT);
+    /* block; /* nested; */ still comment */
+    CREATE FUNCTION f() RETURNS INT AS $body$
+    BEGIN
+        RETURN 1; -- inside the body
+    END;
+    $body$ LANGUAGE plpgsql;
+    DO $$ BEGIN PERFORM 1; END $$;
+    SELECT 'it''s; fine', $1;
+    -- Trailing comment
+    """
+    statements = split_sql_statements(sql)
+    assert len(statements) == 4
+    assert statements[0].endswith("""CREATE TABLE t (note TEXT DEFAULT 'a;b', "odd;name" INT)""")
+    assert statements[1].startswith("/* block;")
+    assert "RETURN 1; -- inside the body" in statements[1]
+    assert statements[2] == "DO $$ BEGIN PERFORM 1; END $$"
+    assert statements[3] == "SELECT 'it''s; fine', $1"
+
+
+async def test_run_migrations_applies_each_migration_once(migrate_dsn):
+    """Test that every migration is applied and recorded once, and a second run does nothing."""
+    names = sorted(f for f in os.listdir(migrate.MIGRATIONS_DIR) if f.endswith(".sql"))
+    assert await run_migrations(migrate_dsn) == names
+    assert await run_migrations(migrate_dsn) == []
+
+    conn = await asyncpg.connect(migrate_dsn)
+    try:
+        assert await conn.fetchval("SELECT array_agg(name ORDER BY name) FROM migrations") == names
+        assert await conn.fetchval("SELECT level FROM roles WHERE name = 'technician'") == 50
+    finally:
+        await conn.close()
+
+
+async def test_concurrent_runs_apply_migrations_once(migrate_dsn):
+    """Test that workers migrating at the same time don't apply a migration twice."""
+    runs = await asyncio.gather(*(run_migrations(migrate_dsn) for _ in range(3)))
+    applied = [name for run in runs for name in run]
+    assert sorted(applied) == sorted(f for f in os.listdir(migrate.MIGRATIONS_DIR) if f.endswith(".sql"))
+
+
+async def test_changed_migration_fails(migrate_dsn, tmp_path, monkeypatch):
+    """Test that a migration edited after it was applied stops the run."""
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    write_migrations(tmp_path, {"0001_a.sql": "CREATE TABLE a (id INT);"})
+    await run_migrations(migrate_dsn)
+
+    write_migrations(tmp_path, {
+        "0001_a.sql": "CREATE TABLE a (id BIGINT);",
+        "0002_b.sql": "CREATE TABLE b (id INT);",
+    })
+    with pytest.raises(RuntimeError, match="0001_a.sql was changed"):
+        await run_migrations(migrate_dsn)
+
+
+async def test_failed_migration_rolls_back(migrate_dsn, tmp_path, monkeypatch):
+    """Test that a failing migration leaves no changes and isn't recorded."""
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    write_migrations(tmp_path, {
+        "0001_function.sql": """
+            CREATE FUNCTION answer() RETURNS INT AS $$
+            BEGIN
+                RETURN 42;
+            END;
+            $$ LANGUAGE plpgsql;
+        """,
+        "0002_bad.sql": "CREATE TABLE b (id INT);\nSELECT 1 / 0;",
+    })
+    with pytest.raises(asyncpg.DivisionByZeroError):
+        await run_migrations(migrate_dsn)
+
+    conn = await asyncpg.connect(migrate_dsn)
+    try:
+        assert await conn.fetchval("SELECT answer()") == 42
+        assert await conn.fetchval("SELECT to_regclass('b')") is None
+        assert await conn.fetchval("SELECT array_agg(name) FROM migrations") == ["0001_function.sql"]
+    finally:
+        await conn.close()
+
+
+async def test_no_transaction_migration_builds_index_concurrently(migrate_dsn, tmp_path, monkeypatch):
+    """Test that a no-transaction migration can build an index concurrently and backfill in batches."""
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    write_migrations(tmp_path, {
+        "0001_table.sql": "CREATE TABLE items (id SERIAL PRIMARY KEY, code TEXT);\n"
+                          "INSERT INTO items (code) SELECT NULL FROM generate_series(1, 25);",
+        "0002_online.sql": """-- Backfill codes and index them without blocking writers
+-- migrate: no-transaction
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_code ON items(code);
+
+-- migrate: batch size=10 pause_ms=1
+UPDATE items SET code = 'item-' || id
+WHERE id IN (SELECT id FROM items WHERE code IS NULL ORDER BY id LIMIT $1);
+""",
+    })
+    assert await run_migrations(migrate_dsn) == ["0001_table.sql", "0002_online.sql"]
+
+    conn = await asyncpg.connect(migrate_dsn)
+    try:
+        assert await conn.fetchval("SELECT count(*) FROM items WHERE code IS NULL") == 0
+        assert await conn.fetchval("SELECT indisvalid FROM pg_index WHERE indexrelid = 'idx_items_code'::regclass")
+        assert await conn.fetchval("SELECT count(*) FROM migration_progress") == 0
+    finally:
+        await conn.close()
+
+
+async def test_no_transaction_migration_resumes(migrate_dsn, tmp_path, monkeypatch):
+    """Test that an interrupted no-transaction migration resumes after its last finished statement."""
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    write_migrations(tmp_path, {
+        "0001_online.sql": """-- migrate: no-transaction
+CREATE TABLE items (id INT PRIMARY KEY, code TEXT);
+INSERT INTO items SELECT n, NULL FROM generate_series(1, 30) AS n;
+CREATE TABLE gate (open BOOLEAN);
+
+-- migrate: batch size=10
+UPDATE items SET code = 'item-' || id
+WHERE id IN (SELECT id FROM items WHERE code IS NULL ORDER BY id LIMIT $1);
+
+-- Fails until the gate is opened
+SELECT 1 / (SELECT count(*) FROM gate)::int;
+""",
+    })
+    with pytest.raises(asyncpg.DivisionByZeroError):
+        await run_migrations(migrate_dsn)
+
+    conn = await asyncpg.connect(migrate_dsn)
+    try:
+        progress = await conn.fetch(
+            "SELECT statement, rows_done, completed_at IS NOT NULL AS done FROM migration_progress ORDER BY statement"
+        )
+        assert [tuple(row) for row in progress] == [
+            (0, 0, True), (1, 0, True), (2, 0, True), (3, 30, True), (4, 0, False)
+        ]
+        await conn.execute("INSERT INTO gate VALUES (true)")
+        # Running the CREATE TABLE statements again would fail
+        assert await run_migrations(migrate_dsn) == ["0001_online.sql"]
+        assert await conn.fetchval("SELECT count(*) FROM migration_progress") == 0
+    finally:
+        await conn.close()
+
+
+async def test_invalid_index_is_rebuilt(migrate_dsn, tmp_path, monkeypatch):
+    """Test that an index left invalid by a failed concurrent build is dropped and built again."""
+    conn = await asyncpg.connect(migrate_dsn)
+    try:
+        await conn.execute("CREATE TABLE items (code TEXT); INSERT INTO items VALUES ('a'), ('a')")
+        with pytest.raises(asyncpg.UniqueViolationError):
+            await conn.execute("CREATE UNIQUE INDEX CONCURRENTLY idx_items_code ON items(code)")
+        await conn.execute("DELETE FROM items WHERE ctid = (SELECT max(ctid) FROM items)")
+
+        monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+        write_migrations(tmp_path, {
+            "0001_index.sql": "-- migrate: no-transaction\n"
+                              "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_items_code ON items(code);",
+        })
+        await run_migrations(migrate_dsn)
+        assert await conn.fetchval("SELECT indisvalid FROM pg_index WHERE indexrelid = 'idx_items_code'::regclass")
+    finally:
+        await conn.close()
+
+
+async def test_batch_needs_no_transaction(migrate_dsn, tmp_path, monkeypatch):
+    """Test that a batched statement in a transactional migration is rejected."""
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    write_migrations(tmp_path, {
+        "0001_batch.sql": "CREATE TABLE items (id INT);\n-- migrate: batch size=10\n"
+                          "DELETE FROM items WHERE id IN (SELECT id FROM items LIMIT $1);",
+    })
+    with pytest.raises(ValueError, match="needs '-- migrate: no-transaction'"):
+        await run_migrations(migrate_dsn)
@@ -0,0 +1,246 @@
+"""
+Query plan regression tests.
+
+Every named query is EXPLAINed against a seeded database with representative
+parameters, and its plan is checked against what PLANS declares for it: the
+tables it must read through an index and never scan sequentially, and an
+upper bound on the planner's estimated cost. A dropped or unusable index then
+fails here instead of in production.
+
+The plan database is built from the real migrations, not the test schema, and
+seeded with app.db.seed plus custody events and monitoring chunks. Seeding
+takes a while, so the database is kept and reused while the dataset below is
+unchanged. These tests only run with QUERY_PLAN_TESTS=1; the check that every
+query is declared in PLANS always runs.
+"""
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.db.migrate import run_migrations
+from app.db.queries import query_manager
+from app.db.seed import SeedOptions, seed_database
+
+pytestmark = pytest.mark.asyncio
+
+PLAN_DATABASE = "plan_db"
+DATASET = SeedOptions(users=20_000, projects=500, addresses_per_project=40, samples_per_address=1)
+# Addresses given monitoring chunks: a day of hourly chunks for each metric
+MONITORED_ADDRESSES = 1_000
+METRICS = ("pm25", "pm10")
+
+run_plan_tests = pytest.mark.skipif(
+    os.environ.get("QUERY_PLAN_TESTS") != "1",
+    reason="query plan tests need a seeded database; set QUERY_PLAN_TESTS=1"
+)
+
+AT = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+LATER = datetime(2024, 6, 1, 18, tzinfo=timezone.utc)
+BARCODES = ["P1-00001", "P1-00002", "P2-00001"]
+
+
+class Plan(NamedTuple):
+    params: Tuple = ()
+    # Tables that must be read through an index and never scanned sequentially
+    indexed: Tuple[str, ...] = ()
+    # Upper bound on the planner's estimated total cost
+    max_cost: Optional[float] = None
+
+
+# Every named query, or None for DDL, which can't be EXPLAINed
+PLANS: Dict[str, Optional[Plan]] = {
+    # Custody
+    "get_custody_samples_by_barcodes": Plan((BARCODES,), indexed=("samples", "addresses", "projects")),
+    "record_custody_events": Plan(([1, 2], [1, 1], "Field Tech", "Courier", "courier", AT, 3)),
+    "get_custody_current_by_barcode": Plan(("P1-00001",), indexed=("sample_custody_current",)),
+    "get_project_custody_current": Plan((1,), indexed=("sample_custody_current",)),
+    "get_sample_custody_events": Plan(("P1-00001",), indexed=("samples", "sample_custody_events")),
+    "get_project_custody_gaps": Plan((1,), indexed=("sample_custody_events", "samples")),
+    # Init
+    "create_user_roles_with_permissions_view": None,
+    "drop_user_roles_with_permissions_view": None,
+    # Monitoring
+    "lock_monitoring_series": Plan((1, "pm25")),
+    "get_monitoring_chunks_by_start": Plan((1, "pm25", [AT]), indexed=("monitoring_chunks",)),
+    "upsert_monitoring_chunk": Plan((1, "pm25", AT, LATER, 10, 1.0, 2.0, b"", b"")),
+    "get_monitoring_chunks_in_range": Plan((1, "pm25", AT, LATER), indexed=("monitoring_chunks",)),
+    "get_monitoring_chunk_versions_in_range": Plan((1, "pm25", AT, LATER), indexed=("monitoring_chunks",)),
+    # Projects
+    "create_project": Plan(("Plan Project",)),
+    "get_project": Plan((1,), indexed=("projects",)),
+    "update_project": Plan((1, "Plan Project"), indexed=("projects",)),
+    "delete_project": Plan((1,), indexed=("projects",)),
+    "list_projects": Plan(),
+    "list_technician_projects": Plan((3,), indexed=("project_technicians",)),
+    "create_address": Plan(("1 Plan Street", date(2024, 6, 1))),
+    "get_address": Plan((1,), indexed=("addresses",)),
+    "update_address": Plan((1, "1 Plan Street", date(2024, 6, 1)), indexed=("addresses",)),
+    "delete_address": Plan((1,), indexed=("addresses",)),
+    "add_address_to_project": Plan((1, 1), indexed=("projects",)),
+    "remove_address_from_project": Plan((1, 1), indexed=("projects",)),
+    "get_project_addresses": Plan((1,), indexed=("projects", "addresses"), max_cost=200),
+    "get_address_project": Plan((1,), indexed=("projects",)),
+    "assign_technician": Plan((1, 3)),
+    "remove_technician": Plan((1, 3), indexed=("project_technicians",)),
+    "get_project_technicians": Plan((1,), indexed=("project_technicians", "users")),
+    "check_technician_assigned": Plan((1, 3), indexed=("project_technicians",)),
+    # Roles
+    "get_all_roles": Plan(),
+    "get_role_by_id": Plan((1,)),
+    "get_role_by_name": Plan(("admin",)),
+    "get_user_roles": Plan((3,), indexed=("user_roles",)),
+    "get_user_roles_with_permissions": Plan((3,), indexed=("user_roles",)),
+    "create_role": Plan(("auditor", "Read-only access", 30)),
+    "update_role": Plan((1, None, None, None)),
+    "delete_role": Plan((1,)),
+    "get_or_create_admin_role": Plan(),
+    # Samples
+    "create_sample": Plan(("P1-99999", "field", None, AT)),
+    "get_sample_by_barcode": Plan(("P1-00001",), indexed=("samples",)),
+    "add_sample_to_address": Plan((1, 1), indexed=("addresses",)),
+    "get_address_samples": Plan((1,), indexed=("addresses", "samples"), max_cost=200),
+    "get_samples_by_barcodes": Plan((BARCODES,), indexed=("samples",)),
+    "create_lab_batch": Plan(("Plan Batch", 1)),
+    "get_lab_batch": Plan((1,), indexed=("lab_batches",)),
+    "get_lab_batch_results": Plan((1,), indexed=("lab_results",)),
+    # Users
+    "get_user_by_email": Plan(("mary.smith.3@example.com",), indexed=("users",)),
+    "get_user_highest_role_level": Plan((3,), indexed=("user_roles",)),
+    "get_all_users": Plan(),
+    "get_user_by_id": Plan((3,), indexed=("users", "user_roles"), max_cost=50),
+    "create_user": Plan(("plan@example.com", "hash", "Plan", "User", True, False)),
+    "update_user": Plan((3, None, None, None, None, None, None), indexed=("users",)),
+    "delete_user": Plan((3,), indexed=("users",)),
+    "delete_user_roles": Plan((3,), indexed=("user_roles",)),
+    "insert_user_role": Plan((3, 1)),
+    # Versions
+    "get_table_versions": Plan((["roles", "users"],), max_cost=50),
+}
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+# Custody events walk each sample through the field, a courier and the lab
+SEED_CUSTODY = """
+INSERT INTO sample_custody_events (sample_id, project_id, relinquished_by, received_by, holder_role, event_at)
+SELECT s.id, p.id, hop.relinquished_by, hop.received_by, hop.holder_role, s.collected_at + hop.after
+FROM projects p
+JOIN addresses a ON a.id = ANY(p.address_ids)
+JOIN samples s ON s.id = ANY(a.sample_ids)
+CROSS JOIN (VALUES
+    (NULL, 'Field Tech', 'technician', interval '0'),
+    ('Field Tech', 'Courier', 'courier', interval '2 hours'),
+    ('Courier', 'Lab', 'lab', interval '1 day')
+) AS hop(relinquished_by, received_by, holder_role, after);
+
+INSERT INTO sample_custody_current (sample_id, barcode, project_id, event_id, holder, holder_role, since)
+SELECT DISTINCT ON (e.sample_id) e.sample_id, s.barcode, e.project_id, e.id, e.received_by, e.holder_role, e.event_at
+FROM sample_custody_events e
+JOIN samples s ON s.id = e.sample_id
+ORDER BY e.sample_id, e.event_at DESC, e.id DESC;
+"""
+
+SEED_MONITORING = """
+INSERT INTO monitoring_chunks (
+    address_id, metric, chunk_start, chunk_end, reading_count, min_value, max_value, ts_data, value_data
+)
+SELECT a.id, m.metric, h.start, h.start + interval '1 hour', 60, 1, 2, '\\x00', '\\x00'
+FROM addresses a
+CROSS JOIN unnest($1::text[]) AS m(metric)
+CROSS JOIN generate_series($2::timestamptz, $2::timestamptz + interval '23 hours', interval '1 hour') AS h(start)
+WHERE a.id <= $3;
+"""
+
+
+def _dsn(database: str) -> str:
+    return (
+        f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+        f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{database}"
+    )
+
+
+def _marker() -> str:
+    return f"plan dataset: {DATASET!r} monitored={MONITORED_ADDRESSES}"
+
+
+async def _prepare_plan_database() -> None:
+    """Create, migrate and seed the plan database unless it already holds this dataset."""
+    conn = await asyncpg.connect(_dsn("postgres"))
+    try:
+        if not await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", PLAN_DATABASE):
+            await conn.execute(f'CREATE DATABASE "{PLAN_DATABASE}"')
+        marker = await conn.fetchval(
+            "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = $1", PLAN_DATABASE
+        )
+    finally:
+        await conn.close()
+
+    dsn = _dsn(PLAN_DATABASE)
+    # Always migrate, so new indexes are picked up by a database seeded earlier
+    await run_migrations(dsn)
+    if marker == _marker():
+        return
+
+    await seed_database(dsn, DATASET, truncate=True)
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(SEED_CUSTODY)
+        await conn.execute(SEED_MONITORING, list(METRICS), AT.replace(hour=0), MONITORED_ADDRESSES)
+        # VACUUM also flushes the GIN pending lists the seeding filled, as autovacuum would
+        await conn.execute("VACUUM ANALYZE")
+        await conn.execute(f"COMMENT ON DATABASE \"{PLAN_DATABASE}\" IS '{_marker()}'")
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="module")
+async def plan_conn():
+    await _prepare_plan_database()
+    conn = await asyncpg.connect(_dsn(PLAN_DATABASE))
+    try:
+        await conn.execute(query_manager.create_user_roles_with_permissions_view)
+        yield conn
+    finally:
+        await conn.close()
+
+
+def _nodes(node: Dict) -> Iterator[Dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def explain(conn: asyncpg.Connection, name: str, params: Tuple) -> Dict:
+    result = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query_manager.get_query(name)}", *params)
+    return json.loads(result)[0]["Plan"]
+
+
+def test_every_query_has_a_plan():
+    """Test that every named query declares its plan expectations."""
+    assert sorted(query_manager._queries) == sorted(PLANS)
+
+
+@run_plan_tests
+@pytest.mark.parametrize("name", sorted(name for name, plan in PLANS.items() if plan is not None))
+async def test_query_plan(plan_conn, name):
+    """Test that a named query is planned with the indexes and cost it declares."""
+    expected = PLANS[name]
+    plan = await explain(plan_conn, name, expected.params)
+    scans = [
+        (node["Relation Name"], node["Node Type"])
+        for node in _nodes(plan)
+        if "Relation Name" in node and node["Node Type"] != "ModifyTable"
+    ]
+
+    for table in expected.indexed:
+        kinds = {kind for relation, kind in scans if relation == table}
+        assert kinds, f"{name} doesn't read {table}; scans: {scans}"
+        assert kinds <= INDEX_SCANS, f"{name} reads {table} without an index; scans: {scans}"
+    if expected.max_cost is not None:
+        assert plan["Total Cost"] <= expected.max_cost, (
+            f"{name} is estimated at {plan['Total Cost']}, more than {expected.max_cost}"
+        )
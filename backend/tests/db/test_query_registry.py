@@ -0,0 +1,79 @@
+import pytest
+
+from app.db import queries
+from app.db.queries import build
+from app.db.queries.manager import check_queries, query_manager
+from app.db.queries.query import DDL, READ, WRITE, Query
+
+
+def test_compiled_queries_are_up_to_date():
+    """Test that compiled.py matches the .sql files; run python -m app.db.queries.build if not."""
+    assert build.build() == build.COMPILED_PATH.read_text()
+
+
+def test_one_query_manager():
+    """Test that every import path shares the same query manager."""
+    assert queries.query_manager is query_manager
+    assert queries.users is query_manager
+
+
+def test_parse_keeps_query_comments_and_drops_headings():
+    """Test that comments after a name stay with the query and trailing headings are dropped."""
+    parsed = build.parse("example.sql", """-- Example queries
+-- name: first
+-- Documents the first query
+SELECT 1;
+
+-- Second section
+-- name: second
+DELETE FROM t WHERE id = $1;
+""")
+    assert parsed == [
+        Query("first", "example.sql", 0, READ, "-- Documents the first query\nSELECT 1;"),
+        Query("second", "example.sql", 1, WRITE, "DELETE FROM t WHERE id = $1;"),
+    ]
+
+
+@pytest.mark.parametrize("content, error", [
+    ("CREATE VIEW v AS SELECT 1;\n-- name: first\nSELECT 1;", "example.sql:1: SQL outside a named query"),
+    ("-- name: first\nSELECT 1;\nSELECT 2;", "more than one statement"),
+    ("-- name: first\n-- nothing here\n", "query first is empty"),
+])
+def test_parse_rejects_malformed_files(content, error):
+    """Test that unnamed SQL, several statements in a query and empty queries fail the build."""
+    with pytest.raises(ValueError, match=error):
+        build.parse("example.sql", content)
+
+
+@pytest.mark.parametrize("sql, params, kind", [
+    ("SELECT * FROM users WHERE id = $1 AND email = $2", 2, READ),
+    ("SELECT '$3; not a param' AS note, $1 -- $4 neither", 1, READ),
+    ("SELECT * FROM samples WHERE id = $1 FOR UPDATE", 1, WRITE),
+    ("SELECT pg_advisory_xact_lock($1, hashtext($2))", 2, WRITE),
+    ("WITH moved AS (UPDATE t SET a = $2 WHERE id = $1 RETURNING *) SELECT * FROM moved", 2, WRITE),
+    ("SELECT updated_at FROM roles WHERE name = 'delete'", 0, READ),
+    ("CREATE OR REPLACE VIEW v AS SELECT $$;$$ AS body", 0, DDL),
+])
+def test_params_and_kind(sql, params, kind):
+    """Test that parameters are counted and queries classified outside literals and comments."""
+    assert build.count_params(sql) == params
+    assert build.classify(sql) == kind
+
+
+async def test_queries_prepare_against_schema(db_pool):
+    """Test that every named query prepares against the schema with its compiled parameter count."""
+    async with db_pool.acquire() as conn:
+        await check_queries(conn)
+
+
+async def test_check_reports_drift(db_pool):
+    """Test that queries that don't match the schema are all reported."""
+    drifted = {
+        "missing_column": Query("missing_column", "users.sql", 1, READ, "SELECT nickname FROM users WHERE id = $1"),
+        "wrong_params": Query("wrong_params", "users.sql", 2, READ, "SELECT * FROM users WHERE id = $1"),
+    }
+    async with db_pool.acquire() as conn:
+        with pytest.raises(RuntimeError) as error:
+            await check_queries(conn, drifted)
+    assert "missing_column (users.sql): column \"nickname\" does not exist" in str(error.value)
+    assert "wrong_params (users.sql): takes 1 parameters, compiled with 2" in str(error.value)
@@ -0,0 +1,129 @@
+import json
+from datetime import date, datetime, timezone
+from typing import Any, List, get_args, get_origin
+
+import pytest
+from pydantic import BaseModel, EmailStr
+
+from app.db.queries.manager import query_manager
+from app.db.rows import from_row, from_rows
+from app.schemas.custody import CustodyEventInDB, CustodyGap, CustodyHolder
+from app.schemas.project import AddressInDB, ProjectInDB, ProjectWithAddresses
+from app.schemas.role import RoleResponse
+from app.schemas.sample import LabResultInDB, SampleInDB
+from app.schemas.user import RoleResponse as UserRoleResponse, UserInDB, UserResponse
+
+pytestmark = pytest.mark.asyncio
+
+# The model each query's rows are mapped to with from_row
+ROW_MODELS = {
+    "get_user_by_id": UserResponse,
+    "get_all_users": UserResponse,
+    "update_user": UserResponse,
+    "get_user_by_email": UserInDB,
+    "get_user_roles_with_permissions": UserRoleResponse,
+    "get_all_roles": RoleResponse,
+    "get_role_by_id": RoleResponse,
+    "update_role": RoleResponse,
+    "create_project": ProjectInDB,
+    "get_project": ProjectWithAddresses,
+    "update_project": ProjectInDB,
+    "get_project_addresses": AddressInDB,
+    "create_address": AddressInDB,
+    "update_address": AddressInDB,
+    "create_sample": SampleInDB,
+    "get_address_samples": SampleInDB,
+    "record_custody_events": CustodyEventInDB,
+    "get_sample_custody_events": CustodyEventInDB,
+    "get_custody_current_by_barcode": CustodyHolder,
+    "get_project_custody_current": CustodyHolder,
+    "get_project_custody_gaps": CustodyGap,
+    "get_lab_batch_results": LabResultInDB,
+}
+
+# Python types a column of each Postgres type can fill
+COLUMN_TYPES = {
+    "int2": {int}, "int4": {int}, "int8": {int},
+    "float4": {float}, "float8": {float},
+    "text": {str}, "varchar": {str}, "bpchar": {str},
+    "bool": {bool},
+    "timestamptz": {datetime, date}, "timestamp": {datetime, date},
+    "date": {date},
+}
+JSON_TYPES = {"json", "jsonb", "text"}
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def _compatible(column_type: str, annotation: Any) -> bool:
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    if get_origin(annotation) is not list and len(args) == 1:
+        annotation = args[0]
+    if get_origin(annotation) is list:
+        if column_type.endswith("[]"):
+            return _compatible(column_type[:-2], get_args(annotation)[0])
+        return column_type in JSON_TYPES
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return column_type in JSON_TYPES
+    if annotation is EmailStr:
+        annotation = str
+    return annotation in COLUMN_TYPES.get(column_type, ())
+
+
+def test_every_mapped_query_exists():
+    """Test that ROW_MODELS only names known queries."""
+    assert set(ROW_MODELS) <= set(query_manager._queries)
+
+
+async def test_query_columns_match_models(db_pool):
+    """Test that each mapped query returns every required field of its model with a compatible type."""
+    problems: List[str] = []
+    async with db_pool.acquire() as conn:
+        for name, model in ROW_MODELS.items():
+            statement = await conn.prepare(query_manager.get_query(name))
+            columns = {attribute.name: attribute.type.name for attribute in statement.get_attributes()}
+            for field_name, field in model.model_fields.items():
+                if field_name not in columns:
+                    if field.is_required():
+                        problems.append(f"{name}: no column for required field {model.__name__}.{field_name}")
+                elif not _compatible(columns[field_name], field.annotation):
+                    problems.append(
+                        f"{name}: column {field_name} is {columns[field_name]}, "
+                        f"{model.__name__}.{field_name} is {field.annotation}"
+                    )
+    assert not problems, "\n".join(problems)
+
+
+def test_from_row_matches_validation():
+    """Test that a row with JSON roles maps to the same model validation builds."""
+    roles = [
+        {"id": 1, "name": "admin", "description": None, "level": 100,
+         "created_at": CREATED.isoformat(), "permissions": ["users:read"]},
+    ]
+    row = {
+        "id": 7, "email": "mary@example.com", "hashed_password": "hash", "first_name": "Mary",
+        "last_name": "Smith", "is_active": True, "is_superuser": False,
+        "created_at": CREATED, "updated_at": None, "roles": json.dumps(roles),
+    }
+    user = from_row(UserResponse, row)
+    assert user == UserResponse(**row)
+    assert isinstance(user.roles[0], UserRoleResponse)
+    assert user.roles[0].created_at == CREATED
+    assert user.model_dump_json() == UserResponse(**row).model_dump_json()
+
+
+def test_from_row_conversions():
+    """Test that timestamps become dates, NULL lists take their default and models pass through."""
+    address = {"id": 1, "name": "1 Main St", "date": date(2024, 1, 1), "sample_ids": None, "created_at": CREATED}
+    mapped = from_row(AddressInDB, address)
+    assert mapped.created_at == date(2024, 1, 2)
+    assert mapped.sample_ids == []
+    assert mapped == AddressInDB(**{**address, "sample_ids": []})
+
+    project = {"id": 2, "name": "Survey", "address_ids": [1], "created_at": CREATED}
+    with_addresses = from_row(ProjectWithAddresses, {**project, "addresses": [mapped]})
+    assert with_addresses.addresses[0] is mapped
+    assert with_addresses.created_at == date(2024, 1, 2)
+
+    assert from_row(UserResponse, {"id": 3, "roles": None}).roles == []
+    assert from_rows(CustodyHolder, []) == []
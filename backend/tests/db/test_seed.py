@@ -0,0 +1,74 @@
+import pytest
+from app.core.config import settings
+from app.core.security import verify_password
+from app.db.seed import SeedOptions, seed_database, role_of
+
+pytestmark = pytest.mark.asyncio
+
+OPTIONS = SeedOptions(users=30, projects=4, addresses_per_project=5, samples_per_address=2, results_per_sample=3)
+
+async def snapshot(db_pool) -> dict:
+    return {
+        "users": [tuple(r) for r in await db_pool.fetch("SELECT id, email FROM users ORDER BY id")],
+        "addresses": [tuple(r) for r in await db_pool.fetch(
+            "SELECT id, name, date, sample_ids FROM addresses ORDER BY id"
+        )],
+        "technicians": [tuple(r) for r in await db_pool.fetch(
+            "SELECT project_id, user_id FROM project_technicians ORDER BY 1, 2"
+        )],
+        "results": [tuple(r) for r in await db_pool.fetch(
+            "SELECT id, sample_id, analyte, value FROM lab_results ORDER BY id"
+        )],
+    }
+
+async def test_seed_database(db_pool):
+    """Test that the seeder loads consistent, linked rows with known accounts."""
+    counts = await seed_database(settings.get_database_url, OPTIONS, password="Secret123!", workers=2)
+    assert counts.pop("project_technicians") >= 4
+    assert counts == {
+        "users": 30, "user_roles": 30, "projects": 4, "addresses": 20,
+        "samples": 40, "lab_batches": 4, "lab_results": 120,
+    }
+
+    roles = dict(await db_pool.fetch(
+        "SELECT ur.user_id, r.name FROM user_roles ur JOIN roles r ON r.id = ur.role_id WHERE ur.user_id <= 3"
+    ))
+    assert roles == {1: "admin", 2: "supervisor", 3: "technician"}
+    assert await db_pool.fetchval(
+        "SELECT array_agg(project_id ORDER BY project_id) FROM project_technicians WHERE user_id = 3"
+    ) == [1, 2, 3]
+    for user_id, role in await db_pool.fetch(
+        "SELECT pt.user_id, r.name FROM project_technicians pt "
+        "JOIN user_roles ur USING (user_id) JOIN roles r ON r.id = ur.role_id"
+    ):
+        assert role == "technician" == role_of(OPTIONS.seed, user_id)
+
+    hashed = await db_pool.fetchval("SELECT hashed_password FROM users WHERE id = 7")
+    assert verify_password("Secret123!", hashed)
+    assert await db_pool.fetchval("SELECT address_ids FROM projects WHERE id = 2") == [6, 7, 8, 9, 10]
+    assert await db_pool.fetchval("SELECT barcode FROM samples WHERE id = 11") == "P2-00001"
+    # Sequences continue after the seeded ids
+    assert await db_pool.fetchval("INSERT INTO addresses (name, date) VALUES ('New', '2024-01-01') RETURNING id") == 21
+
+async def test_seed_is_deterministic(db_pool):
+    """Test that the same seed gives the same rows regardless of the number of workers."""
+    await seed_database(settings.get_database_url, OPTIONS, workers=2)
+    first = await snapshot(db_pool)
+    await db_pool.execute(
+        "TRUNCATE lab_results, lab_batches, samples, project_technicians, projects, addresses, user_roles, users "
+        "RESTART IDENTITY CASCADE"
+    )
+    await seed_database(settings.get_database_url, OPTIONS, workers=1)
+    assert await snapshot(db_pool) == first
+
+    await db_pool.execute(
+        "TRUNCATE lab_results, lab_batches, samples, project_technicians, projects, addresses, user_roles, users "
+        "RESTART IDENTITY CASCADE"
+    )
+    await seed_database(settings.get_database_url, OPTIONS._replace(seed=2), workers=1)
+    assert (await snapshot(db_pool))["users"] != first["users"]
+
+async def test_seed_refuses_existing_data(db_pool, test_user):
+    """Test that existing users are not overwritten without truncate."""
+    with pytest.raises(RuntimeError, match="not empty"):
+        await seed_database(settings.get_database_url, OPTIONS, workers=1)
@@ -0,0 +1,114 @@
+import datetime
+import json
+import logging
+import pytest
+from app.core import metrics
+from app.core.config import settings
+from app.db import slow_queries
+from app.db.instrumentation import create_pool
+from app.db.queries.compiled import QUERIES
+from app.db.queries.manager import QUERY_NAMES
+from app.db.queries.query import READ, WRITE, Query
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def instrumented_pool(create_test_database, monkeypatch):
+    metrics.reset()
+    slow_queries.reset()
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 50)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_INTERVAL_SECONDS", 300)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 5000)
+    pool = await create_pool(settings.get_database_url, min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+    metrics.reset()
+    slow_queries.reset()
+
+def register(monkeypatch, query: str, name: str, kind: str = READ) -> None:
+    """Make a test query a named query of the given kind."""
+    monkeypatch.setitem(QUERY_NAMES, query, name)
+    monkeypatch.setitem(QUERIES, name, Query(name, "test.sql", query.count("$"), kind, query))
+
+def captures(caplog) -> list:
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.slow_queries"]
+
+async def test_redact():
+    """Test that only numbers and dates are logged as-is."""
+    assert slow_queries.redact([1, None, True, 2.5, "secret@example.com", b"ab", datetime.date(2024, 1, 2)]) == [
+        1, None, True, 2.5, "<str len=18>", "<bytes len=2>", "2024-01-02"
+    ]
+
+async def test_slow_query_is_captured_with_plan(instrumented_pool, monkeypatch, caplog):
+    """Test that a slow named query is logged with redacted params and an EXPLAIN ANALYZE plan."""
+    query = "SELECT pg_sleep($1::float / 1000) WHERE NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = $2)"
+    register(monkeypatch, query, "sleepy_query")
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        await instrumented_pool.fetch(query, 60, "someone@example.com")
+        await slow_queries.drain()
+
+    [capture] = captures(caplog)
+    assert capture["query"] == "sleepy_query"
+    assert capture["duration_ms"] >= 50
+    assert capture["params"] == [60, "<str len=19>"]
+    assert "actual time=" in capture["plan"]
+    assert "Index Cond: (relname = '<redacted>'::name)" in capture["plan"]
+    assert metrics.SLOW_QUERIES.values == {("sleepy_query",): 1}
+
+async def test_fast_queries_are_not_captured(instrumented_pool, monkeypatch, caplog):
+    """Test that queries under the threshold are ignored."""
+    query = "SELECT 1"
+    register(monkeypatch, query, "fast_query")
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        await instrumented_pool.fetchval(query)
+        await slow_queries.drain()
+    assert captures(caplog) == []
+    assert metrics.SLOW_QUERIES.values == {}
+
+async def test_captures_are_rate_limited(instrumented_pool, monkeypatch, caplog):
+    """Test that repeated slow runs of a query are counted but only captured once per interval."""
+    query = "SELECT pg_sleep($1::float / 1000)"
+    register(monkeypatch, query, "sleepy_query")
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        for _ in range(3):
+            await instrumented_pool.fetch(query, 55)
+        await slow_queries.drain()
+    assert len(captures(caplog)) == 1
+    assert metrics.SLOW_QUERIES.values == {("sleepy_query",): 3}
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_INTERVAL_SECONDS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        await instrumented_pool.fetch(query, 55)
+        await slow_queries.drain()
+    assert captures(caplog)[-1]["suppressed"] == 2
+
+async def test_writes_are_explained_without_running(instrumented_pool, monkeypatch, caplog):
+    """Test that a slow write gets a plain EXPLAIN, so it isn't run a second time."""
+    query = "INSERT INTO slow_writes_log SELECT $1 FROM pg_sleep(0.06)"
+    async with instrumented_pool.acquire() as conn:
+        await conn.execute("CREATE TABLE IF NOT EXISTS slow_writes_log (n int)")
+        register(monkeypatch, query, "slow_insert", WRITE)
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+                await conn.execute(query, 7)
+                await slow_queries.drain()
+            assert await conn.fetchval("SELECT count(*) FROM slow_writes_log") == 1
+        finally:
+            await conn.execute("DROP TABLE slow_writes_log")
+    plan = captures(caplog)[0]["plan"]
+    assert "Insert on slow_writes_log" in plan
+    assert "actual time=" not in plan
+
+async def test_explain_is_cancelled_after_timeout(instrumented_pool, monkeypatch, caplog):
+    """Test that re-running a slow query under EXPLAIN stops at the timeout and the capture says why."""
+    query = "SELECT pg_sleep($1::float / 1000)"
+    register(monkeypatch, query, "sleepy_query")
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 100)
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        await instrumented_pool.fetch(query, 300)
+        await slow_queries.drain()
+    [capture] = captures(caplog)
+    assert capture["duration_ms"] >= 300
+    assert capture["plan"].startswith("EXPLAIN failed: QueryCanceledError")
@@ -0,0 +1,155 @@
+import asyncpg
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.schemas.project import ProjectCreate, AddressCreate
+from app.schemas.sample import SampleCreate
+from app.schemas.custody import CustodyTransfer
+from app.services import projects as project_service
+from app.services import samples as sample_service
+from app.services import custody as custody_service
+
+pytestmark = pytest.mark.asyncio
+
+COLLECTED_AT = datetime(2024, 1, 1, 9, tzinfo=timezone.utc)
+
+async def create_samples(db_pool, admin_user, barcodes):
+    """Create a project with one address holding the given samples."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Custody Project"), admin_user.id)
+    address = await project_service.create_address(
+        db_pool, project.id, AddressCreate(name="123 Custody St", date=date(2024, 1, 1)), admin_user.id
+    )
+    for barcode in barcodes:
+        await sample_service.create_sample(
+            db_pool, address.id, SampleCreate(barcode=barcode, collected_at=COLLECTED_AT), admin_user.id
+        )
+    return project
+
+def transfer(barcodes, relinquished_by, received_by, holder_role, hours):
+    return CustodyTransfer(
+        barcodes=barcodes,
+        relinquished_by=relinquished_by,
+        received_by=received_by,
+        holder_role=holder_role,
+        event_at=COLLECTED_AT + timedelta(hours=hours)
+    )
+
+async def test_record_transfer_updates_current_holder(db_pool, admin_user):
+    """Test that a cooler scan records one event per sample and moves the current holder."""
+    project = await create_samples(db_pool, admin_user, ["S-0001", "S-0002"])
+
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001", "S-0002"], None, "Tech A", "technician", 1), admin_user.id
+    )
+    events = await custody_service.record_transfer(
+        db_pool, transfer(["S-0001", "S-0002"], "Tech A", "Courier B", "courier", 2), admin_user.id
+    )
+    assert [e.barcode for e in events] == ["S-0001", "S-0002"]
+    assert all(e.project_id == project.id for e in events)
+
+    holder = await custody_service.get_current_holder(db_pool, "S-0001", admin_user.id)
+    assert holder.holder == "Courier B"
+    assert holder.holder_role == "courier"
+
+    holders = await custody_service.get_project_holders(db_pool, project.id, admin_user.id)
+    assert [(h.barcode, h.holder) for h in holders] == [("S-0001", "Courier B"), ("S-0002", "Courier B")]
+
+async def test_late_scan_does_not_move_holder_back(db_pool, admin_user):
+    """Test that an event recorded late doesn't replace a newer current holder."""
+    await create_samples(db_pool, admin_user, ["S-0001"])
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], "Courier B", "Lab C", "lab", 5), admin_user.id
+    )
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], "Tech A", "Courier B", "courier", 2), admin_user.id
+    )
+
+    holder = await custody_service.get_current_holder(db_pool, "S-0001", admin_user.id)
+    assert holder.holder == "Lab C"
+
+    events = await custody_service.get_sample_events(db_pool, "S-0001", admin_user.id)
+    assert [e.received_by for e in events] == ["Courier B", "Lab C"]
+
+async def test_project_gaps(db_pool, admin_user):
+    """Test that hand-offs not relinquished by the previous holder are reported."""
+    project = await create_samples(db_pool, admin_user, ["S-0001", "S-0002"])
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001", "S-0002"], None, "Tech A", "technician", 1), admin_user.id
+    )
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], "tech a", "Courier B", "courier", 2), admin_user.id
+    )
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0002"], "Courier X", "Lab C", "lab", 3), admin_user.id
+    )
+
+    gaps = await custody_service.get_project_gaps(db_pool, project.id, admin_user.id)
+    assert len(gaps) == 1
+    assert gaps[0].barcode == "S-0002"
+    assert gaps[0].relinquished_by == "Courier X"
+    assert gaps[0].expected_holder == "Tech A"
+
+async def test_custody_events_are_append_only(db_pool, admin_user):
+    """Test that updating or deleting a custody event fails instead of silently doing nothing."""
+    await create_samples(db_pool, admin_user, ["S-0001"])
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], None, "Tech A", "technician", 1), admin_user.id
+    )
+    with pytest.raises(asyncpg.RestrictViolationError, match="append-only"):
+        await db_pool.execute("UPDATE sample_custody_events SET received_by = 'Someone Else'")
+    with pytest.raises(asyncpg.RestrictViolationError, match="append-only"):
+        await db_pool.execute("DELETE FROM sample_custody_events")
+    assert await db_pool.fetchval("SELECT received_by FROM sample_custody_events") == "Tech A"
+
+async def test_record_transfer_unknown_barcode(db_pool, admin_user):
+    """Test that a scan with an unknown barcode records nothing."""
+    await create_samples(db_pool, admin_user, ["S-0001"])
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.record_transfer(
+            db_pool, transfer(["S-0001", "S-9999"], None, "Tech A", "technician", 1), admin_user.id
+        )
+    assert exc.value.status_code == 400
+    assert "S-9999" in exc.value.detail
+
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.get_current_holder(db_pool, "S-0001", admin_user.id)
+    assert exc.value.status_code == 404
+
+async def test_record_transfer_unauthorized(db_pool, test_user):
+    """Test that users without a role can't record transfers."""
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.record_transfer(
+            db_pool, transfer(["S-0001"], None, "Tech A", "technician", 1), test_user.id
+        )
+    assert exc.value.status_code == 403
+
+async def test_record_transfer_requires_project_access(db_pool, admin_user, technician_user):
+    """Test that technicians can only move custody of samples in projects they are assigned to."""
+    project = await create_samples(db_pool, admin_user, ["S-0001"])
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.record_transfer(
+            db_pool, transfer(["S-0001"], None, "Tech A", "technician", 1), technician_user.id
+        )
+    assert exc.value.status_code == 403
+
+    await project_service.assign_technician(db_pool, project.id, technician_user.id, admin_user.id)
+    [event] = await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], None, "Tech A", "technician", 1), technician_user.id
+    )
+    assert event.received_by == "Tech A"
+
+async def test_get_current_holder_requires_access(db_pool, admin_user, technician_user):
+    """Test that unassigned technicians can't look up custody."""
+    await create_samples(db_pool, admin_user, ["S-0001"])
+    await custody_service.record_transfer(
+        db_pool, transfer(["S-0001"], None, "Tech A", "technician", 1), admin_user.id
+    )
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.get_current_holder(db_pool, "S-0001", technician_user.id)
+    assert exc.value.status_code == 403
+
+async def test_project_report_not_found(db_pool, admin_user):
+    """Test custody reports for a project that doesn't exist."""
+    with pytest.raises(HTTPException) as exc:
+        await custody_service.get_project_gaps(db_pool, 999, admin_user.id)
+    assert exc.value.status_code == 404
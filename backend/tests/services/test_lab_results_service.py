@@ -0,0 +1,77 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.schemas.project import ProjectCreate, AddressCreate
+from app.schemas.sample import SampleCreate, LabBatchCreate, LabResultCreate
+from app.services import projects as project_service
+from app.services import samples as sample_service
+from app.services import lab_results as lab_service
+
+pytestmark = pytest.mark.asyncio
+
+COLLECTED_AT = datetime(2024, 1, 1, 9, tzinfo=timezone.utc)
+ANALYZED_AT = COLLECTED_AT + timedelta(days=3)
+
+async def create_samples(db_pool, admin_user):
+    """Create an original sample and its field duplicate."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Lab Project"), admin_user.id)
+    address = await project_service.create_address(
+        db_pool, project.id, AddressCreate(name="123 Lab St", date=date(2024, 1, 1)), admin_user.id
+    )
+    await sample_service.create_sample(
+        db_pool, address.id, SampleCreate(barcode="S-0001", collected_at=COLLECTED_AT), admin_user.id
+    )
+    await sample_service.create_sample(
+        db_pool, address.id,
+        SampleCreate(barcode="S-0002", sample_type="field_duplicate", parent_barcode="S-0001", collected_at=COLLECTED_AT),
+        admin_user.id
+    )
+
+def make_batch(name="Batch 1"):
+    return LabBatchCreate(name=name, results=[
+        LabResultCreate(barcode="S-0001", analyte="Lead", value=10.0, unit="ug/ft2", analyzed_at=ANALYZED_AT),
+        LabResultCreate(barcode="S-0002", analyte="Lead", value=20.0, unit="ug/ft2", analyzed_at=ANALYZED_AT),
+        LabResultCreate(barcode="S-0001", analyte="Benzene", value=1.0, analyzed_at=ANALYZED_AT + timedelta(days=30)),
+        LabResultCreate(result_type="method_blank", analyte="Lead", value=0.1, reporting_limit=0.5, analyzed_at=ANALYZED_AT),
+    ])
+
+async def test_import_batch_stores_qc_flags(db_pool, admin_user):
+    """Test that importing a batch stores each result with its QC flags."""
+    await create_samples(db_pool, admin_user)
+
+    batch = await lab_service.import_batch(db_pool, make_batch(), admin_user.id)
+    assert batch.result_count == 4
+    assert batch.flag_counts == {"rpd_exceeded": 2, "holding_time_exceeded": 1}
+
+    results = await lab_service.get_batch_results(db_pool, batch.id, admin_user.id)
+    assert [r.barcode for r in results] == ["S-0001", "S-0002", "S-0001", None]
+    assert [r.qc_flags for r in results] == [
+        ["rpd_exceeded"], ["rpd_exceeded"], ["holding_time_exceeded"], []
+    ]
+
+async def test_import_batch_unknown_barcode(db_pool, admin_user):
+    """Test that results for unknown samples reject the whole batch."""
+    with pytest.raises(HTTPException) as exc:
+        await lab_service.import_batch(db_pool, make_batch(), admin_user.id)
+    assert exc.value.status_code == 400
+    assert "S-0001" in exc.value.detail
+
+async def test_import_batch_duplicate_name(db_pool, admin_user):
+    """Test that batch names are unique."""
+    await create_samples(db_pool, admin_user)
+    await lab_service.import_batch(db_pool, make_batch(), admin_user.id)
+    with pytest.raises(HTTPException) as exc:
+        await lab_service.import_batch(db_pool, make_batch(), admin_user.id)
+    assert exc.value.status_code == 400
+
+async def test_import_batch_unauthorized(db_pool, technician_user):
+    """Test that technicians can't import lab results."""
+    with pytest.raises(HTTPException) as exc:
+        await lab_service.import_batch(db_pool, make_batch(), technician_user.id)
+    assert exc.value.status_code == 403
+
+async def test_get_batch_results_not_found(db_pool, technician_user):
+    """Test getting the results of a batch that doesn't exist."""
+    with pytest.raises(HTTPException) as exc:
+        await lab_service.get_batch_results(db_pool, 999, technician_user.id)
+    assert exc.value.status_code == 404
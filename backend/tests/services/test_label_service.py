@@ -0,0 +1,89 @@
+import os
+import time
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.schemas.project import ProjectCreate
+from app.services import projects as project_service
+from app.services import labels as label_service
+
+@pytest.fixture
+def label_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LABEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "LABEL_WORKERS", 2)
+    yield tmp_path
+    label_service.shutdown_executor()
+
+async def test_label_sheet_is_rendered_once(db_pool, admin_user, label_cache, monkeypatch):
+    """Test that a sheet is rendered on first request and served from disk afterwards."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Label Project"), admin_user.id)
+
+    renders = []
+    render = label_service._render
+    async def counting_render(*args):
+        renders.append(args)
+        return await render(*args)
+    monkeypatch.setattr(label_service, "_render", counting_render)
+
+    path = await label_service.get_label_sheet(db_pool, project.id, 1, 45, "avery-5160", "pdf", 1, admin_user.id)
+    assert path.parent == label_cache
+    assert path.read_bytes().startswith(b"%PDF")
+    assert b"/Count 2" in path.read_bytes()
+
+    again = await label_service.get_label_sheet(db_pool, project.id, 1, 45, "avery-5160", "pdf", 1, admin_user.id)
+    assert again == path
+    assert len(renders) == 1
+    assert label_service._locks == {}
+
+    other = await label_service.get_label_sheet(db_pool, project.id, 1, 45, "avery-5163", "pdf", 1, admin_user.id)
+    assert other != path
+    assert len(renders) == 2
+
+def test_sweep_cache_by_age_then_size(tmp_path, monkeypatch):
+    """Test that expired sheets go first, then the least recently used until the cache fits."""
+    monkeypatch.setattr(settings, "LABEL_CACHE_MAX_AGE_SECONDS", 3600)
+    monkeypatch.setattr(settings, "LABEL_CACHE_MAX_BYTES", 250)
+    now = time.time()
+    ages = {"expired.pdf": 7200, "oldest.pdf": 300, "older.pdf": 200, "recent.pdf": 100, "new.pdf": 0}
+    for name, age in ages.items():
+        (tmp_path / name).write_bytes(b"x" * 100)
+        os.utime(tmp_path / name, (now - age, now - age))
+
+    label_service.sweep_cache(tmp_path, keep=tmp_path / "new.pdf")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.pdf", "recent.pdf"]
+
+    # The sheet just written stays even if it alone is over the limit
+    monkeypatch.setattr(settings, "LABEL_CACHE_MAX_BYTES", 50)
+    label_service.sweep_cache(tmp_path, keep=tmp_path / "new.pdf")
+    assert [p.name for p in tmp_path.iterdir()] == ["new.pdf"]
+
+async def test_png_page(db_pool, admin_user, label_cache):
+    """Test rendering one page of a sheet as PNG."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Label Project"), admin_user.id)
+    path = await label_service.get_label_sheet(db_pool, project.id, 1, 45, "avery-5160", "png", 2, admin_user.id)
+    assert path.suffix == ".png"
+    assert path.read_bytes().startswith(b"\x89PNG")
+
+    with pytest.raises(HTTPException) as exc:
+        await label_service.get_label_sheet(db_pool, project.id, 1, 45, "avery-5160", "png", 3, admin_user.id)
+    assert exc.value.status_code == 400
+
+async def test_invalid_requests(db_pool, admin_user, label_cache):
+    """Test rejecting unknown templates, reversed ranges and oversized ranges."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Label Project"), admin_user.id)
+    for start, end, template in [(1, 10, "avery-0000"), (10, 1, "avery-5160"), (1, settings.LABEL_MAX_COUNT + 1, "avery-5160")]:
+        with pytest.raises(HTTPException) as exc:
+            await label_service.get_label_sheet(db_pool, project.id, start, end, template, "pdf", 1, admin_user.id)
+        assert exc.value.status_code == 400
+
+async def test_label_sheet_unauthorized(db_pool, technician_user, label_cache):
+    """Test that technicians can't print label sheets."""
+    with pytest.raises(HTTPException) as exc:
+        await label_service.get_label_sheet(db_pool, 1, 1, 10, "avery-5160", "pdf", 1, technician_user.id)
+    assert exc.value.status_code == 403
+
+async def test_label_sheet_project_not_found(db_pool, admin_user, label_cache):
+    """Test printing labels for a project that doesn't exist."""
+    with pytest.raises(HTTPException) as exc:
+        await label_service.get_label_sheet(db_pool, 999, 1, 10, "avery-5160", "pdf", 1, admin_user.id)
+    assert exc.value.status_code == 404
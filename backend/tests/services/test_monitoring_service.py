@@ -0,0 +1,138 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.schemas.monitoring import ReadingBatch
+from app.schemas.project import ProjectCreate, AddressCreate
+from app.services import monitoring as monitoring_service
+from app.services import projects as project_service
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+async def create_address(db_pool, admin_user, technician_user):
+    """Create a project with one address and assign the technician to it."""
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Monitoring Project"), admin_user.id)
+    await project_service.assign_technician(db_pool, project.id, technician_user.id, admin_user.id)
+    return await project_service.create_address(
+        db_pool, project.id, AddressCreate(name="123 Monitor St", date=date(2024, 1, 1)), admin_user.id
+    )
+
+def make_batch(start, count, step_seconds=5, offset=0.0):
+    return ReadingBatch(
+        metric="pm25",
+        timestamps=[start + timedelta(seconds=i * step_seconds) for i in range(count)],
+        values=[offset + i for i in range(count)]
+    )
+
+async def test_append_readings_creates_chunks(db_pool, admin_user, technician_user):
+    """Test that readings spanning two hours are stored in two chunks and read back in order."""
+    address = await create_address(db_pool, admin_user, technician_user)
+
+    result = await monitoring_service.append_readings(
+        db_pool, address.id, make_batch(START, 1440), technician_user.id
+    )
+    assert result.accepted == 1440
+    assert result.chunks == 2
+
+    timestamps, values = await monitoring_service.read_range(
+        db_pool, address.id, "pm25", START, START + timedelta(hours=2)
+    )
+    assert timestamps.size == 1440
+    assert values[0] == 0 and values[-1] == 1439
+
+    count = await db_pool.fetchval("SELECT COUNT(*) FROM monitoring_chunks WHERE address_id = $1", address.id)
+    assert count == 2
+
+async def test_append_readings_merges_into_existing_chunk(db_pool, admin_user, technician_user):
+    """Test that appending to an existing chunk merges readings and overwrites duplicates."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 10), technician_user.id)
+
+    # Overlaps the last five readings and adds five new ones
+    await monitoring_service.append_readings(
+        db_pool, address.id, make_batch(START + timedelta(seconds=25), 10, offset=100.0), technician_user.id
+    )
+
+    timestamps, values = await monitoring_service.read_range(
+        db_pool, address.id, "pm25", START, START + timedelta(hours=1)
+    )
+    assert timestamps.size == 15
+    assert values.tolist()[:5] == [0, 1, 2, 3, 4]
+    assert values.tolist()[5:] == [100 + i for i in range(10)]
+
+    row = await db_pool.fetchrow(
+        "SELECT reading_count, version, min_value, max_value FROM monitoring_chunks WHERE address_id = $1",
+        address.id
+    )
+    assert row["reading_count"] == 15
+    assert row["version"] == 2
+    assert row["min_value"] == 0 and row["max_value"] == 109
+
+async def test_read_range_returns_only_requested_window(db_pool, admin_user, technician_user):
+    """Test that a range read inside one chunk returns only readings in that window."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 2160), technician_user.id)
+
+    series = await monitoring_service.get_readings(
+        db_pool, address.id, "pm25",
+        START + timedelta(hours=1, minutes=30), START + timedelta(hours=1, minutes=31),
+        admin_user.id
+    )
+    assert len(series.timestamps) == 12
+    assert series.timestamps[0] == START + timedelta(hours=1, minutes=30)
+    assert series.values[0] == 1080
+
+async def test_read_range_other_metric_is_empty(db_pool, admin_user, technician_user):
+    """Test that readings are kept per metric."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 10), technician_user.id)
+
+    timestamps, values = await monitoring_service.read_range(
+        db_pool, address.id, "voc", START, START + timedelta(hours=1)
+    )
+    assert timestamps.size == 0
+    assert values.size == 0
+
+async def test_append_readings_unauthorized(db_pool, admin_user, technician_user, test_user):
+    """Test that users without a technician role or assignment can't append readings."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    with pytest.raises(HTTPException) as exc:
+        await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 10), test_user.id)
+    assert exc.value.status_code == 403
+
+async def test_append_readings_address_not_found(db_pool, technician_user):
+    """Test appending readings to an address that doesn't exist."""
+    with pytest.raises(HTTPException) as exc:
+        await monitoring_service.append_readings(db_pool, 999, make_batch(START, 10), technician_user.id)
+    assert exc.value.status_code == 404
+
+async def test_get_series_downsamples_to_points(db_pool, admin_user, technician_user):
+    """Test that a series is reduced to at most the requested number of points."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 4320), technician_user.id)
+
+    series = await monitoring_service.get_series(
+        db_pool, address.id, "pm25", START, START + timedelta(hours=6), 100, admin_user.id
+    )
+    assert 0 < len(series.timestamps) <= 100
+    assert len(series.values) == len(series.min_values) == len(series.max_values) == len(series.timestamps)
+    assert series.min_values[0] == 0
+    assert series.max_values[-1] == 4319
+
+async def test_get_series_cache_invalidated_by_append(db_pool, admin_user, technician_user):
+    """Test that cached series are reused until new readings land in the range."""
+    address = await create_address(db_pool, admin_user, technician_user)
+    await monitoring_service.append_readings(db_pool, address.id, make_batch(START, 100), technician_user.id)
+    end = START + timedelta(hours=1)
+
+    first = await monitoring_service.get_series(db_pool, address.id, "pm25", START, end, 50, admin_user.id)
+    second = await monitoring_service.get_series(db_pool, address.id, "pm25", START, end, 50, admin_user.id)
+    assert second is first
+
+    await monitoring_service.append_readings(
+        db_pool, address.id, make_batch(START + timedelta(minutes=30), 1, offset=500.0), technician_user.id
+    )
+    third = await monitoring_service.get_series(db_pool, address.id, "pm25", START, end, 50, admin_user.id)
+    assert third is not first
+    assert max(third.max_values) == 500
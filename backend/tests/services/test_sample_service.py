@@ -0,0 +1,71 @@
+import pytest
+from datetime import date, datetime, timezone
+from fastapi import HTTPException
+from app.schemas.project import ProjectCreate, AddressCreate
+from app.schemas.sample import SampleCreate
+from app.services import projects as project_service
+from app.services import samples as sample_service
+
+pytestmark = pytest.mark.asyncio
+
+COLLECTED_AT = datetime(2024, 1, 1, 9, tzinfo=timezone.utc)
+
+async def create_address(db_pool, admin_user):
+    project = await project_service.create_project(db_pool, ProjectCreate(name="Sample Project"), admin_user.id)
+    return await project_service.create_address(
+        db_pool, project.id, AddressCreate(name="123 Sample St", date=date(2024, 1, 1)), admin_user.id
+    )
+
+async def test_create_sample_adds_it_to_address(db_pool, admin_user):
+    """Test creating a sample links it to the address."""
+    address = await create_address(db_pool, admin_user)
+    sample = await sample_service.create_sample(
+        db_pool, address.id, SampleCreate(barcode="S-0001", collected_at=COLLECTED_AT), admin_user.id
+    )
+    assert sample.barcode == "S-0001"
+    assert sample.sample_type == "field"
+
+    samples = await sample_service.get_address_samples(db_pool, address.id, admin_user.id)
+    assert [s.id for s in samples] == [sample.id]
+
+async def test_create_field_duplicate(db_pool, admin_user):
+    """Test that a field duplicate references its original sample."""
+    address = await create_address(db_pool, admin_user)
+    original = await sample_service.create_sample(
+        db_pool, address.id, SampleCreate(barcode="S-0001", collected_at=COLLECTED_AT), admin_user.id
+    )
+    duplicate = await sample_service.create_sample(
+        db_pool, address.id,
+        SampleCreate(barcode="S-0002", sample_type="field_duplicate", parent_barcode="S-0001", collected_at=COLLECTED_AT),
+        admin_user.id
+    )
+    assert duplicate.parent_sample_id == original.id
+
+async def test_create_sample_unknown_parent(db_pool, admin_user):
+    """Test that a duplicate of an unknown sample is rejected."""
+    address = await create_address(db_pool, admin_user)
+    with pytest.raises(HTTPException) as exc:
+        await sample_service.create_sample(
+            db_pool, address.id,
+            SampleCreate(barcode="S-0002", sample_type="field_duplicate", parent_barcode="S-9999", collected_at=COLLECTED_AT),
+            admin_user.id
+        )
+    assert exc.value.status_code == 400
+
+async def test_create_sample_duplicate_barcode(db_pool, admin_user):
+    """Test that barcodes are unique."""
+    address = await create_address(db_pool, admin_user)
+    sample = SampleCreate(barcode="S-0001", collected_at=COLLECTED_AT)
+    await sample_service.create_sample(db_pool, address.id, sample, admin_user.id)
+    with pytest.raises(HTTPException) as exc:
+        await sample_service.create_sample(db_pool, address.id, sample, admin_user.id)
+    assert exc.value.status_code == 400
+
+async def test_create_sample_unauthorized(db_pool, admin_user, test_user):
+    """Test that users without a role can't create samples."""
+    address = await create_address(db_pool, admin_user)
+    with pytest.raises(HTTPException) as exc:
+        await sample_service.create_sample(
+            db_pool, address.id, SampleCreate(barcode="S-0001", collected_at=COLLECTED_AT), test_user.id
+        )
+    assert exc.value.status_code == 403
@@ -0,0 +1,20 @@
+import pytest
+from httpx import AsyncClient
+from app.core import metrics
+
+pytestmark = pytest.mark.asyncio
+
+async def test_metrics_endpoint(client: AsyncClient, admin_token_headers):
+    """Test that requests are recorded by route template and exposed at /metrics."""
+    metrics.reset()
+    await client.get("/api/v1/projects/999", headers=admin_token_headers)
+    await client.get("/no-such-path")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/v1/projects/{project_id}",status="404"} 1'
+        in response.text
+    )
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in response.text
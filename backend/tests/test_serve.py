@@ -0,0 +1,58 @@
+import os
+import pytest
+import uvicorn
+from app import main, serve, startup
+from app.core.config import settings
+from app.db import engine
+from app.db.session import get_db
+
+@pytest.fixture
+def boot_settings(monkeypatch):
+    # serve.main turns boot tasks off for the workers; undo that after each test
+    monkeypatch.setattr(settings, "RUN_BOOT_TASKS", settings.RUN_BOOT_TASKS)
+    monkeypatch.setattr(settings, "LOOP_MONITOR_ENABLED", False)
+    monkeypatch.setenv("RUN_BOOT_TASKS", "true")
+
+def test_serve_runs_boot_tasks_once(boot_settings, monkeypatch):
+    """Test that the supervisor runs the boot tasks once and starts workers without them."""
+    boots = []
+    started = {}
+
+    async def fake_startup():
+        boots.append(1)
+
+    monkeypatch.setattr(serve, "startup", fake_startup)
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: started.update(kwargs, app=app))
+
+    serve.main(["--workers", "4", "--port", "8123"])
+
+    assert boots == [1]
+    assert started["app"] == "app.main:app"
+    assert started["workers"] == 4
+    assert started["port"] == 8123
+    assert started["timeout_graceful_shutdown"] == settings.GRACEFUL_SHUTDOWN_SECONDS
+    assert os.environ["RUN_BOOT_TASKS"] == "false"
+    assert settings.RUN_BOOT_TASKS is False
+
+async def test_worker_lifecycle_leaves_shared_schema(boot_settings, monkeypatch, db_pool):
+    """Test that a worker only opens its pool at startup and only closes it at shutdown."""
+    async def fail():
+        raise AssertionError("workers must not run the boot tasks")
+
+    monkeypatch.setattr(settings, "RUN_BOOT_TASKS", False)
+    monkeypatch.setattr(startup, "wait_for_db", fail)
+    monkeypatch.setattr(startup, "run_migrations", fail)
+
+    await main.startup_event()
+    try:
+        pool = engine._pool
+        assert pool is not None
+        # Every request gets the worker's pool
+        assert [p async for p in get_db()] == [pool]
+        assert [p async for p in get_db()] == [pool]
+    finally:
+        await main.shutdown_event()
+
+    assert engine._pool is None
+    assert pool.is_closing()
+    assert await db_pool.fetchval("SELECT to_regclass('user_roles_with_permissions')::text") == "user_roles_with_permissions"
@@ -0,0 +1,65 @@
+import json
+import logging
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.core.config import settings
+from app.core.timing import ServerTimingMiddleware
+from app.db.instrumentation import create_pool
+from app.db.session import get_db
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def timed_client(db_pool):
+    # Database time is measured by the instrumented pool
+    pool = await create_pool(settings.get_database_url, min_size=1, max_size=2)
+
+    async def get_pool():
+        yield pool
+
+    app.dependency_overrides[get_db] = get_pool
+    async with AsyncClient(
+        transport=ASGITransport(app=ServerTimingMiddleware(app, log=True)),
+        base_url="http://test"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
+    await pool.close()
+
+def parse_header(value: str) -> dict:
+    entries = {}
+    for entry in value.split(", "):
+        name, duration = entry.split(";dur=")
+        entries[name] = float(duration)
+    return entries
+
+async def test_server_timing_header(timed_client: AsyncClient, test_user, caplog):
+    """Test that an authenticated request reports each phase and logs a JSON line."""
+    response = await timed_client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": "TestPass123!@#"}
+    )
+    assert response.status_code == 200
+    phases = parse_header(response.headers["server-timing"])
+    assert {"hashing", "db", "validation", "serialize", "total"} <= set(phases)
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        response = await timed_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    phases = parse_header(response.headers["server-timing"])
+    assert {"auth", "db", "app", "validation", "serialize", "total"} <= set(phases)
+    assert sum(v for k, v in phases.items() if k != "total") <= phases["total"] + 0.1
+
+    records = [record for record in caplog.records if record.name == "app.timing"]
+    line = json.loads(records[-1].getMessage())
+    assert line["path"] == "/api/v1/users/me"
+    assert line["status"] == 200
+    assert line["user_id"] == test_user.id
+    assert set(line["phases"]) == set(phases) - {"total"}
+
+async def test_no_header_when_disabled(client: AsyncClient):
+    """Test that the header is absent when the middleware isn't installed."""
+    response = await client.get("/")
+    assert "server-timing" not in response.headers